@@ -0,0 +1,71 @@
+"""
+Compare two benchmark result files written by benchmarks/run.py.
+
+Prints the ratio new / old of every metric and exits with status 1 if any
+construct time, tick latency or peak memory got worse by more than the threshold.
+
+Usage:
+    python benchmarks/compare.py old.json new.json [--threshold 1.2]
+"""
+import argparse
+import json
+import sys
+
+METRICS = ['construct_seconds', 'tick_latency_us', 'peak_memory_bytes']
+
+
+def load(path):
+    with open(path) as file:
+        results = json.load(file)
+    return results, {(result['indicator'], result['size']): result for result in results['results']}
+
+
+def compare(old, new, threshold=1.2):
+    """
+    Compare two sets of results.
+
+    Parameters:
+        old (dict): The baseline results.
+        new (dict): The results to check.
+        threshold (float): The ratio above which a metric counts as a regression.
+
+    Returns:
+        list: (indicator, size, metric, old value, new value, ratio) for every metric in both runs,
+        and a list of the ones that regressed.
+    """
+    rows = []
+    regressions = []
+    for key in sorted(set(old) & set(new)):
+        for metric in METRICS:
+            old_value, new_value = old[key][metric], new[key][metric]
+            ratio = new_value / old_value if old_value else float('inf')
+            row = key + (metric, old_value, new_value, ratio)
+            rows.append(row)
+            if ratio > threshold:
+                regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=1.2, help='ratio that counts as a regression (default: 1.2)')
+    args = parser.parse_args(argv)
+
+    old_results, old = load(args.old)
+    new_results, new = load(args.new)
+    print('{} -> {}'.format(old_results['meta']['commit'], new_results['meta']['commit']))
+    print('{:<20} {:>8} {:<20} {:>14} {:>14} {:>8}'.format('indicator', 'size', 'metric', 'old', 'new', 'ratio'))
+    print('{:<20} {:>8} {:<20} {:>14.4f} {:>14.4f} {:>8.2f}'.format('import', '', 'seconds', old_results['import_seconds'], new_results['import_seconds'], new_results['import_seconds'] / old_results['import_seconds']))
+    rows, regressions = compare(old, new, args.threshold)
+    for row in rows:
+        print('{:<20} {:>8} {:<20} {:>14.4f} {:>14.4f} {:>8.2f}'.format(*row))
+    if regressions:
+        print('{} regression(s) above {}x'.format(len(regressions), args.threshold))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Benchmarks for every indicator class exported from ilib.
+
+For each indicator and history size this measures:
+- construct: the time to build an indicator that holds `size` data points, and the
+  throughput in data points per second,
+- tick: the mean latency of add_data_point once that history is in place,
+- memory: the peak memory allocated while building the indicator and ticking it.
+
+The import time of ilib is measured once per run. Results are written as JSON so
+runs from different commits can be compared with benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run.py [--sizes 1000 100000 1000000] [--ticks 1000]
+                             [--indicators RSI EMA ...] [--output results.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+import ilib
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_TICKS = 1000
+
+
+def make_bars(count, seed=0):
+    """Random walk OHLCV bars as Python lists, one per field."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    close -= min(close.min() - 1, 0)
+    high = close + rng.uniform(0, 1, count)
+    low = close - rng.uniform(0, 1, count)
+    volume = rng.integers(1, 1000, count).astype(float)
+    timestamp = np.arange(count, dtype=float)
+    return {'high': high.tolist(), 'low': low.tolist(), 'close': close.tolist(), 'volume': volume.tolist(), 'timestamp': timestamp.tolist()}
+
+
+def feed(indicator, tick, bars, start, stop):
+    for i in range(start, stop):
+        tick(indicator, bars, i)
+    return indicator
+
+
+def build_vwap(bars, size):
+    return feed(ilib.VWAP(), tick_vwap, bars, 0, size)
+
+
+def tick_price(indicator, bars, i):
+    indicator.add_data_point(bars['close'][i])
+
+
+def tick_bar(indicator, bars, i):
+    indicator.add_data_point(bars['high'][i], bars['low'][i], bars['close'][i])
+
+
+def tick_vwap(indicator, bars, i):
+    indicator.add_data_point(bars['close'][i], bars['volume'][i], bars['timestamp'][i])
+
+
+# Class name -> (build an indicator holding the first `size` bars, add bar i)
+INDICATORS = {
+    'BollingerBands': (lambda bars, size: ilib.BollingerBands(20, 2, bars['close'][:size]), tick_price),
+    'MACD': (lambda bars, size: ilib.MACD(12, 26, 9, bars['close'][:size]), tick_price),
+    'RSI': (lambda bars, size: ilib.RSI(14, bars['close'][:size]), tick_price),
+    'SMA': (lambda bars, size: ilib.SMA(bars['close'][:size], 20), tick_price),
+    'EMA': (lambda bars, size: ilib.EMA(20, bars['close'][:size]), tick_price),
+    'CCI': (lambda bars, size: ilib.CCI(20, bars['high'][:size], bars['low'][:size], bars['close'][:size]), tick_bar),
+    'STOCHOSCILLATOR': (lambda bars, size: ilib.STOCHOSCILLATOR(14, 3, 20, 80, bars['high'][:size], bars['low'][:size], bars['close'][:size]), tick_bar),
+    'StochRSICalculator': (lambda bars, size: ilib.StochRSICalculator(3, 14, 3, bars['close'][:size]), tick_price),
+    'VWAP': (build_vwap, tick_vwap),
+    'AverageTrueRange': (lambda bars, size: ilib.AverageTrueRange(14, bars['high'][:size], bars['low'][:size], bars['close'][:size]), tick_bar),
+    'ADX': (lambda bars, size: ilib.ADX(14, bars['high'][:size], bars['low'][:size], bars['close'][:size]), tick_bar),
+    'DMI': (lambda bars, size: ilib.DMI(14, bars['high'][:size], bars['low'][:size], bars['close'][:size]), tick_bar),
+}
+
+
+def measure_import():
+    """Seconds to import ilib in a fresh interpreter."""
+    script = 'import time; start = time.perf_counter(); import ilib; print(time.perf_counter() - start)'
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return float(output)
+
+
+def measure(name, size, ticks, bars):
+    build, tick = INDICATORS[name]
+    # Warm up so one-off costs such as lazy imports are not timed
+    feed(build(bars, 100), tick, bars, 100, 110)
+
+    start = time.perf_counter()
+    indicator = build(bars, size)
+    construct_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    feed(indicator, tick, bars, size, size + ticks)
+    tick_seconds = time.perf_counter() - start
+    del indicator
+
+    # tracemalloc slows allocations down, so memory is measured in a separate pass
+    tracemalloc.start()
+    feed(build(bars, size), tick, bars, size, size + ticks)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'indicator': name,
+        'size': size,
+        'construct_seconds': construct_seconds,
+        'construct_points_per_second': size / construct_seconds if construct_seconds else None,
+        'tick_latency_us': tick_seconds / ticks * 1e6,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=DEFAULT_SIZES, ticks=DEFAULT_TICKS, indicators=None, log=print):
+    """
+    Run the benchmarks.
+
+    Parameters:
+        sizes (list): The history sizes to measure.
+        ticks (int): The number of add_data_point calls timed per measurement.
+        indicators (list): The class names to measure. Default is every class in INDICATORS.
+        log (function): Called with a line of text after each measurement.
+
+    Returns:
+        dict: The machine readable results.
+    """
+    indicators = list(INDICATORS) if indicators is None else indicators
+    bars = make_bars(max(sizes) + ticks)
+    results = {
+        'meta': {
+            'commit': commit(),
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'ticks': ticks,
+        },
+        'import_seconds': measure_import(),
+        'results': [],
+    }
+    log('import ilib: {:.3f} s'.format(results['import_seconds']))
+    for name in indicators:
+        for size in sizes:
+            result = measure(name, size, ticks, bars)
+            results['results'].append(result)
+            log('{indicator:<20} size={size:<8} construct={construct_seconds:9.4f} s  tick={tick_latency_us:10.2f} us  peak={peak_memory_bytes:>12,} B'.format(**result))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=lambda value: int(float(value)), nargs='+', default=DEFAULT_SIZES, help='history sizes (default: 1e3 1e5 1e6)')
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help='add_data_point calls timed per measurement')
+    parser.add_argument('--indicators', nargs='+', choices=sorted(INDICATORS), help='only run these indicators')
+    parser.add_argument('--output', help='write the JSON results to this file (default: benchmarks/results/<commit>.json)')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.ticks, args.indicators)
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', '{}.json'.format(results['meta']['commit'] or 'latest'))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print('Results written to {}'.format(output))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,11 @@
-import matplotlib.pyplot as plt
+import numpy as np
 
-class ADX:
+from . import batch, plotting
+from .DMI import DMI
+from .buffers import RingBuffer, make_history
+from .lazy import LazyUpdates
+
+class ADX(LazyUpdates):
     """
     Average Directional Index
     
@@ -9,19 +14,42 @@ class ADX:
         high_prices (list): The high prices of the stock.
         low_prices (list): The low prices of the stock.
         close_prices (list): The close prices of the stock.
+        max_history (int): Number of values to keep in directional_movements. Default is None, which keeps every value.
+        method (str): 'sma' (default) averages the last period bars, 'wilder' uses Wilder smoothing in O(1) per bar
+            and also reports +DI, -DI and the smoothed ADX.
+        lazy (bool): Only record new data points, and apply them all at once on the next getter call. Default is False.
+
+    Only the last period + 1 prices are kept.
     """
         
         
-    def __init__(self, period, high_prices=None, low_prices=None, close_prices=None):
+    # Output history, left out of state snapshots
+    history = ('directional_movements',)
+
+    def __init__(self, period, high_prices=None, low_prices=None, close_prices=None, max_history=None, method='sma', lazy=False):
+        if method not in ('sma', 'wilder'):
+            raise ValueError("method must be 'sma' or 'wilder'.")
+        self.method = method
         self.period = period
-        self.high_prices = [] if high_prices is None else high_prices
-        self.low_prices = [] if low_prices is None else low_prices
-        self.close_prices = [] if close_prices is None else close_prices
+        self.high_prices = RingBuffer(period + 1, high_prices)
+        self.low_prices = RingBuffer(period + 1, low_prices)
+        self.close_prices = RingBuffer(period + 1, close_prices)
         self.previous_high = None
         self.previous_low = None
         self.true_ranges = []
-        self.directional_movements = []
-        self.directional_movement_index = None if len(self.high_prices) < self.period else self.calculate()
+        self.directional_movements = make_history(max_history)
+        self.directional_movement_index = None
+        self.plus_di = None
+        self.minus_di = None
+        self.adx = None
+        if method == 'wilder':
+            self.dmi = DMI(period, max_history=1)
+            if high_prices is not None:
+                for high, low, close in zip(high_prices, low_prices, close_prices):
+                    self.update_wilder(high, low, close)
+        elif len(self.high_prices) >= self.period:
+            self.calculate()
+        self.set_lazy(lazy, 3)
 
     def calculate(self):
         """
@@ -86,41 +114,124 @@ class ADX:
                 self.previous_high = self.high_prices[i]
                 self.previous_low = self.low_prices[i]
                 
+    def update_wilder(self, high, low, close):
+        """
+        Feeds a bar to the Wilder-smoothed DMI and copies its values.
+        """
+        self.dmi.add_data_point(high, low, close)
+        if self.dmi.dx is None:
+            return
+        self.plus_di = self.dmi.plus_di
+        self.minus_di = self.dmi.minus_di
+        self.adx = self.dmi.adx
+        self.directional_movement_index = self.dmi.dx
+        self.directional_movements.append(self.directional_movement_index)
+
     def add_data_point(self, high, low, close):
         """
         Adds a data point to the ADX.
         """
+        if self.pending is not None:
+            self.defer(high, low, close)
+            return
         self.high_prices.append(high)
         self.low_prices.append(low)
         self.close_prices.append(close)
-        if len(self.high_prices) > self.period:
+        if self.method == 'wilder':
+            self.update_wilder(high, low, close)
+        elif len(self.high_prices) > self.period:
             self.calculate()
     
+    def add_data_points(self, high_prices, low_prices, close_prices):
+        """
+        Adds several bars at once, ending in the same state as adding them one at a time.
+
+        With method='sma' the true ranges, directional movements and their window sums are computed
+        for the whole chunk together; with method='wilder' the bars go to DMI.add_data_points.
+        """
+        if self.pending is not None:
+            self.defer_many(high_prices, low_prices, close_prices)
+            return
+        high_prices = np.asarray(high_prices, dtype=float)
+        low_prices = np.asarray(low_prices, dtype=float)
+        close_prices = np.asarray(close_prices, dtype=float)
+        if self.method == 'wilder':
+            _, plus_di, minus_di, dx, adx = self.dmi.add_data_points(high_prices, low_prices, close_prices)
+            dx = dx[~np.isnan(dx)]
+            if len(dx):
+                self.plus_di, self.minus_di = self.dmi.plus_di, self.dmi.minus_di
+                self.adx = self.dmi.adx
+                self.directional_movement_index = float(dx[-1])
+                self.directional_movements.extend(dx.tolist())
+        else:
+            start = 0
+            while start < len(close_prices) and not self.high_prices.full:
+                self.add_data_point(high_prices[start], low_prices[start], close_prices[start])
+                start += 1
+            if start < len(close_prices):
+                high = np.concatenate((self.high_prices.to_array(), high_prices[start:]))
+                low = np.concatenate((self.low_prices.to_array(), low_prices[start:]))
+                close = np.concatenate((self.close_prices.to_array(), close_prices[start:]))
+                # The windows ending at each new bar: `period` true ranges, and the `period` - 1
+                # movements after the first bar of the window
+                true_range_average = batch.sequential_window_sum(batch.true_range(high, low, close)[1:], self.period)[1:] / self.period
+                positive, negative = batch.directional_movements(high, low)
+                positive_directional_movement_average = batch.sequential_window_sum(positive[1:], self.period - 1)[1:] / self.period
+                negative_directional_movement_average = batch.sequential_window_sum(negative[1:], self.period - 1)[1:] / self.period
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    positive_directional_index = (positive_directional_movement_average / true_range_average) * 100
+                    negative_directional_index = (negative_directional_movement_average / true_range_average) * 100
+                    directional_movement_index = np.abs(positive_directional_index - negative_directional_index) / (positive_directional_index + negative_directional_index) * 100
+                self.directional_movement_index = float(directional_movement_index[-1])
+                self.directional_movements.extend(directional_movement_index.tolist())
+            high_prices, low_prices, close_prices = high_prices[start:], low_prices[start:], close_prices[start:]
+        self.high_prices.extend(high_prices)
+        self.low_prices.extend(low_prices)
+        self.close_prices.extend(close_prices)
+        if self.method == 'sma' and len(close_prices):
+            # Leave the per-window working lists as the last calculate() would
+            self.calculate_true_ranges()
+            self.calculate_directional_movements()
+
     def get_directional_movement_index(self):
         """
         Returns:
             float: The ADX of the stock.
         """
+        self.catch_up()
         return self.directional_movement_index
 
+    def get_plus_di(self):
+        """
+        Returns:
+            float: The positive directional index (+DI), only with method='wilder'.
+        """
+        self.catch_up()
+        return self.plus_di
+
+    def get_minus_di(self):
+        """
+        Returns:
+            float: The negative directional index (-DI), only with method='wilder'.
+        """
+        self.catch_up()
+        return self.minus_di
+
+    def get_adx(self):
+        """
+        Returns:
+            float: The Wilder-smoothed average of the Directional Movement Index, only with method='wilder'.
+        """
+        self.catch_up()
+        return self.adx
+
     def plot_show(self):
         """
         Plots the ADX.
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
-        ax1.plot(self.high_prices, label='High')
-        ax1.plot(self.low_prices, label='Low')
-        ax1.plot(self.close_prices, label='Close')
-        ax1.set_title('Stock')
-        ax1.set_ylabel('Price')
-        ax1.legend(loc='upper left')
-        ax2.plot(self.directional_movements, label='Directional Movement Index')
-        ax2.set_title('Directional Movement Index')
-        ax2.set_xlabel('Period')
-        ax2.set_ylabel('Directional Movement Index')
-        ax2.legend(loc='upper left')
-        plt.show()
-        
+        self.catch_up()
+        plotting.show(plotting.draw_adx, self)
+
     def plot_save(self, filename):
         """
         Plots the ADX and saves it to a file.
@@ -128,18 +239,5 @@ class ADX:
         Args:
             filename (str): The filename to save the plot to.
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
-        ax1.plot(self.high_prices, label='High')
-        ax1.plot(self.low_prices, label='Low')
-        ax1.plot(self.close_prices, label='Close')
-        ax1.set_title('Stock')
-        ax1.set_ylabel('Price')
-        ax1.legend(loc='upper left')
-        ax2.plot(self.directional_movements, label='Directional Movement Index')
-        ax2.set_title('Directional Movement Index')
-        ax2.set_xlabel('Period')
-        ax2.set_ylabel('Directional Movement Index')
-        ax2.legend(loc='upper left')
-        plt.savefig(filename)
-        plt.close()
-        
+        self.catch_up()
+        plotting.save(plotting.draw_adx, self, filename)
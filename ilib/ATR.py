@@ -1,21 +1,44 @@
-import matplotlib.pyplot as plt
+import numpy as np
 
-class AverageTrueRange:
+from . import batch, plotting
+from .DMI import DMI
+from .buffers import RingBuffer, make_history
+from .lazy import LazyUpdates
+
+class AverageTrueRange(LazyUpdates):
     """
     Average True Range (ATR) is a technical analysis indicator that measures market volatility by decomposing the entire range of an asset price for that period.
     
     Parameters:
         period (int): The period for which ATR needs to be calculated.
+        max_history (int): Number of ATR values to keep in ATR_values. Default is None, which keeps every value.
+        method (str): 'sma' (default) averages the last period true ranges, 'wilder' uses Wilder smoothing in O(1) per bar.
+        lazy (bool): Only record new data points, and apply them all at once on the next getter call. Default is False.
+
+    Only the last period + 1 prices are kept.
     """
-    def __init__(self, period=14, high_prices=None, low_prices=None, close_prices=None):
+
+    # Output history, left out of state snapshots
+    history = ('ATR_values',)
+
+    def __init__(self, period=14, high_prices=None, low_prices=None, close_prices=None, max_history=None, method='sma', lazy=False):
+        if method not in ('sma', 'wilder'):
+            raise ValueError("method must be 'sma' or 'wilder'.")
+        self.method = method
         self.ATR = None
-        self.ATR_values = []
+        self.ATR_values = make_history(max_history)
         self.period = period
-        self.high_prices = high_prices if high_prices is not None else []
-        self.low_prices = low_prices if low_prices is not None else []
-        self.close_prices = close_prices if close_prices is not None else []
-        if len(self.high_prices) > self.period:
+        self.high_prices = RingBuffer(period + 1, high_prices)
+        self.low_prices = RingBuffer(period + 1, low_prices)
+        self.close_prices = RingBuffer(period + 1, close_prices)
+        if method == 'wilder':
+            self.dmi = DMI(period, max_history=1)
+            if high_prices is not None:
+                for high, low, close in zip(high_prices, low_prices, close_prices):
+                    self.update_wilder(high, low, close)
+        elif high_prices is not None and len(high_prices) > self.period:
             self.calculate()
+        self.set_lazy(lazy, 3)
 
     def calculate(self):
         """
@@ -33,6 +56,15 @@ class AverageTrueRange:
         self.ATR =  sum(true_ranges) / len(true_ranges)
         self.ATR_values.append(self.ATR)
         
+    def update_wilder(self, high, low, close):
+        """
+        Feed a bar to the Wilder-smoothed DMI and copy its ATR.
+        """
+        self.dmi.add_data_point(high, low, close)
+        if self.dmi.atr is not None:
+            self.ATR = self.dmi.atr
+            self.ATR_values.append(self.ATR)
+
     def add_data_point(self, high, low, close):
         """
         Add a new price to the data list and recalculate the ATR.
@@ -44,42 +76,70 @@ class AverageTrueRange:
             
         Returns:
             null: The ATR is stored in the ATR attribute."""
-            
+        if self.pending is not None:
+            self.defer(high, low, close)
+            return
         self.high_prices.append(high)
         self.low_prices.append(low)
         self.close_prices.append(close)
-        if len(self.high_prices) > self.period:
+        if self.method == 'wilder':
+            self.update_wilder(high, low, close)
+        elif len(self.high_prices) > self.period:
             self.calculate()
     
+    def add_data_points(self, high_prices, low_prices, close_prices):
+        """
+        Add several bars at once, ending in the same state as adding them one at a time.
+
+        With method='sma' the true ranges of the chunk and their window sums are computed together;
+        with method='wilder' the bars go to DMI.add_data_points.
+
+        Parameters:
+            high_prices (list or numpy array): The new high prices in chronological order.
+            low_prices (list or numpy array): The new low prices.
+            close_prices (list or numpy array): The new close prices.
+        """
+        if self.pending is not None:
+            self.defer_many(high_prices, low_prices, close_prices)
+            return
+        high_prices = np.asarray(high_prices, dtype=float)
+        low_prices = np.asarray(low_prices, dtype=float)
+        close_prices = np.asarray(close_prices, dtype=float)
+        if self.method == 'wilder':
+            atr = self.dmi.add_data_points(high_prices, low_prices, close_prices)[0]
+            atr = atr[~np.isnan(atr)]
+            if len(atr):
+                self.ATR = float(atr[-1])
+                self.ATR_values.extend(atr.tolist())
+        else:
+            start = 0
+            while start < len(close_prices) and not self.high_prices.full:
+                self.add_data_point(high_prices[start], low_prices[start], close_prices[start])
+                start += 1
+            if start < len(close_prices):
+                # The windows of `period` true ranges ending at each new bar
+                true_ranges = batch.true_range(np.concatenate((self.high_prices.to_array(), high_prices[start:])),
+                                               np.concatenate((self.low_prices.to_array(), low_prices[start:])),
+                                               np.concatenate((self.close_prices.to_array(), close_prices[start:])))[1:]
+                atr = batch.sequential_window_sum(true_ranges, self.period)[1:] / self.period
+                self.ATR = float(atr[-1])
+                self.ATR_values.extend(atr.tolist())
+            high_prices, low_prices, close_prices = high_prices[start:], low_prices[start:], close_prices[start:]
+        self.high_prices.extend(high_prices)
+        self.low_prices.extend(low_prices)
+        self.close_prices.extend(close_prices)
+
     def get_ATR(self):
         """Return the current ATR value."""
+        self.catch_up()
         return self.ATR
     
     def plot_show(self):
         """Plot the ATR values."""
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
-        ax1.set_title('Stock Prices')
-        ax1.plot(self.high_prices, label='High')
-        ax1.plot(self.low_prices, label='Low')
-        ax1.plot(self.close_prices, label='Close')
-        ax1.legend(loc='upper left')
-        ax2.set_title('ATR - {} period'.format(self.period))
-        ax2.plot(self.ATR_values, label='ATR')
-        plt.tight_layout()
-        plt.show()
-        return
-        
+        self.catch_up()
+        plotting.show(plotting.draw_atr, self)
+
     def plot_save(self, filename):
         """Save the ATR values plot to a file."""
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
-        ax1.set_title('Stock Prices')
-        ax1.plot(self.high_prices, label='High')
-        ax1.plot(self.low_prices, label='Low')
-        ax1.plot(self.close_prices, label='Close')
-        ax1.legend(loc='upper left')
-        ax2.set_title('ATR - {} period'.format(self.period))
-        ax2.plot(self.ATR_values, label='ATR')
-        plt.savefig(filename)
-        plt.close()
-        return
-    
\ No newline at end of file
+        self.catch_up()
+        plotting.save(plotting.draw_atr, self, filename)
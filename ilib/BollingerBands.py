@@ -1,54 +1,176 @@
-import matplotlib.pyplot as plt
+import math
+
 import numpy as np
-import pandas as pd
 
-class BollingerBands:
+from . import batch, plotting
+from .buffers import RingBuffer, make_history
+from .lazy import LazyUpdates
+
+class BollingerBands(LazyUpdates):
     """
     Initialize the BollingerBands class with given data, window size, and number of standard deviations.
+
+    The bands are updated in constant time per data point from a running mean and sum of squared
+    deviations over the window (Welford's method, with the oldest value removed as a new one
+    arrives). The running moments are recalculated from the window every `window` data points so
+    rounding errors cannot build up.
         
     Parameters:
         data (list or numpy array): The input data for which Bollinger Bands need to be calculated.
         window (int, optional): The size of the moving window. Default is 20.
         num_std (int, optional): The number of standard deviations for the Bollinger Bands. Default is 1.
+        max_history (int, optional): Number of band values to keep in upper_band, middle_band and lower_band. Default is None, which keeps every value.
+        lazy (bool, optional): Only record new data points, and apply them all at once on the next getter call. Default is False.
     """
-    def __init__(self, window=20, num_std=1, data=None):
-        if data is None:
-            self.data = []
-        else :
-            self.data = data
+
+    # Output history, left out of state snapshots
+    history = ('upper_band', 'middle_band', 'lower_band')
+
+    def __init__(self, window=20, num_std=1, data=None, max_history=None, lazy=False):
         self.window = window
         self.num_std = num_std
-        self.upper_band = []
-        self.middle_band = []
-        self.lower_band = []
-        if len(self.data) > 20:
-            self.calculate()
+        self.data = RingBuffer(window, data)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+        self.upper = None
+        self.middle = None
+        self.lower = None
+        self.upper_band = make_history(max_history)
+        self.middle_band = make_history(max_history)
+        self.lower_band = make_history(max_history)
+        if data is not None and len(data) >= window:
+            upper, middle, lower = batch.bollinger_bands(data, window, num_std)
+            self.upper_band.extend(upper[window - 1:])
+            self.middle_band.extend(middle[window - 1:])
+            self.lower_band.extend(lower[window - 1:])
+        self.calculate()
+        self.set_lazy(lazy, 1)
     
     def calculate(self):
         """
-        Calculate the Bollinger Bands.
-        
+        Recalculate the running mean and sum of squared deviations from the values in the window
+        and update the current Bollinger Bands.
         """
-        data = pd.DataFrame(self.data)
-        rolling_mean = data.rolling(window=self.window).mean()
-        rolling_std = data.rolling(window=self.window).std()
-        self.upper_band.append(rolling_mean + (self.num_std * rolling_std))
-        self.middle_band.append(rolling_mean)
-        self.lower_band.append(rolling_mean - (self.num_std * rolling_std))
+        if len(self.data) == 0:
+            return
+        values = self.data.to_array()
+        self.mean = float(values.mean())
+        self.m2 = float(((values - self.mean) ** 2).sum())
+        self.update_bands()
         return
+
+    def update_bands(self):
+        """
+        Update the current Bollinger Bands from the running mean and sum of squared deviations.
+        """
+        if not self.data.full:
+            return
+        # One value has no sample standard deviation, so the bands are NaN as in batch.bollinger_bands
+        std = math.sqrt(max(self.m2, 0.0) / (self.window - 1)) if self.window > 1 else math.nan
+        self.middle = float(self.mean)
+        self.upper = float(self.mean + (self.num_std * std))
+        self.lower = float(self.mean - (self.num_std * std))
     
     def add_data_point(self, new_data_point):
         """
-        Add a new data point to the existing data.
+        Add a new data point to the existing data and update the Bollinger Bands.
         
         Parameters:
             new_data_point (float or int): The new data point to be added.
         """
-        self.data.append(new_data_point)
-        if self.upper_band is not None:
+        if self.pending is not None:
+            self.defer(new_data_point)
+            return
+        if self.data.full:
+            oldest = self.data[0]
+            self.data.append(new_data_point)
+            delta = new_data_point - oldest
+            mean = self.mean + delta / self.window
+            self.m2 += delta * (new_data_point - mean + oldest - self.mean)
+            self.mean = mean
+        else:
+            self.data.append(new_data_point)
+            delta = new_data_point - self.mean
+            self.mean += delta / len(self.data)
+            self.m2 += delta * (new_data_point - self.mean)
+
+        if not self.data.full:
+            return
+        self.updates += 1
+        if self.updates % self.window == 0:
             self.calculate()
+        else:
+            self.update_bands()
+        self.upper_band.append(self.upper)
+        self.middle_band.append(self.middle)
+        self.lower_band.append(self.lower)
         return
             
+    def add_data_points(self, data_points):
+        """
+        Add several data points at once, ending in the same state as adding them one at a time.
+
+        Between the recalculations every `window` data points, the running mean and sum of squared
+        deviations are advanced with cumulative sums of the per-point Welford updates, which round
+        exactly like the one-at-a-time updates.
+
+        Parameters:
+            data_points (list or numpy array): The new data points in chronological order.
+        """
+        if self.pending is not None:
+            self.defer_many(data_points)
+            return
+        data_points = np.asarray(data_points, dtype=float)
+        start = 0
+        while start < len(data_points) and not self.data.full:
+            self.add_data_point(data_points[start])
+            start += 1
+        data_points = data_points[start:]
+        count = len(data_points)
+        if count == 0:
+            return
+
+        window = self.window
+        # values[i] leaves the window when values[i + window] is added
+        values = np.concatenate((self.data.to_array(), data_points))
+        means = np.empty(count)
+        m2s = np.empty(count)
+        mean, m2 = self.mean, self.m2
+        step = 0
+        while step < count:
+            # Steps before the next recalculation
+            stop = min(step + window - 1 - self.updates % window, count)
+            oldest = values[step:stop]
+            newest = values[step + window:stop + window]
+            delta = newest - oldest
+            segment_means = np.add.accumulate(np.concatenate(([mean], delta / window)))
+            previous_means, segment_means = segment_means[:-1], segment_means[1:]
+            segment_m2s = np.add.accumulate(np.concatenate(([m2], delta * (newest - segment_means + oldest - previous_means))))[1:]
+            means[step:stop], m2s[step:stop] = segment_means, segment_m2s
+            self.updates += stop - step
+            if stop > step:
+                mean, m2 = segment_means[-1], segment_m2s[-1]
+            step = stop
+            if step < count:
+                current = values[step + 1:step + 1 + window]
+                mean = float(current.mean())
+                m2 = float(((current - mean) ** 2).sum())
+                means[step], m2s[step] = mean, m2
+                self.updates += 1
+                step += 1
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(np.maximum(m2s, 0.0) / (window - 1))
+        upper = means + (self.num_std * std)
+        lower = means - (self.num_std * std)
+        self.data.extend(data_points)
+        self.mean, self.m2 = float(mean), float(m2)
+        self.upper, self.middle, self.lower = float(upper[-1]), float(means[-1]), float(lower[-1])
+        self.upper_band.extend(upper.tolist())
+        self.middle_band.extend(means.tolist())
+        self.lower_band.extend(lower.tolist())
+
     def get_BollingerBands(self):
         """
         Returns the current Bollinger Bands values.
@@ -56,22 +178,16 @@ class BollingerBands:
         Returns:
             tuple: A tuple containing three current values for: upper_band, middle_band, and lower_band.
         """
-        return (float(self.upper_band.values[-1]), float(self.middle_band.values[-1]), float(self.lower_band.values[-1]))
+        self.catch_up()
+        return (self.upper, self.middle, self.lower)
     
     def plot_show(self):
         """
         Plot the Bollinger Bands calculated.
         """
-        plt.figure(figsize=(12,6))
-        plt.title('Bollinger Bands - Period {} - {} Std. Deviation'.format(self.window, self.num_std))
-        plt.plot(self.data, label='Price')
-        plt.plot(self.upper_band[-1].values, label='Upper Band')
-        plt.plot(self.middle_band[-1].values, label='Middle Band')
-        plt.plot(self.lower_band[-1].values, label='Lower Band')
-        plt.legend(loc='upper left')
-        plt.show()
-        return
-    
+        self.catch_up()
+        plotting.show(plotting.draw_bollinger_bands, self)
+
     def plot_save(self, path):
         """
         Save the Bollinger Bands calculated to a file.
@@ -79,12 +195,5 @@ class BollingerBands:
         Parameters:
             path (str): The path to the file where the Bollinger Bands plot is to be saved.
         """
-        plt.figure(figsize=(12,6))
-        plt.title('Bollinger Bands - Period {} - {} Std. Deviation'.format(self.window, self.num_std))
-        plt.plot(self.data, label='Price')
-        plt.plot(self.upper_band[-1].values, label='Upper Band')
-        plt.plot(self.middle_band[-1].values, label='Middle Band')
-        plt.plot(self.lower_band[-1].values, label='Lower Band')
-        plt.legend(loc='upper left')
-        plt.savefig(path)
-        return
\ No newline at end of file
+        self.catch_up()
+        plotting.save(plotting.draw_bollinger_bands, self, path)
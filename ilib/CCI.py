@@ -1,106 +1,174 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import sliding_window_view
+from . import batch, plotting
+from .buffers import RingBuffer, make_history
+from .lazy import LazyUpdates
 
-class CCI:
+class CCI(LazyUpdates):
     """
     Calculate the Commodity Channel Index (CCI) of a stock.
-    
+
+    Formula:
+    Typical Price = (High + Low + Close) / 3
+    CCI = (Typical Price - SMA of Typical Price) / (factor * Mean Deviation)
+
+    The SMA and the mean absolute deviation are taken over the typical prices of the last
+    `period` bars, so each bar costs O(period) time and memory.
+
     Parameters:
-    data (list): A list of the stock prices in chronological order, with the most recent price last.
     period (int): The number of periods to use in the CCI calculation. Default is 20.
+    high_prices (list): Initial high prices in chronological order, with the most recent price last.
+    low_prices (list): Initial low prices.
+    close_prices (list): Initial close prices.
     factor (float): The factor used to scale the Mean Deviation (MD) in the CCI calculation. Default is 0.015.
+    max_history (int): Number of CCI values to keep in cci_values. Default is None, which keeps every value.
+    lazy (bool): Only record new data points, and apply them all at once on the next getter call. Default is False.
+
+    The initial prices must be given all three or not at all, with equal lengths.
+    Only the last `period` prices are kept.
     """
-    
-    def __init__(self, period=20, data=[], factor=0.015) -> None:
+
+    # Output history, left out of state snapshots
+    history = ('cci_values',)
+
+    def __init__(self, period=20, high_prices=None, low_prices=None, close_prices=None, factor=0.015, max_history=None, lazy=False) -> None:
+        prices = (high_prices, low_prices, close_prices)
+        if any(values is not None for values in prices):
+            # CCI(period, data) from before the high/low/close split would bind data to high_prices alone
+            if any(values is None for values in prices) or len({len(values) for values in prices}) != 1:
+                raise ValueError("Pass high_prices, low_prices and close_prices together, with equal lengths.")
         self.cci = None
-        self.data = data
         self.period = period
         self.factor = factor
-        if len(data) > self.period:
-            self.calculate_cci()
+        self.high_prices = RingBuffer(period, high_prices)
+        self.low_prices = RingBuffer(period, low_prices)
+        self.close_prices = RingBuffer(period, close_prices)
+        self.typical_prices = RingBuffer(period)
+        self.cci_values = make_history(max_history)
+        if high_prices is not None:
+            typical_prices = (np.asarray(high_prices, dtype=float) + np.asarray(low_prices, dtype=float) + np.asarray(close_prices, dtype=float)) / 3
+            self.typical_prices.extend(typical_prices)
+            values = batch.cci(high_prices, low_prices, close_prices, period, factor)[period - 1:]
+            self.cci_values.extend(values.tolist())
+            if len(values):
+                self.cci = float(values[-1])
+        self.set_lazy(lazy, 3)
 
-        
     def calculate_typical_price(self):
         """
-        Calculate the typical price of a stock.
-        
+        Calculate the simple moving average of the typical prices in the window.
+
         Returns:
-            float: The typical price of a stock.
+            float: The average typical price.
         """
-        return sum(self.data) / len(self.data)
+        return self.typical_prices.to_array().mean()
 
     def calculate_mean_deviation(self, typical_price):
         """
-        Calculate the mean deviation of a stock.
-        
+        Calculate the mean absolute deviation of the typical prices in the window.
+
+        Parameters:
+            typical_price (float): The average typical price.
+
         Returns:
-            float: The mean deviation of a stock.
+            float: The mean deviation of the typical prices.
         """
-        deviations = [abs(price - typical_price) for price in self.data]
-        return sum(deviations) / len(self.data)
+        return np.abs(self.typical_prices.to_array() - typical_price).mean()
 
     def calculate_cci(self):
         """
-        Calculate the Commodity Channel Index (CCI) of a stock.
+        Calculate the Commodity Channel Index (CCI) of the last `period` bars.
+
         Returns:
             null: The CCI is stored in the cci attribute.
         """
-        typical_prices = [(high + low + close) / 3 for high, low, close in zip(self.data, self.data, self.data)]
-        sma = sum(typical_prices[:self.period]) / self.period
-        mean_deviations = [abs(typical_price - sma) for typical_price in typical_prices]
-        mda = sum(mean_deviations[:self.period]) / self.period
-
-        self.cci = [(typical_price - sma) / (0.015 * mda) for typical_price in typical_prices]
-        
-    def add_data_point(self, price):
+        sma = self.calculate_typical_price()
+        mean_deviation = self.calculate_mean_deviation(sma)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.cci = float((self.typical_prices[-1] - sma) / (self.factor * mean_deviation))
+        self.cci_values.append(self.cci)
+
+    def add_data_point(self, high, low, close):
         """
-        Add a new price to the data list and recalculate the CCI.
-        
+        Add a new bar and recalculate the CCI.
+
         Parameters:
-            price (float): The latest price.
+            high (float): The latest high price.
+            low (float): The latest low price.
+            close (float): The latest close price.
         Returns:
             null: The CCI is stored in the cci attribute.
         """
-        self.data.append(price)
-        if len(self.data) > self.period:
+        if self.pending is not None:
+            self.defer(high, low, close)
+            return
+        self.high_prices.append(high)
+        self.low_prices.append(low)
+        self.close_prices.append(close)
+        self.typical_prices.append((high + low + close) / 3)
+        if len(self.typical_prices) >= self.period:
             self.calculate_cci()
-        
+
+    def add_data_points(self, high_prices, low_prices, close_prices):
+        """
+        Add several bars at once, ending in the same state as adding them one at a time.
+
+        Once the window is full the CCI of every new bar is computed over NumPy sliding windows.
+
+        Parameters:
+            high_prices (list or numpy array): The new high prices in chronological order.
+            low_prices (list or numpy array): The new low prices.
+            close_prices (list or numpy array): The new close prices.
+        """
+        if self.pending is not None:
+            self.defer_many(high_prices, low_prices, close_prices)
+            return
+        high_prices = np.asarray(high_prices, dtype=float)
+        low_prices = np.asarray(low_prices, dtype=float)
+        close_prices = np.asarray(close_prices, dtype=float)
+        start = 0
+        while start < len(close_prices) and not self.typical_prices.full:
+            self.add_data_point(high_prices[start], low_prices[start], close_prices[start])
+            start += 1
+        if start == len(close_prices):
+            return
+
+        typical_prices = (high_prices[start:] + low_prices[start:] + close_prices[start:]) / 3
+        windows = sliding_window_view(np.concatenate((self.typical_prices.to_array(), typical_prices)), self.period)[1:]
+        sma = windows.mean(axis=1)
+        mean_deviation = np.abs(windows - sma[:, None]).mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cci = (typical_prices - sma) / (self.factor * mean_deviation)
+
+        self.high_prices.extend(high_prices[start:])
+        self.low_prices.extend(low_prices[start:])
+        self.close_prices.extend(close_prices[start:])
+        self.typical_prices.extend(typical_prices)
+        self.cci = float(cci[-1])
+        self.cci_values.extend(cci.tolist())
+
     def get_cci(self):
         """Return the current CCI value.
 
         Returns:
             float: The current CCI value.
         """
-        return self.cci[-1]
-    
+        self.catch_up()
+        return self.cci
+
     def plot_show(self):
         """
         Plot the CCI values calculated.
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
-        ax1.set_title('Stock Prices')
-        ax1.plot(self.data, label='High')
-        ax1.legend(loc='upper left')
-        ax2.set_title('CCI - {} period'.format(self.period))
-        ax2.plot(self.cci, label='CCI')
-        plt.tight_layout()
-        plt.show()
-        return
-    
+        self.catch_up()
+        plotting.show(plotting.draw_cci, self)
+
     def plot_save(self, filename):
         """
         Plot the CCI values calculated and save to file.
-        
+
         Parameters:
             filename (str): The filename to save the plot to.
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
-        ax1.set_title('Stock Prices')
-        ax1.plot(self.data, label='High')
-        ax1.legend(loc='upper left')
-        ax2.set_title('CCI - {} period'.format(self.period))
-        ax2.plot(self.cci, label='CCI')
-        plt.tight_layout()
-        plt.savefig(filename)
-        return
-        
\ No newline at end of file
+        self.catch_up()
+        plotting.save(plotting.draw_cci, self, filename)
@@ -0,0 +1,205 @@
+import numpy as np
+
+from . import batch
+from .buffers import make_history
+
+class DMI:
+    """
+    Directional Movement Index with Wilder smoothing.
+
+    The true range and the directional movements of each bar are computed once and carried
+    forward as Wilder-smoothed averages, average = (previous average * (period - 1) + value) / period,
+    starting from the mean of the first `period` values. That gives the ATR, +DI, -DI, DX and
+    ADX in O(1) time and memory per bar.
+
+    +DI = smoothed +DM / ATR * 100
+    -DI = smoothed -DM / ATR * 100
+    DX = |+DI - -DI| / (+DI + -DI) * 100
+    ADX = Wilder smoothing of DX
+
+    Parameters:
+        period (int): The smoothing period. Default is 14.
+        high_prices (list): Initial high prices.
+        low_prices (list): Initial low prices.
+        close_prices (list): Initial close prices.
+        max_history (int): Number of values to keep in adx_values. Default is None, which keeps every value.
+    """
+
+    # Output history, left out of state snapshots
+    history = ('adx_values',)
+
+    def __init__(self, period=14, high_prices=None, low_prices=None, close_prices=None, max_history=None):
+        self.period = period
+        self.previous_high = None
+        self.previous_low = None
+        self.previous_close = None
+        self.bars = 0
+        self.true_range_sum = 0.0
+        self.plus_dm_sum = 0.0
+        self.minus_dm_sum = 0.0
+        self.dx_sum = 0.0
+        self.dx_count = 0
+        self.atr = None
+        self.plus_dm = None
+        self.minus_dm = None
+        self.plus_di = None
+        self.minus_di = None
+        self.dx = None
+        self.adx = None
+        self.adx_values = make_history(max_history)
+        if high_prices is not None:
+            for high, low, close in zip(high_prices, low_prices, close_prices):
+                self.add_data_point(high, low, close)
+
+    def add_data_point(self, high, low, close):
+        """
+        Add a bar and update the smoothed averages.
+
+        Parameters:
+            high (float): The latest high price.
+            low (float): The latest low price.
+            close (float): The latest close price.
+        """
+        if self.previous_close is None:
+            self.previous_high, self.previous_low, self.previous_close = high, low, close
+            return
+
+        true_range = max(high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+        high_movement = high - self.previous_high
+        low_movement = self.previous_low - low
+        plus_dm = high_movement if high_movement > low_movement and high_movement > 0 else 0
+        minus_dm = low_movement if low_movement > high_movement and low_movement > 0 else 0
+        self.previous_high, self.previous_low, self.previous_close = high, low, close
+        self.bars += 1
+
+        period = self.period
+        if self.atr is None:
+            self.true_range_sum += true_range
+            self.plus_dm_sum += plus_dm
+            self.minus_dm_sum += minus_dm
+            if self.bars < period:
+                return
+            self.atr = self.true_range_sum / period
+            self.plus_dm = self.plus_dm_sum / period
+            self.minus_dm = self.minus_dm_sum / period
+        else:
+            self.atr = (self.atr * (period - 1) + true_range) / period
+            self.plus_dm = (self.plus_dm * (period - 1) + plus_dm) / period
+            self.minus_dm = (self.minus_dm * (period - 1) + minus_dm) / period
+        self.calculate()
+
+    def calculate(self):
+        """
+        Calculate +DI, -DI, DX and ADX from the smoothed averages.
+        """
+        if self.atr == 0:
+            self.plus_di, self.minus_di = 0.0, 0.0
+        else:
+            self.plus_di = (self.plus_dm / self.atr) * 100
+            self.minus_di = (self.minus_dm / self.atr) * 100
+        total = self.plus_di + self.minus_di
+        self.dx = abs(self.plus_di - self.minus_di) / total * 100 if total != 0 else 0.0
+
+        period = self.period
+        if self.adx is None:
+            self.dx_sum += self.dx
+            self.dx_count += 1
+            if self.dx_count < period:
+                return
+            self.adx = self.dx_sum / period
+        else:
+            self.adx = (self.adx * (period - 1) + self.dx) / period
+        self.adx_values.append(self.adx)
+
+    def add_data_points(self, high_prices, low_prices, close_prices):
+        """
+        Add several bars at once, ending in the same state as adding them one at a time.
+
+        Once the ADX is available, the true ranges, directional movements, +DI, -DI and DX of the
+        chunk are computed together, and only the Wilder recursions run bar by bar.
+
+        Parameters:
+            high_prices (list or numpy array): The new high prices in chronological order.
+            low_prices (list or numpy array): The new low prices.
+            close_prices (list or numpy array): The new close prices.
+
+        Returns:
+            tuple: The ATR, +DI, -DI, DX and ADX after each new bar, NaN while they are not available.
+        """
+        high_prices = np.asarray(high_prices, dtype=float)
+        low_prices = np.asarray(low_prices, dtype=float)
+        close_prices = np.asarray(close_prices, dtype=float)
+        values = np.full((5, len(close_prices)), np.nan)
+        start = 0
+        while start < len(close_prices) and self.adx is None:
+            self.add_data_point(high_prices[start], low_prices[start], close_prices[start])
+            for row, value in enumerate((self.atr, self.plus_di, self.minus_di, self.dx, self.adx)):
+                if value is not None:
+                    values[row, start] = value
+            start += 1
+        high, low, close = high_prices[start:], low_prices[start:], close_prices[start:]
+        if len(close) == 0:
+            return tuple(values)
+
+        previous_high = np.concatenate(([self.previous_high], high[:-1]))
+        previous_low = np.concatenate(([self.previous_low], low[:-1]))
+        previous_close = np.concatenate(([self.previous_close], close[:-1]))
+        true_range = np.maximum(np.maximum(high - low, np.abs(high - previous_close)), np.abs(low - previous_close))
+        high_movement = high - previous_high
+        low_movement = previous_low - low
+        plus_dm = np.where((high_movement > low_movement) & (high_movement > 0), high_movement, 0)
+        minus_dm = np.where((low_movement > high_movement) & (low_movement > 0), low_movement, 0)
+
+        period = self.period
+        atr = batch.wilder_average(true_range, period, initial=self.atr)
+        plus_average = batch.wilder_average(plus_dm, period, initial=self.plus_dm)
+        minus_average = batch.wilder_average(minus_dm, period, initial=self.minus_dm)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = np.where(atr == 0, 0.0, (plus_average / atr) * 100)
+            minus_di = np.where(atr == 0, 0.0, (minus_average / atr) * 100)
+            total = plus_di + minus_di
+            dx = np.where(total == 0, 0.0, np.abs(plus_di - minus_di) / total * 100)
+        adx = batch.wilder_average(dx, period, initial=self.adx)
+
+        self.previous_high, self.previous_low, self.previous_close = float(high[-1]), float(low[-1]), float(close[-1])
+        self.bars += len(close)
+        self.atr, self.plus_dm, self.minus_dm = float(atr[-1]), float(plus_average[-1]), float(minus_average[-1])
+        self.plus_di, self.minus_di, self.dx, self.adx = float(plus_di[-1]), float(minus_di[-1]), float(dx[-1]), float(adx[-1])
+        self.adx_values.extend(adx.tolist())
+        values[:, start:] = atr, plus_di, minus_di, dx, adx
+        return tuple(values)
+
+    def get_atr(self):
+        """
+        Returns:
+            float: The Wilder-smoothed Average True Range.
+        """
+        return self.atr
+
+    def get_plus_di(self):
+        """
+        Returns:
+            float: The positive directional index (+DI).
+        """
+        return self.plus_di
+
+    def get_minus_di(self):
+        """
+        Returns:
+            float: The negative directional index (-DI).
+        """
+        return self.minus_di
+
+    def get_dx(self):
+        """
+        Returns:
+            float: The directional movement index (DX).
+        """
+        return self.dx
+
+    def get_adx(self):
+        """
+        Returns:
+            float: The average directional index (ADX).
+        """
+        return self.adx
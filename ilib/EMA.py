@@ -1,74 +1,122 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from . import batch, plotting
 
 class EMA:
-    def __init__(self, window, data=None):
+    @property
+    def history(self):
+        """tuple: The output history, left out of state snapshots. The data is only needed until the first EMA."""
+        return ('ema_values',) if self.ema is None else ('ema_values', 'data')
+
+    def __init__(self, window, data=None, streaming=False):
         """
         Initialize the EMA class with given data and window size.
         
         Parameters:
             data (list or numpy array): The input data for which EMA needs to be calculated.
             window (int): The size of the window for calculating EMA.
+            streaming (bool, optional): Keep only the last EMA value instead of the full data and EMA history. Default is False.
         """
         self.ema = None
         self.ema_values = []
-        if data is None:
-            data = []
-        else :
-            self.data = data
+        self.streaming = streaming
+        self.data = [] if data is None else list(data)
         self.window = window
-        if len(data) > window:
+        if len(self.data) > window:
             self.calculate()
     
     def calculate(self, alpha=0.2):
         """
-        Calculate the Exponential Moving Average (EMA) with the given alpha (smoothing factor).
+        Calculate the Exponential Moving Average (EMA) over the whole data with the given alpha (smoothing factor).
+        
+        Parameters:
+            alpha (float, optional): The smoothing factor. Default is 0.2.
+        
+        Returns:
+            null: The latest EMA is stored in the ema attribute and the history in ema_values.
+        """
+        ema_values = batch.exponential_average(self.data, alpha)
+        self.ema = float(ema_values[-1])
+        if self.streaming:
+            self.data = []
+            self.ema_values = []
+        else:
+            self.ema_values = [float(value) for value in ema_values]
+    
+    def update(self, new_data_point, alpha=0.2):
+        """
+        Advance the EMA by one data point using only the previous EMA value.
         
         Parameters:
+            new_data_point (float or int): The new data point.
             alpha (float, optional): The smoothing factor. Default is 0.2.
         
         Returns:
-            numpy array: The calculated EMA values.
-        """
-        data = np.array(self.data)
-        self.ema = [data[0]]  # EMA for the first data point is the same as the data point itself
-        for i in range(1, len(data)):
-            ema = (alpha * data[i]) + ((1 - alpha) * self.ema[-1])
-            self.ema.append(ema)
-        self.ema = np.array(self.ema)
+            float: The updated EMA value.
+        """
+        self.ema = (alpha * new_data_point) + ((1 - alpha) * self.ema)
+        return self.ema
     
     def add_data_point(self, new_data_point, alpha=0.2):
         """
-        Add a new data point to the existing data and recalculate the EMA.
+        Add a new data point to the existing data and update the EMA.
+        
+        Until more than `window` data points have been seen the data is buffered; after that each
+        new data point is applied to the previous EMA value in constant time.
         
         Parameters:
             new_data_point (float or int): The new data point to be added.
             alpha (float, optional): The smoothing factor. Default is 0.2.
         """
-        self.data.append(new_data_point)
-        if self.ema is not None:
+        if self.ema is None:
+            self.data.append(new_data_point)
+            if len(self.data) > self.window:
+                self.calculate(alpha)
+            return
+        self.update(new_data_point, alpha)
+        if not self.streaming:
+            self.data.append(new_data_point)
+            self.ema_values.append(self.ema)
+
+    def add_data_points(self, data_points, alpha=0.2):
+        """
+        Add several data points at once, ending in the same state as adding them one at a time.
+
+        Once the EMA is available the whole chunk is applied to the previous EMA value in a single
+        call to batch.exponential_average.
+
+        Parameters:
+            data_points (list or numpy array): The new data points in chronological order.
+            alpha (float, optional): The smoothing factor. Default is 0.2.
+        """
+        data_points = np.asarray(data_points, dtype=float).tolist()
+        if self.ema is None:
+            needed = self.window + 1 - len(self.data)
+            self.data.extend(data_points[:needed])
+            data_points = data_points[needed:]
+            if len(self.data) <= self.window:
+                return
             self.calculate(alpha)
+        if not data_points:
+            return
+        ema_values = batch.exponential_average(data_points, alpha, initial=self.ema)
+        self.ema = float(ema_values[-1])
+        if not self.streaming:
+            self.data.extend(data_points)
+            self.ema_values.extend(ema_values.tolist())
 
     def get_EMA(self):
         """
         Returns:
-            numpy array: The calculated EMA values.
+            float: The current EMA value.
         """
-        return self.ema[-1]
+        return self.ema
     
     def plot_show(self):
         """
         Plot the EMA values calculated.
         """
-        plt.plot(self.ema, label='EMA')
-        plt.plot(self.data, label='Data')
-        plt.legend(loc = 'upper left')
-        plt.ylabel('EMA Values')
-        plt.xlabel
-        plt.title('EMA Chart - {} Period'.format(str(self.window)))
-        plt.show()
-        return
-    
+        plotting.show(plotting.draw_ema, self)
+
     def plot_save(self, filename):
         """
         Plot the EMA values calculated and save the plot to a file.
@@ -76,11 +124,4 @@ class EMA:
         Parameters:
             filename (str): The name of the file to save the plot to.
         """
-        plt.plot(self.ema, label='EMA')
-        plt.plot(self.data, label='Data')
-        plt.legend(loc = 'upper left')
-        plt.ylabel('EMA Values')
-        plt.xlabel
-        plt.title('EMA Chart - {} Period'.format(str(self.window)))
-        plt.savefig(filename)
-        return
+        plotting.save(plotting.draw_ema, self, filename)
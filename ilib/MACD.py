@@ -1,40 +1,56 @@
 import numpy as np
 
-class MACD:
+from . import batch
+from .lazy import LazyUpdates
+
+class MACD(LazyUpdates):
     """
     Initialize the MACD class with given data, short-term period, long-term period, and signal period.
-    
+
     Parameters:
         data (list or numpy array): The input data for which MACD needs to be calculated.
         short_period (int, optional): The short-term period. Default is 12.
         long_period (int, optional): The long-term period. Default is 26.
         signal_period (int, optional): The signal period. Default is 9.
+        streaming (bool, optional): Keep only the last short, long and signal EMA values instead of the full data and line history. Default is False.
+        lazy (bool, optional): Only record new data points, and apply them all at once on the next getter call. Default is False.
     """
-    def __init__(self, short_period=12, long_period=26, signal_period=9, data=[]):
+    @property
+    def history(self):
+        """tuple: The output history, left out of state snapshots. The data is only needed until the first EMAs."""
+        return () if self.short_ema is None else ('data', 'macd_line', 'signal_line', 'macd_histogram')
+
+    def __init__(self, short_period=12, long_period=26, signal_period=9, data=[], streaming=False, lazy=False):
         self.short_period = short_period
         self.long_period = long_period
         self.signal_period = signal_period
-        self.data = np.array(data)
-        if len(data) >= long_period:
+        self.streaming = streaming
+        self.data = list(data)
+        self.short_ema = None
+        self.long_ema = None
+        self.signal_ema = None
+        self.macd_line = None
+        self.signal_line = None
+        self.macd_histogram = None
+        if len(self.data) >= long_period:
             self.calculate_macd()
-        else:
-            self.macd_line = None
-            self.signal_line = None
-            self.macd_histogram = None
-        
+        self.set_lazy(lazy, 1)
+
 
     def calculate_macd(self):
         """
-        Calculate the MACD line, signal line, and MACD histogram.
-        
+        Calculate the MACD line, signal line, and MACD histogram over the whole data.
+
         Returns:
             null: The calculated MACD line, signal line, and MACD histogram are stored in the class variables.
         """
+        data = np.array(self.data, dtype=float)
+
         # Calculate the short-term exponential moving average (EMA)
-        short_ema = self.calculate_ema(self.data, self.short_period)
+        short_ema = self.calculate_ema(data, self.short_period)
 
         # Calculate the long-term exponential moving average (EMA)
-        long_ema = self.calculate_ema(self.data, self.long_period)
+        long_ema = self.calculate_ema(data, self.long_period)
 
         # Calculate the MACD line
         macd_line = short_ema - long_ema
@@ -45,45 +61,125 @@ class MACD:
         # Calculate the MACD histogram
         macd_histogram = macd_line - signal_line
 
-        self.macd_line, self.signal_line, self.macd_histogram = macd_line, signal_line, macd_histogram
+        # Keep the recursive state so later data points can be applied in constant time
+        self.short_ema, self.long_ema, self.signal_ema = float(short_ema[-1]), float(long_ema[-1]), float(signal_line[-1])
+
+        if self.streaming:
+            self.data = []
+            self.macd_line, self.signal_line, self.macd_histogram = [macd_line[-1]], [signal_line[-1]], [macd_histogram[-1]]
+        else:
+            self.macd_line, self.signal_line, self.macd_histogram = macd_line.tolist(), signal_line.tolist(), macd_histogram.tolist()
 
     def calculate_ema(self,prices, period):
         """
         Calculate the Exponential Moving Average (EMA) with the given alpha (smoothing factor).
-        
+
         Parameters:
             prices (list or numpy array): The input data for which EMA needs to be calculated.
             period (int): The size of the window for calculating EMA.
-            
+
             Returns:
                 numpy array: The calculated EMA values.
         """
-        ema = np.zeros_like(prices)
-        ema[0] = prices[0]
-        alpha = 2 / (period + 1)
+        return batch.exponential_average(prices, 2 / (period + 1))
+
+    def update_ema(self, previous, value, period):
+        """
+        Advance an Exponential Moving Average (EMA) by one value.
+
+        Parameters:
+            previous (float): The previous EMA value.
+            value (float): The new value.
+            period (int): The size of the window for calculating EMA.
 
-        for i in range(1, len(prices)):
-            ema[i] = alpha * prices[i] + (1 - alpha) * ema[i - 1]
+        Returns:
+            float: The updated EMA value.
+        """
+        alpha = 2 / (period + 1)
+        return alpha * value + (1 - alpha) * previous
 
-        return ema
-    
     def add_data_point(self, data_point):
         """
-        Add a new data point to the existing data and recalculate the MACD line, signal line, and MACD histogram.
-        
+        Add a new data point to the existing data and update the MACD line, signal line, and MACD histogram.
+
+        Until `long_period` data points have been seen the data is buffered; after that each new data
+        point is applied to the previous short, long and signal EMA values in constant time.
+
         Parameters:
             data_point (float or int): The new data point to be added.
         """
-        np.append(self.data, data_point)
-        if len(self.data) > self.long_period:
-            self.calculate_macd()    
-    
+        if self.pending is not None:
+            self.defer(data_point)
+            return
+        if self.short_ema is None:
+            self.data.append(data_point)
+            if len(self.data) >= self.long_period:
+                self.calculate_macd()
+            return
+
+        self.short_ema = self.update_ema(self.short_ema, data_point, self.short_period)
+        self.long_ema = self.update_ema(self.long_ema, data_point, self.long_period)
+        macd = self.short_ema - self.long_ema
+        self.signal_ema = self.update_ema(self.signal_ema, macd, self.signal_period)
+        histogram = macd - self.signal_ema
+
+        if self.streaming:
+            self.macd_line[-1], self.signal_line[-1], self.macd_histogram[-1] = macd, self.signal_ema, histogram
+        else:
+            self.data.append(data_point)
+            self.macd_line.append(macd)
+            self.signal_line.append(self.signal_ema)
+            self.macd_histogram.append(histogram)
+
+    def add_data_points(self, data_points):
+        """
+        Add several data points at once, ending in the same state as adding them one at a time.
+
+        Once `long_period` data points have been seen the chunk is applied to the previous short,
+        long and signal EMA values with batch.exponential_average.
+
+        Parameters:
+            data_points (list or numpy array): The new data points in chronological order.
+        """
+        if self.pending is not None:
+            self.defer_many(data_points)
+            return
+        data_points = np.asarray(data_points, dtype=float).tolist()
+        if self.short_ema is None:
+            needed = self.long_period - len(self.data)
+            self.data.extend(data_points[:needed])
+            data_points = data_points[needed:]
+            if len(self.data) < self.long_period:
+                return
+            self.calculate_macd()
+        if not data_points:
+            return
+
+        short_ema = batch.exponential_average(data_points, 2 / (self.short_period + 1), initial=self.short_ema)
+        long_ema = batch.exponential_average(data_points, 2 / (self.long_period + 1), initial=self.long_ema)
+        macd = short_ema - long_ema
+        signal = batch.exponential_average(macd, 2 / (self.signal_period + 1), initial=self.signal_ema)
+        histogram = macd - signal
+        self.short_ema, self.long_ema, self.signal_ema = float(short_ema[-1]), float(long_ema[-1]), float(signal[-1])
+
+        if self.streaming:
+            self.macd_line[-1], self.signal_line[-1], self.macd_histogram[-1] = float(macd[-1]), float(signal[-1]), float(histogram[-1])
+        else:
+            self.data.extend(data_points)
+            self.macd_line.extend(macd.tolist())
+            self.signal_line.extend(signal.tolist())
+            self.macd_histogram.extend(histogram.tolist())
+
     def get_lines(self):
         """
         Returns:
-            tuple: The calculated MACD line, signal line, and MACD histogram.
+            tuple: The calculated MACD line, signal line, and MACD histogram, or (None, None, None)
+                until `long_period` data points have been seen.
         """
+        self.catch_up()
+        if self.macd_line is None:
+            return (None, None, None)
         return self.macd_line[-1], self.signal_line[-1], self.macd_histogram[-1]
-    
-        
-        
+
+
+
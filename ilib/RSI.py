@@ -1,6 +1,10 @@
-import matplotlib.pyplot as plt
+import numpy as np
 
-class RSI:
+from . import batch, plotting
+from .buffers import RingBuffer, make_history
+from .lazy import LazyUpdates
+
+class RSI(LazyUpdates):
     
     """
     Calculates the Relative Strength Index (RSI) of a stock based on its historical price data.
@@ -8,27 +12,50 @@ class RSI:
     Parameters:
     period (int): Number of periods to use for RSI calculation. Default is 14.
     data (list): A list of the stock prices in chronological order, with the most recent price last.
+    max_history (int): Number of RSI values to keep in rsi_values. Default is None, which keeps every value.
+    method (str): How the average gain and loss are smoothed. 'sma' (default) averages the last `period` changes,
+        'wilder' carries the averages forward with Wilder smoothing in constant time per data point.
+    lazy (bool): Only record new data points, and apply them all at once on the next getter call. Default is False.
+
+    Only the last period + 1 prices are kept in data.
     
     Returns:
     rsi (float): The RSI of the stock.
     """
     
-    def __init__(self, period=14, data=None):
+    # Output history, left out of state snapshots
+    history = ('rsi_values',)
+
+    def __init__(self, period=14, data=None, max_history=None, method='sma', lazy=False):
+        if method not in ('sma', 'wilder'):
+            raise ValueError("method must be 'sma' or 'wilder'.")
         self.period = period
+        self.method = method
         self.rsi = None
+        self.avg_gain = None
+        self.avg_loss = None
         
-        self.rsi_values = []
+        self.rsi_values = make_history(max_history)
 
         if data is None:
-            self.data = []
+            self.data = RingBuffer(self.period + 1)
         else:
-            self.data = data
-            if len(self.data) > self.period:
-                self.calculate_rsi()
+            self.data = RingBuffer(self.period + 1, data)
+            if len(data) > self.period:
+                if self.method == 'wilder':
+                    # The Wilder averages depend on every price, not only the ones kept in data
+                    changes = batch.price_changes(data)
+                    avg_gain = batch.wilder_average(changes[0], self.period)
+                    avg_loss = batch.wilder_average(changes[1], self.period)
+                    self.avg_gain, self.avg_loss = float(avg_gain[-1]), float(avg_loss[-1])
+                    self.update_rsi()
+                else:
+                    self.calculate_rsi()
+        self.set_lazy(lazy, 1)
 
     def calculate_rsi(self):
         """
-        Calculate the RSI of the stock based on its historical price data.
+        Calculate the RSI of the stock from the average gain and loss of the last `period` price changes.
         """
         if len(self.data) <= self.period:
             raise ValueError("Insufficient data to calculate RSI.")
@@ -37,7 +64,6 @@ class RSI:
         losses = []
         
         for i in range(len(self.data)-self.period , len(self.data)):
-            print(i)
             price_diff = self.data[i] - self.data[i - 1]
             if price_diff > 0:
                 gains.append(price_diff)
@@ -49,22 +75,21 @@ class RSI:
                 gains.append(0)
                 losses.append(0)
 
-        try:
-            avg_gain = sum(gains) / self.period
-        except ZeroDivisionError:
-            avg_gain = 0
-        
-        try:
-            avg_loss = sum(losses) / self.period
-        except ZeroDivisionError:
-            avg_loss = 0
+        self.avg_gain = sum(gains) / self.period
+        self.avg_loss = sum(losses) / self.period
+        self.update_rsi()
+        return
 
-        if avg_loss == 0:
+    def update_rsi(self):
+        """
+        Calculate the RSI from the current average gain and loss.
+        """
+        if self.avg_loss == 0:
             self.rsi = 100
             self.rsi_values.append(100)
             return
 
-        rs = avg_gain / avg_loss
+        rs = self.avg_gain / self.avg_loss
         rsi = 100 - (100 / (1 + rs))
         self.rsi = rsi
         self.rsi_values.append(rsi)
@@ -73,38 +98,94 @@ class RSI:
     def add_data_point(self, value):
         """
         Add a new price to the data list and calculate the new RSI.
+
+        With method='wilder' the averages are advanced with the latest price change only.
         """
+        if self.pending is not None:
+            self.defer(value)
+            return
         self.data.append(value)
-        if(len(self.data) > self.period):
+        if len(self.data) <= self.period:
+            return
+        if self.method == 'wilder' and self.avg_gain is not None:
+            price_diff = self.data[-1] - self.data[-2]
+            gain = price_diff if price_diff > 0 else 0
+            loss = -price_diff if price_diff < 0 else 0
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+            self.update_rsi()
+        else:
             self.calculate_rsi()
         return
         
+    def add_data_points(self, values):
+        """
+        Add several prices at once, ending in the same state as adding them one at a time.
+
+        Prices are added one at a time until the first RSI, after which the rest of the chunk is
+        handled with vectorized price changes and window sums ('sma') or one Wilder pass ('wilder').
+
+        Parameters:
+            values (list or numpy array): The new prices in chronological order.
+
+        In lazy mode the pending prices are applied together with these, since the RSI of each
+        new price is returned.
+
+        Returns:
+            numpy array: The RSI after each new price, NaN before the first RSI.
+        """
+        values = np.asarray(values, dtype=float)
+        if self.pending is not None:
+            pending = len(self.pending[0])
+            self.defer_many(values)
+            rsi_values = self.catch_up()
+            return np.empty(0) if rsi_values is None else rsi_values[pending:]
+        rsi_values = np.full(len(values), np.nan)
+        start = 0
+        while start < len(values) and not (self.data.full and (self.method == 'sma' or self.avg_gain is not None)):
+            self.add_data_point(values[start])
+            if self.rsi is not None:
+                rsi_values[start] = self.rsi
+            start += 1
+        values = values[start:]
+        if len(values) == 0:
+            return rsi_values
+
+        if self.method == 'wilder':
+            gains, losses = batch.price_changes(np.concatenate(([self.data[-1]], values)))
+            avg_gain = batch.wilder_average(gains, self.period, initial=self.avg_gain)
+            avg_loss = batch.wilder_average(losses, self.period, initial=self.avg_loss)
+        else:
+            # The windows of `period` changes ending at each new price
+            gains, losses = batch.price_changes(np.concatenate((self.data.to_array(), values)))
+            avg_gain = batch.sequential_window_sum(gains, self.period)[1:] / self.period
+            avg_loss = batch.sequential_window_sum(losses, self.period)[1:] / self.period
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+
+        self.data.extend(values)
+        self.avg_gain, self.avg_loss = float(avg_gain[-1]), float(avg_loss[-1])
+        self.rsi = 100 if self.avg_loss == 0 else float(rsi[-1])
+        self.rsi_values.extend(rsi.tolist())
+        rsi_values[start:] = rsi
+        return rsi_values
+
     def get_rsi(self):
         """
         Return the current RSI value."""
+        self.catch_up()
         return self.rsi
     
     def plot_show(self):
         """
         Plot the RSI values over time.
         """
-        plt.plot(self.rsi_values)
-        plt.ylabel('RSI Values')
-        plt.xlabel('Current Calculation')
-        plt.title('RSI Chart')
-        plt.show()
-        return
-        
+        self.catch_up()
+        plotting.show(plotting.draw_rsi, self)
+
     def plot_save(self, filename):
         """
         Save the RSI values over time to a file.
         """
-        plt.plot(self.rsi_values, label='RSI')
-        plt.plot(self.data, label='Data')
-        plt.legend(loc = 'upper left')
-        plt.ylabel('RSI Values')
-        plt.xlabel('Current Calculation')
-        plt.title('RSI Chart')
-        plt.savefig(filename)
-        plt.close()
-        return
\ No newline at end of file
+        self.catch_up()
+        plotting.save(plotting.draw_rsi, self, filename)
@@ -1,77 +1,143 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 
-class SMA:
+from . import batch, plotting
+from .buffers import RingBuffer, make_history
+from .lazy import LazyUpdates
+
+class SMA(LazyUpdates):
     """
     Initialize the SMA class with given data and period.
+
+    The SMA is updated in constant time per data point from a running sum of the last `period`
+    values. The sum is recalculated from the window every `period` data points so rounding errors
+    cannot build up.
     
     Parameters:
         data (list or numpy array): The input data for which SMA needs to be calculated.
         period (int): The period for which SMA needs to be calculated.
+        max_history (int, optional): Number of SMA values to keep in sma_values. Default is None, which keeps every value.
+        lazy (bool, optional): Only record new data points, and apply them all at once on the next getter call. Default is False.
     """
     
-    def __init__(self, data, period):
+    # Output history, left out of state snapshots
+    history = ('sma_values',)
+
+    def __init__(self, data, period, max_history=None, lazy=False):
         self.sma = None
-        self.data = pd.Series(data)
         self.period = period
-        self.sma_values = []
-        if len(self.data) > self.period:
-            self.calculate()
+        self.data = RingBuffer(period, data)
+        self.window_sum = 0.0
+        self.updates = 0
+        self.sma_values = make_history(max_history)
+        if data is not None and len(data) >= self.period:
+            self.sma_values.extend(batch.sma(data, period)[period - 1:])
+        self.calculate()
+        self.set_lazy(lazy, 1)
         
     def calculate(self):
         """
-        Calculate the Simple Moving Average (SMA).
+        Recalculate the running sum from the values in the window and update the Simple Moving Average (SMA).
         """
-        sma = self.data.rolling(self.period).mean()
-        self.sma = sma.iloc[self.period-1:]
-        self.sma_values = sma
+        self.window_sum = float(sum(self.data))
+        if self.data.full:
+            self.sma = self.window_sum / self.period
         return
         
     def add_data_point(self, data_point):
         """
-        Add a new data point to the existing data and recalculate the SMA.
+        Add a new data point to the existing data and update the SMA.
         
         Parameters:
             data_point (float or int): The new data point to be added.
         """
-        listTemp = self.data.values.tolist()
-        listTemp.append(data_point)
-        self.data = pd.Series(listTemp)
-        if len(self.data) > self.period:
+        if self.pending is not None:
+            self.defer(data_point)
+            return
+        if self.data.full:
+            self.window_sum -= self.data[0]
+        self.data.append(data_point)
+        self.window_sum += data_point
+        if not self.data.full:
+            return
+        self.updates += 1
+        if self.updates % self.period == 0:
             self.calculate()
+        else:
+            self.sma = float(self.window_sum / self.period)
+        self.sma_values.append(self.sma)
         return
                     
+    def add_data_points(self, data_points):
+        """
+        Add several data points at once, ending in the same state as adding them one at a time.
+
+        Between the recalculations every `period` data points, the running sum is advanced by the
+        interleaved removed and added values with one cumulative sum, which rounds exactly like
+        the one-at-a-time updates.
+
+        Parameters:
+            data_points (list or numpy array): The new data points in chronological order.
+        """
+        if self.pending is not None:
+            self.defer_many(data_points)
+            return
+        data_points = np.asarray(data_points, dtype=float)
+        start = 0
+        while start < len(data_points) and not self.data.full:
+            self.add_data_point(data_points[start])
+            start += 1
+        data_points = data_points[start:]
+        count = len(data_points)
+        if count == 0:
+            return
+
+        period = self.period
+        # values[i] leaves the window when values[i + period] is added
+        values = np.concatenate((self.data.to_array(), data_points))
+        sma = np.empty(count)
+        window_sum = self.window_sum
+        step = 0
+        while step < count:
+            # Steps before the next recalculation
+            stop = min(step + period - 1 - self.updates % period, count)
+            changes = np.empty(2 * (stop - step))
+            changes[0::2] = -values[step:stop]
+            changes[1::2] = values[step + period:stop + period]
+            sums = np.add.accumulate(np.concatenate(([window_sum], changes)))[2::2]
+            sma[step:stop] = sums / period
+            self.updates += stop - step
+            if len(sums):
+                window_sum = sums[-1]
+            step = stop
+            if step < count:
+                window_sum = float(sum(values[step + 1:step + 1 + period]))
+                sma[step] = window_sum / period
+                self.updates += 1
+                step += 1
+
+        self.data.extend(data_points)
+        self.window_sum = float(window_sum)
+        self.sma = float(sma[-1])
+        self.sma_values.extend(sma.tolist())
+
     def get_smavalue(self):
         """
         Returns:
             float: The calculated SMA value.
         """
-        return self.sma.iloc[-1]
+        self.catch_up()
+        return self.sma
     
     def plot_show(self):
         """
         Plot the SMA values calculated.
         """
-        plt.plot(self.sma_values.values, label='SMA')
-        plt.plot(self.data.values, label='Data')
-        plt.legend(loc = 'upper left')
-        plt.ylabel('SMA Values')
-        plt.xlabel
-        plt.title('SMA Chart - {} Period'.format(str(self.period)))
-        plt.show()
-        return
-        
+        self.catch_up()
+        plotting.show(plotting.draw_sma, self)
+
     def plot_save(self, filename):
         """
         Save the SMA values calculated to a file.
         """
-        plt.plot(self.sma_values.values, label='SMA')
-        plt.plot(self.data.values, label='Data')
-        plt.legend(loc = 'upper left')
-        plt.ylabel('SMA Values')
-        plt.xlabel
-        plt.title('SMA Chart - {} Period'.format(str(self.period)))
-        plt.savefig(filename)
-        plt.close()
-        return
-            
+        self.catch_up()
+        plotting.save(plotting.draw_sma, self, filename)
@@ -1,4 +1,8 @@
-import matplotlib.pyplot as plt
+import numpy as np
+
+from . import batch, plotting
+from .buffers import RingBuffer, make_history
+from .rolling import RollingMax, RollingMin, rolling_max, rolling_min
 
 class STOCHOSCILLATOR:
     """
@@ -6,37 +10,53 @@ class STOCHOSCILLATOR:
     
     Formula:
     %K = (Current Close - Lowest Low)/(Highest High - Lowest Low) * 100
-    %D = 3-day SMA of %K
+    %D = `smoothing_period` SMA of %K
+
+    The highest high and lowest low of the last `period` bars are tracked with monotonic deques,
+    so each bar costs amortized O(1). Only the last `period` prices are kept.
+    Pass max_history to also cap stoch_values and smoothed_values.
     """
-    def __init__(self, period, smoothing_period, oversold_threshold, overbought_threshold,high_prices=None, low_prices=None, close_prices=None):
+
+    # Output history, left out of state snapshots
+    history = ('stoch_values', 'smoothed_values')
+
+    def __init__(self, period, smoothing_period, oversold_threshold, overbought_threshold,high_prices=None, low_prices=None, close_prices=None, max_history=None):
         self.stoch = None
         self.smoothed = None
         self.period = period
         self.smoothing_period = smoothing_period
         self.oversold_threshold = oversold_threshold
         self.overbought_threshold = overbought_threshold
-        self.high_prices = high_prices if high_prices is not None else []
-        self.low_prices = low_prices if low_prices is not None else []
-        self.close_prices = close_prices if close_prices is not None else []
-        self.stoch_values = []
-        self.smoothed_values = []
-        if len(self.high_prices) > self.period and len(self.low_prices) > self.period and len(self.close_prices) > self.period:
+        self.high_prices = RingBuffer(period, high_prices)
+        self.low_prices = RingBuffer(period, low_prices)
+        self.close_prices = RingBuffer(period, close_prices)
+        self.highest_high = RollingMax(period)
+        self.lowest_low = RollingMin(period)
+        for high in self.high_prices:
+            self.highest_high.append(high)
+        for low in self.low_prices:
+            self.lowest_low.append(low)
+        self.recent_stoch = RingBuffer(smoothing_period)
+        self.stoch_values = make_history(max_history)
+        self.smoothed_values = make_history(max_history, dtype=object)
+        if len(self.high_prices) >= self.period and len(self.low_prices) >= self.period and len(self.close_prices) >= self.period:
             self.calculate()
 
 
     def calculate(self):
         """
-        Calculates the stochastic oscillator.
+        Calculates the stochastic oscillator over the last `period` bars.
         """
         if len(self.high_prices) < self.period:
             return None
-        highest_high = max(self.high_prices)
-        lowest_low = min(self.low_prices)
+        highest_high = self.highest_high.value
+        lowest_low = self.lowest_low.value
         latest_close = self.close_prices[-1]
         stochastic_value = (latest_close - lowest_low) / (highest_high - lowest_low) * 100
 
-        if len(self.close_prices) >= self.smoothing_period:
-            smoothed_stochastic = sum(self.close_prices[-self.smoothing_period:]) / self.smoothing_period
+        self.recent_stoch.append(stochastic_value)
+        if self.recent_stoch.full:
+            smoothed_stochastic = sum(self.recent_stoch) / self.smoothing_period
         else:
             smoothed_stochastic = None
 
@@ -63,9 +83,51 @@ class STOCHOSCILLATOR:
         self.high_prices.append(high)
         self.low_prices.append(low)
         self.close_prices.append(close)
-        if len(self.high_prices) > self.period:
+        self.highest_high.append(high)
+        self.lowest_low.append(low)
+        if len(self.high_prices) >= self.period:
             self.calculate()
     
+    def add_data_points(self, high_prices, low_prices, close_prices):
+        """
+        Adds several bars at once, ending in the same state as adding them one at a time.
+
+        Once `period` bars have been seen, the highest highs and lowest lows of the chunk come
+        from rolling_max and rolling_min and %K and %D are computed for every bar together.
+        """
+        high_prices = np.asarray(high_prices, dtype=float)
+        low_prices = np.asarray(low_prices, dtype=float)
+        close_prices = np.asarray(close_prices, dtype=float)
+        start = 0
+        while start < len(close_prices) and not self.high_prices.full:
+            self.add_data_point(high_prices[start], low_prices[start], close_prices[start])
+            start += 1
+        high_prices, low_prices, close_prices = high_prices[start:], low_prices[start:], close_prices[start:]
+        if len(close_prices) == 0:
+            return
+
+        highest_high = rolling_max(np.concatenate((self.high_prices.to_array(), high_prices)), self.period)[self.period:]
+        lowest_low = rolling_min(np.concatenate((self.low_prices.to_array(), low_prices)), self.period)[self.period:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoch = (close_prices - lowest_low) / (highest_high - lowest_low) * 100
+
+        # The smoothed value of each new %K, once `smoothing_period` of them have been seen
+        recent = np.concatenate((self.recent_stoch.to_array(), stoch))
+        sums = batch.sequential_window_sum(recent, self.smoothing_period) / self.smoothing_period
+        smoothed = [None] * len(stoch)
+        first = max(self.smoothing_period - 1 - len(self.recent_stoch), 0)
+        smoothed[first:] = sums[len(sums) - len(stoch) + first:].tolist()
+
+        self.high_prices.extend(high_prices)
+        self.low_prices.extend(low_prices)
+        self.close_prices.extend(close_prices)
+        self.highest_high.extend(high_prices)
+        self.lowest_low.extend(low_prices)
+        self.recent_stoch.extend(stoch)
+        self.stoch, self.smoothed = float(stoch[-1]), smoothed[-1]
+        self.stoch_values.extend(stoch.tolist())
+        self.smoothed_values.extend(smoothed)
+
     def get_stoch(self):
         """
         Returns the stochastic oscillator.
@@ -82,34 +144,10 @@ class STOCHOSCILLATOR:
         """
         Plots the stochastic oscillator.
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
-        ax1.set_title('Stock Prices')
-        ax1.plot(self.high_prices, label='High Price')
-        ax1.plot(self.low_prices, label='Low Price')
-        ax1.plot(self.close_prices, label='Close Price')
-        ax1.legend(loc='upper left')
-        ax2.set_title('Stoch - {} Period - {} Smoothing Period'.format(self.period, self.smoothing_period))
-        ax2.plot(self.stoch_values, label='Stoch')
-        ax2.plot(self.smoothed_values, label='Smoothed')
-        ax2.legend(loc='upper left')
-        plt.tight_layout()
-        plt.show()
-        return
+        plotting.show(plotting.draw_stoch, self)
 
     def plot_save(self, path):
         """
         Saves the stochastic oscillator plot to the path.
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
-        ax1.set_title('Stock Prices')
-        ax1.plot(self.high_prices, label='High Price')
-        ax1.plot(self.low_prices, label='Low Price')
-        ax1.plot(self.close_prices, label='Close Price')
-        ax1.legend(loc='upper left')
-        ax2.set_title('Stoch - {} Period - {} Smoothing Period'.format(self.period, self.smoothing_period))
-        ax2.plot(self.stoch_values, label='Stoch')
-        ax2.plot(self.smoothed_values, label='Smoothed')
-        ax2.legend(loc='upper left')
-        plt.tight_layout()
-        plt.savefig(path)
-        return
\ No newline at end of file
+        plotting.save(plotting.draw_stoch, self, path)
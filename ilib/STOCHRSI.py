@@ -1,52 +1,77 @@
+import math
+
 import numpy as np
-import matplotlib.pyplot as plt
+
+from . import batch, plotting
+from .RSI import RSI
+from .buffers import RingBuffer, make_history
+from .rolling import RollingMax, RollingMin, rolling_max, rolling_min
 
 class StochRSICalculator:
     """
     StochRSICalculator is a class that calculates the Stochastic RSI (StochRSI) indicator.
 
+    The RSI is Wilder smoothed and carried forward from its average gain and loss, and the
+    highest and lowest of the last `k_period` RSI values are tracked with monotonic deques,
+    so each price costs O(1) time and memory.
+
+    %K = (RSI - Lowest RSI)/(Highest RSI - Lowest RSI) over the last `k_period` RSI values
+    %D = `period` SMA of %K
+
     Args:
-        period (int): The number of data points to consider for calculating the StochRSI.
+        period (int): The number of %K values averaged into %D.
         rsi_period (int): The number of data points to consider for calculating the RSI.
-        k_period (int): The number of data points to consider for calculating the StochRSI %K value.
+        k_period (int): The number of RSI values to consider for calculating the StochRSI %K value.
+        max_history (int): Number of values to keep in k_values and d_values. Default is None, which keeps every value.
     """
 
-    def __init__(self, period=3, rsi_period=14, k_period=3, prices=None):
+    # Output history, left out of state snapshots
+    history = ('k_values', 'd_values')
+
+    def __init__(self, period=3, rsi_period=14, k_period=3, prices=None, max_history=None):
         self.period = period
         self.rsi_period = rsi_period
         self.k_period = k_period
-        self.prices = [] if prices is None else prices
-        self.rsi_values = []
-        self.k_values = []
+        self.rsi = RSI(rsi_period, method='wilder', max_history=1)
+        self.prices = self.rsi.data
+        self.rsi_values = RingBuffer(k_period)
+        self.highest_rsi = RollingMax(k_period)
+        self.lowest_rsi = RollingMin(k_period)
+        self.recent_k = RingBuffer(period)
+        self.k = None
+        self.d = None
+        self.k_values = make_history(max_history)
+        self.d_values = make_history(max_history)
+        if prices is not None:
+            for price in prices:
+                self.add_data_point(price)
 
     def calculate(self):
         """
-        Calculates the StochRSI based on the added price data.
+        Calculates the StochRSI from the latest RSI value.
 
         Returns:
             float or None: The calculated StochRSI %K value. Returns None if there is insufficient data.
         """
-        if len(self.prices) < self.period:
+        rsi = self.rsi.get_rsi()
+        if rsi is None:
             return None
 
-        # Calculate RSI
-        changes = np.diff(self.prices)
-        gains = np.where(changes > 0, changes, 0)
-        losses = np.where(changes < 0, -changes, 0)
-        avg_gain = np.mean(gains[:self.rsi_period])
-        avg_loss = np.mean(losses[:self.rsi_period])
-        for change in changes[self.rsi_period:]:
-            avg_gain = (avg_gain * (self.rsi_period - 1) + max(change, 0)) / self.rsi_period
-            avg_loss = (avg_loss * (self.rsi_period - 1) + abs(min(change, 0))) / self.rsi_period
-        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
-
-        # Calculate StochRSI
         self.rsi_values.append(rsi)
-        if len(self.rsi_values) > self.k_period:
-            self.rsi_values = self.rsi_values[-self.k_period:]
-        k_value = (rsi - min(self.rsi_values)) / (max(self.rsi_values) - min(self.rsi_values))
+        highest_rsi = self.highest_rsi.append(rsi)
+        lowest_rsi = self.lowest_rsi.append(rsi)
+        if len(self.rsi_values) < self.k_period:
+            return None
+
+        k_value = (rsi - lowest_rsi) / (highest_rsi - lowest_rsi) if highest_rsi != lowest_rsi else math.nan
+        self.k = k_value
         self.k_values.append(k_value)
 
+        self.recent_k.append(k_value)
+        if self.recent_k.full:
+            self.d = sum(self.recent_k) / self.period
+            self.d_values.append(self.d)
+
         return k_value
     
     def add_data_point(self, price):
@@ -56,11 +81,57 @@ class StochRSICalculator:
         Args:
             price (float): The price data point to be added.
         """
-        self.prices.append(price)
-        if len(self.prices) > self.period:
-            self.prices = self.prices[-self.period:]
+        self.rsi.add_data_point(price)
+        if self.rsi.get_rsi() is not None:
             self.calculate()
 
+    def add_data_points(self, prices):
+        """
+        Adds several prices at once, ending in the same state as adding them one at a time.
+
+        The RSI of every price comes from RSI.add_data_points, and %K and %D are computed for all
+        of them together with rolling_max, rolling_min and window sums.
+
+        Args:
+            prices (list or numpy array): The price data points to be added, in chronological order.
+        """
+        rsi = self.rsi.add_data_points(prices)
+        rsi = rsi[~np.isnan(rsi)]
+        if len(rsi) == 0:
+            return
+
+        # %K of each new RSI whose window of `k_period` RSI values is full
+        seen = len(self.rsi_values)
+        values = np.concatenate((self.rsi_values.to_array(), rsi))
+        highest_rsi = rolling_max(values, self.k_period)[seen:]
+        lowest_rsi = rolling_min(values, self.k_period)[seen:]
+        first = max(self.k_period - 1 - seen, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = np.where(highest_rsi != lowest_rsi, (rsi - lowest_rsi) / (highest_rsi - lowest_rsi), math.nan)[first:]
+
+        self.rsi_values.extend(rsi)
+        self.highest_rsi.extend(rsi)
+        self.lowest_rsi.extend(rsi)
+        if len(k) == 0:
+            return
+
+        recent = np.concatenate((self.recent_k.to_array(), k))
+        d = batch.sequential_window_sum(recent, self.period) / self.period
+        d = d[max(len(d) - len(k), 0):]
+        self.recent_k.extend(k)
+        self.k = float(k[-1])
+        self.k_values.extend(k.tolist())
+        if len(d):
+            self.d = float(d[-1])
+            self.d_values.extend(d.tolist())
+
+    def get_k(self):
+        """
+        Returns:
+            float: The latest StochRSI %K value, or None before the first one.
+        """
+        return self.k
+
     def get_k_values(self):
         """
         Returns the list of calculated StochRSI %K values.
@@ -69,33 +140,20 @@ class StochRSICalculator:
             list: List of StochRSI %K values.
         """
         return self.k_values
+
+    def get_d_values(self):
+        """
+        Returns the list of calculated StochRSI %D values.
+
+        Returns:
+            list: List of StochRSI %D values.
+        """
+        return self.d_values
     
     def plot_show(self):
         """Plot the Stoch values."""
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
-        ax1.set_title('Stock Prices')
-        ax1.plot(self.prices, label='Stock Price')
-        ax1.legend(loc='upper left')
-        ax2.set_title('Stoch RSI - {} Period - {} RSI Period - {} K Period'.format(self.period, self.rsi_period, self.k_period))
-        ax2.plot(self.k_values, label='K Value')
-        ax2.legend(loc='upper left')
-        plt.tight_layout()
-        plt.show()
-        return
-    
+        plotting.show(plotting.draw_stoch_rsi, self)
+
     def plot_save(self, filename):
         """Save the Stoch values to a file."""
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
-        ax1.set_title('Stock Prices')
-        ax1.plot(self.prices, label='Stock Price')
-        ax1.legend(loc='upper left')
-        ax2.set_title('Stoch RSI - {} Period - {} RSI Period - {} K Period'.format(self.period, self.rsi_period, self.k_period))
-        ax2.plot(self.k_values, label='K Value')
-        ax2.legend(loc='upper left')
-        plt.tight_layout()
-        plt.savefig(filename)
-        return
-    
-    
-
-
+        plotting.save(plotting.draw_stoch_rsi, self, filename)
@@ -1,38 +1,90 @@
-import matplotlib.pyplot as plt
+import math
+from collections import deque
+
+import numpy as np
+
+from . import plotting
+from .buffers import make_history
 
 class VWAP:
     """
     VWAPCalculator is a class that calculates the volume weighted average price (VWAP) of a stock.
-    
+
+    The VWAP is the running price * volume total divided by the running volume total. With
+    session_length set, the totals restart whenever a timestamp falls in a new session, where
+    session = (timestamp - session_offset) // session_length, e.g. session_length=86400 for daily
+    sessions on timestamps in seconds.
+
+    The moving VWAP (MVWAP) covers the last mvwap_period bars, or the bars whose timestamp is
+    within mvwap_window of the latest one. Its totals are kept as running sums over a deque of
+    the bars in the window and recalculated from the window once per window length, so every
+    update is amortized O(1) time and the memory is bounded by the window.
+
+    The bands use the volume weighted standard deviation of the session's prices. Its sum of
+    squared deviations is updated with West's weighted form of Welford's method, against the
+    VWAP before and after each price, rather than from raw second moments, which would cancel
+    catastrophically when the prices are large compared to their spread.
+
     Attributes:
-        
+
         total_volume (int): The total volume of the stock.
         cumulative_price_volume (float): The cumulative price volume of the stock.
-        cumulative_time_weighted_price_volume (float): The cumulative time weighted price volume of the stock.  
+        cumulative_time_weighted_price_volume (float): The cumulative time weighted price volume of the stock.
         moving_volume (int): The moving volume of the stock.
         moving_cumulative_price_volume (float): The moving cumulative price volume of the stock.
+        session_length (float): The length of a session in timestamp units. Default is None, which never resets.
+        session_offset (float): The timestamp at which sessions start. Default is 0.
+        mvwap_period (int): The number of bars in the MVWAP window. Default is None.
+        mvwap_window (float): The length of the MVWAP window in timestamp units. Default is None.
+        num_std (float): The number of standard deviations for the VWAP bands. Default is None, which disables the bands.
+        max_history (int): Number of values to keep in vwap_values and mvwap_values. Default is None, which keeps every value.
         vwap (float): The volume weighted average price of the stock.
         """
-    def __init__(self, total_volume=0, cumulative_price_volume=0, cumulative_time_weighted_price_volume=0, moving_volume=0, moving_cumulative_price_volume=0):
+
+    # Output history, left out of state snapshots
+    history = ('vwap_values', 'mvwap_values')
+
+    def __init__(self, total_volume=0, cumulative_price_volume=0, cumulative_time_weighted_price_volume=0, moving_volume=0, moving_cumulative_price_volume=0,
+                 session_length=None, session_offset=0, mvwap_period=None, mvwap_window=None, num_std=None, max_history=None):
+        if mvwap_period is not None and mvwap_window is not None:
+            raise ValueError("Set either mvwap_period or mvwap_window, not both.")
         self.total_volume = total_volume
-        self.cumulative_price_volume = cumulative_price_volume  
+        self.cumulative_price_volume = cumulative_price_volume
         self.cumulative_time_weighted_price_volume = cumulative_time_weighted_price_volume
+        self.price_m2 = 0.0
         self.moving_volume = moving_volume
         self.moving_cumulative_price_volume = moving_cumulative_price_volume
-        
+        self.session_length = session_length
+        self.session_offset = session_offset
+        self.session = None
+        self.mvwap_period = mvwap_period
+        self.mvwap_window = mvwap_window
+        self.moving_bars = deque()
+        self.moving_updates = 0
+        self.num_std = num_std
+        self.vwap = None
+        self.mvwap = None
+        self.upper = None
+        self.lower = None
+        self.vwap_values = make_history(max_history)
+        self.mvwap_values = make_history(max_history)
+
         if self.total_volume > 0:
             self.calculate_vwap()
-        else:
-            self.vwap = []
 
     def calculate_vwap(self):
         """
-        Calculates the volume weighted average price (VWAP) of a stock.
+        Calculates the volume weighted average price (VWAP) of a stock, and the bands if num_std is set.
         """
         if self.total_volume == 0:
             return None
-        vwap = self.cumulative_price_volume / self.total_volume
-        self.vwap.append(vwap)
+        self.vwap = self.cumulative_price_volume / self.total_volume
+        self.vwap_values.append(self.vwap)
+        if self.num_std is not None:
+            std = math.sqrt(max(self.price_m2 / self.total_volume, 0.0))
+            self.upper = self.vwap + self.num_std * std
+            self.lower = self.vwap - self.num_std * std
+        return self.vwap
 
     def calculate_twap(self, total_time):
         """
@@ -43,55 +95,207 @@ class VWAP:
         twap = self.cumulative_time_weighted_price_volume / (self.total_volume * total_time)
         return twap
 
-    def calculate_mvwap(self, period):
+    def calculate_mvwap(self, period=None):
         """
         Calculates the moving volume weighted average price (MVWAP) of a stock.
+
+        Parameters:
+            period (float, optional): The minimum moving volume, as calculate_mvwap(period) took before
+                mvwap_period and mvwap_window existed. With it, the average of the moving totals is
+                returned once they hold at least `period` volume, and it is not recorded in mvwap_values.
+
+        Returns:
+            float: The MVWAP, or None until the window has mvwap_period bars or while it has no volume.
         """
-        if self.moving_volume < period:
+        if period is not None:
+            if self.moving_volume < period or self.moving_volume == 0:
+                return None
+            return self.moving_cumulative_price_volume / self.moving_volume
+        if self.mvwap_period is not None and len(self.moving_bars) < self.mvwap_period:
             return None
-        mvwap = self.moving_cumulative_price_volume / self.moving_volume
-        return mvwap
-    
+        if self.moving_volume == 0:
+            return None
+        self.mvwap = self.moving_cumulative_price_volume / self.moving_volume
+        self.mvwap_values.append(self.mvwap)
+        return self.mvwap
+
+    def start_session(self, timestamp):
+        """
+        Resets the session totals, VWAP and bands if the timestamp falls in a new session.
+        """
+        if self.session_length is None:
+            return
+        session = (timestamp - self.session_offset) // self.session_length
+        if session != self.session:
+            self.session = session
+            self.total_volume = 0
+            self.cumulative_price_volume = 0
+            self.cumulative_time_weighted_price_volume = 0
+            self.price_m2 = 0.0
+            self.vwap = None
+            self.upper = None
+            self.lower = None
+
+    def update_moving_window(self, price_volume, volume, timestamp):
+        """
+        Adds a bar to the MVWAP window and drops the bars that fall out of it.
+        """
+        moving_bars = self.moving_bars
+        moving_bars.append((timestamp, price_volume, volume))
+        self.moving_cumulative_price_volume += price_volume
+        self.moving_volume += volume
+        while (self.mvwap_period is not None and len(moving_bars) > self.mvwap_period) or \
+                (self.mvwap_window is not None and moving_bars[0][0] <= timestamp - self.mvwap_window):
+            _, old_price_volume, old_volume = moving_bars.popleft()
+            self.moving_cumulative_price_volume -= old_price_volume
+            self.moving_volume -= old_volume
+        self.moving_updates += 1
+        if self.moving_updates >= len(moving_bars):
+            # Recalculate the totals from the window so rounding errors cannot build up
+            self.moving_updates = 0
+            self.moving_cumulative_price_volume = sum(bar[1] for bar in moving_bars)
+            self.moving_volume = sum(bar[2] for bar in moving_bars)
+
     def add_data_point(self, price, volume, timestamp):
         """
         Adds a data point to the VWAP calculator.
         """
+        self.start_session(timestamp)
+        # The session VWAP before this price, or the price itself if the session has no volume yet
+        previous = self.cumulative_price_volume / self.total_volume if self.total_volume != 0 else price
         self.total_volume += volume
         self.cumulative_price_volume += price * volume
         self.cumulative_time_weighted_price_volume += price * volume * timestamp
-        self.moving_volume += volume
-        self.moving_cumulative_price_volume += price * volume
+        if self.total_volume != 0:
+            self.price_m2 += volume * (price - previous) * (price - self.cumulative_price_volume / self.total_volume)
         self.calculate_vwap()
-        
+        if self.mvwap_period is not None or self.mvwap_window is not None:
+            self.update_moving_window(price * volume, volume, timestamp)
+            self.calculate_mvwap()
+        else:
+            self.moving_volume += volume
+            self.moving_cumulative_price_volume += price * volume
+
+    def add_data_points(self, prices, volumes, timestamps):
+        """
+        Adds several data points at once, ending in the same state as adding them one at a time.
+
+        The session totals, VWAP and the sum of squared deviations of the bands come from one
+        cumulative sum per session.
+        The MVWAP window is still advanced one data point at a time, in O(1) each.
+
+        Parameters:
+            prices (list or numpy array): The prices in chronological order.
+            volumes (list or numpy array): The volumes.
+            timestamps (list or numpy array): The timestamps.
+        """
+        prices = np.asarray(prices, dtype=float)
+        volumes = np.asarray(volumes, dtype=float)
+        timestamps = np.asarray(timestamps, dtype=float)
+        count = len(prices)
+        if count == 0:
+            return
+
+        # Chunk positions where a new session starts; the totals carry on into the first one unless it is new
+        starts = np.zeros(1, dtype=np.intp)
+        carry_on = True
+        if self.session_length is not None:
+            sessions = (timestamps - self.session_offset) // self.session_length
+            starts = np.concatenate((starts, np.flatnonzero(sessions[1:] != sessions[:-1]) + 1))
+            carry_on = sessions[0] == self.session
+            self.session = float(sessions[-1])
+        stops = np.append(starts[1:], count)
+
+        price_volume = prices * volumes
+        columns = (volumes, price_volume, price_volume * timestamps)
+        totals = [self.total_volume, self.cumulative_price_volume, self.cumulative_time_weighted_price_volume]
+        running = [np.empty(count) for _ in columns]
+        for start, stop in zip(starts, stops):
+            if start > 0 or not carry_on:
+                totals = [0, 0, 0]
+            for column, values, total in zip(running, columns, totals):
+                column[start:stop] = np.add.accumulate(np.concatenate(([total], values[start:stop])))[1:]
+            totals = [column[stop - 1] for column in running]
+        total_volume, cumulative_price_volume, cumulative_time_weighted_price_volume = running
+        previous_total, previous_price_volume = self.total_volume, self.cumulative_price_volume
+        self.total_volume, self.cumulative_price_volume, self.cumulative_time_weighted_price_volume = float(total_volume[-1]), float(cumulative_price_volume[-1]), float(cumulative_time_weighted_price_volume[-1])
+
+        traded = total_volume != 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = cumulative_price_volume / total_volume
+        self.vwap_values.extend(means[traded].tolist())
+
+        # West's updates of the sum of squared deviations, against the session VWAP before and after each price
+        previous = np.concatenate(([previous_price_volume / previous_total if previous_total != 0 else prices[0]], means[:-1]))
+        fresh = np.concatenate(([previous_total == 0], total_volume[:-1] == 0))
+        fresh[starts[1:]] = True
+        if not carry_on:
+            fresh[0] = True
+        previous = np.where(fresh, prices, previous)
+        with np.errstate(invalid='ignore'):
+            deviations = np.where(traded, volumes * (prices - previous) * (prices - means), 0.0)
+        m2s = np.empty(count)
+        m2 = self.price_m2
+        for start, stop in zip(starts, stops):
+            if start > 0 or not carry_on:
+                m2 = 0.0
+            m2s[start:stop] = np.add.accumulate(np.concatenate(([m2], deviations[start:stop])))[1:]
+            m2 = m2s[stop - 1]
+        self.price_m2 = float(m2s[-1])
+        if traded[-1]:
+            self.vwap = float(means[-1])
+            if self.num_std is not None:
+                std = math.sqrt(max(self.price_m2 / self.total_volume, 0.0))
+                self.upper = self.vwap + self.num_std * std
+                self.lower = self.vwap - self.num_std * std
+        elif len(starts) > 1 or not carry_on:
+            # The last session has had no volume yet
+            self.vwap = self.upper = self.lower = None
+
+        if self.mvwap_period is not None or self.mvwap_window is not None:
+            for price_volume_value, volume, timestamp in zip(price_volume.tolist(), volumes.tolist(), timestamps.tolist()):
+                self.update_moving_window(price_volume_value, volume, timestamp)
+                self.calculate_mvwap()
+        else:
+            self.moving_volume = float(np.add.accumulate(np.concatenate(([self.moving_volume], volumes)))[-1])
+            self.moving_cumulative_price_volume = float(np.add.accumulate(np.concatenate(([self.moving_cumulative_price_volume], price_volume)))[-1])
+
     def get_vwap(self):
         """
-        Returns the volume weighted average price (VWAP) of a stock.
+        Returns the volume weighted average price (VWAP) values of a stock, one per data point with volume.
+        """
+        return self.vwap_values
+
+    def get_latest_vwap(self):
+        """
+        Returns the latest volume weighted average price (VWAP) of a stock, or None while the session has no volume.
         """
         return self.vwap
-    
+
+    def get_mvwap(self):
+        """
+        Returns the moving volume weighted average price (MVWAP) of a stock.
+        """
+        return self.mvwap
+
+    def get_bands(self):
+        """
+        Returns:
+            tuple: The upper band, VWAP and lower band, with None bands unless num_std is set.
+        """
+        return self.upper, self.vwap, self.lower
+
     def plot_show(self):
         """
         Plot the VWAP values calculated.
         """
-        plt.figure(figsize=(12, 6))
-        plt.title('VWAP')
-        plt.plot(self.vwap, label='VWAP')
-        plt.legend(loc='upper left')
-        plt.show()
-        return
-    
+        plotting.show(plotting.draw_vwap, self)
+
     def plot_save(self, filename):
         """
         Plot the VWAP values calculated and save to file.
-        
+
         Parameters:
             filename (str): The filename to save the plot to.
         """
-        plt.figure(figsize=(12, 6))
-        plt.title('VWAP')
-        plt.plot(self.vwap, label='VWAP')
-        plt.legend(loc='upper left')
-        plt.savefig(filename)
-        return
-        
-
+        plotting.save(plotting.draw_vwap, self, filename)
@@ -1,10 +1,20 @@
-from .BOLLINGERBANDS import BollingerBands
+from .BollingerBands import BollingerBands
 from .MACD import MACD
 from .RSI import RSI
 from .SMA import SMA
 from .EMA import EMA
 from .CCI import CCI
 from .STOCHOSCILLATOR import STOCHOSCILLATOR
+from .STOCHRSI import StochRSICalculator
 from .VWAP import VWAP
-from .ATR import ATR
+from .ATR import AverageTrueRange
+from .ATR import AverageTrueRange as ATR
 from .ADX import ADX
+from .DMI import DMI
+from . import batch
+from .bank import IndicatorBank, EMABank, SMABank, RSIBank, ATRBank
+from .pipeline import Pipeline
+from .store import ColumnStore
+from .chunked import stream
+from .state import snapshot, restore
+from . import kernels
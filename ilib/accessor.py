@@ -0,0 +1,170 @@
+"""
+A pandas DataFrame accessor for the batch indicators.
+
+Importing this module registers `df.ilib` on every DataFrame:
+
+    import ilib.accessor
+
+    df.ilib.rsi(14)                     # Series
+    df.ilib.atr(14, method='wilder')
+    df.ilib.bbands(20, 2)               # DataFrame of the upper, middle and lower bands
+    panel.ilib.rsi(14, by='symbol')     # one pass over a long panel, computed per symbol
+
+The columns are read as NumPy arrays without copying when they already hold
+float64 values, and handed to the ilib.batch functions. Column names are
+matched case-insensitively, so 'close' also finds 'Close'. With `by`, the rows
+are grouped by symbol (keeping their order within each symbol), each symbol is
+computed on its own slice, and the values are returned in the frame's row
+order. pandas is optional: install it with `pip install ilib[pandas]`.
+"""
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError as error:
+    raise ImportError("The DataFrame accessor requires pandas. Install it with `pip install ilib[pandas]`.") from error
+
+from . import batch
+
+
+@pd.api.extensions.register_dataframe_accessor('ilib')
+class IlibAccessor:
+    """
+    Indicators over the columns of a DataFrame, as `df.ilib`.
+
+    Parameters:
+        frame (pandas DataFrame): The prices, with columns such as 'high', 'low' and 'close'.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def column(self, name):
+        """
+        Find a column by name, ignoring case.
+
+        Returns:
+            numpy array: The column as float64, without a copy when it is float64 already.
+        """
+        if name not in self.frame.columns:
+            matches = [column for column in self.frame.columns if str(column).lower() == str(name).lower()]
+            if not matches:
+                raise KeyError("The DataFrame has no {!r} column.".format(name))
+            name = matches[0]
+        return self.frame[name].to_numpy(dtype=float, copy=False)
+
+    def compute(self, function, fields, by=None, **params):
+        """
+        Run an ilib.batch function over columns of the frame.
+
+        Parameters:
+            function (callable): The batch function.
+            fields (tuple): The column names passed to the function, in order.
+            by (str or array-like, optional): A column name, or one key per row, to compute each group on its own.
+            params: Keyword arguments for the function.
+
+        Returns:
+            tuple: The output arrays of the function, in the frame's row order.
+        """
+        columns = [self.column(field) for field in fields]
+        if by is None or len(self.frame) == 0:
+            outputs = function(*columns, **params)
+            return outputs if isinstance(outputs, tuple) else (outputs,)
+
+        keys = self.frame[by] if isinstance(by, str) else by
+        codes = pd.factorize(np.asarray(keys))[0]
+        order = np.argsort(codes, kind='stable')
+        grouped = not np.array_equal(order, np.arange(len(order)))
+        if grouped:
+            columns = [values[order] for values in columns]
+        sorted_codes = codes[order]
+        starts = np.concatenate(([0], np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1))
+        stops = np.append(starts[1:], len(sorted_codes))
+
+        outputs = None
+        for start, stop in zip(starts, stops):
+            parts = function(*(values[start:stop] for values in columns), **params)
+            parts = parts if isinstance(parts, tuple) else (parts,)
+            if outputs is None:
+                outputs = tuple(np.empty(len(order)) for _ in parts)
+            for output, part in zip(outputs, parts):
+                output[start:stop] = part
+        if grouped:
+            unsorted = tuple(np.empty_like(output) for output in outputs)
+            for output, values in zip(unsorted, outputs):
+                output[order] = values
+            outputs = unsorted
+        return outputs
+
+    def _series(self, values, name):
+        return pd.Series(values, index=self.frame.index, name=name, copy=False)
+
+    def _frame(self, outputs, names):
+        return pd.DataFrame(dict(zip(names, outputs)), index=self.frame.index, copy=False)
+
+    def sma(self, period, column='close', by=None):
+        """
+        Returns:
+            pandas Series: The Simple Moving Average of the column.
+        """
+        return self._series(self.compute(batch.sma, (column,), by, period=period)[0], 'sma_{}'.format(period))
+
+    def ema(self, window, alpha=0.2, column='close', by=None):
+        """
+        Returns:
+            pandas Series: The Exponential Moving Average of the column, NaN for the first `window` rows.
+        """
+        return self._series(self.compute(batch.ema, (column,), by, window=window, alpha=alpha)[0], 'ema_{}'.format(window))
+
+    def rsi(self, period=14, method='sma', column='close', by=None):
+        """
+        Returns:
+            pandas Series: The Relative Strength Index of the column.
+        """
+        return self._series(self.compute(batch.rsi, (column,), by, period=period, method=method)[0], 'rsi_{}'.format(period))
+
+    def macd(self, short_period=12, long_period=26, signal_period=9, column='close', by=None):
+        """
+        Returns:
+            pandas DataFrame: The MACD line, signal line and histogram.
+        """
+        outputs = self.compute(batch.macd, (column,), by, short_period=short_period, long_period=long_period, signal_period=signal_period)
+        return self._frame(outputs, ('macd', 'macd_signal', 'macd_histogram'))
+
+    def bbands(self, window=20, num_std=1, column='close', by=None):
+        """
+        Returns:
+            pandas DataFrame: The upper, middle and lower Bollinger Bands.
+        """
+        outputs = self.compute(batch.bollinger_bands, (column,), by, window=window, num_std=num_std)
+        return self._frame(outputs, ('bb_upper', 'bb_middle', 'bb_lower'))
+
+    def atr(self, period=14, method='sma', by=None):
+        """
+        Returns:
+            pandas Series: The Average True Range of the high, low and close columns.
+        """
+        return self._series(self.compute(batch.atr, ('high', 'low', 'close'), by, period=period, method=method)[0], 'atr_{}'.format(period))
+
+    def dmi(self, period=14, by=None):
+        """
+        Returns:
+            pandas DataFrame: The Wilder-smoothed +DI, -DI, DX and ADX.
+        """
+        outputs = self.compute(batch.dmi, ('high', 'low', 'close'), by, period=period)
+        return self._frame(outputs, ('plus_di', 'minus_di', 'dx', 'adx'))
+
+    def cci(self, period=20, factor=0.015, by=None):
+        """
+        Returns:
+            pandas Series: The Commodity Channel Index of the high, low and close columns.
+        """
+        return self._series(self.compute(batch.cci, ('high', 'low', 'close'), by, period=period, factor=factor)[0], 'cci_{}'.format(period))
+
+    def stoch(self, period=14, smoothing_period=3, by=None):
+        """
+        Returns:
+            pandas DataFrame: The Stochastic Oscillator %K and %D.
+        """
+        outputs = self.compute(batch.stoch, ('high', 'low', 'close'), by, period=period, smoothing_period=smoothing_period)
+        return self._frame(outputs, ('stoch_k', 'stoch_d'))
@@ -0,0 +1,201 @@
+"""
+asyncio adapter for feeding indicators from asynchronous tick sources.
+
+An AsyncFeed reads ticks from an async iterator, keeps one instance of every
+registered indicator per symbol and yields the latest values as ticks are
+applied:
+
+    feed = AsyncFeed()
+    feed.add('rsi', lambda: RSI(14))
+    feed.add('atr', lambda: AverageTrueRange(14, method='wilder'))
+    async for values in feed.run(ticks):       # ticks: {'symbol': 'AAPL', 'high': ..., 'low': ..., 'close': ...}
+        values['AAPL']['rsi']
+
+Ticks that are already waiting when the previous batch finishes are applied
+together, with one add_data_points call per symbol and indicator, and that
+work runs in an executor so the event loop keeps serving other tasks. The
+queues between the source, the indicators and the consumer are bounded: when
+the consumer falls behind, the feed stops reading from the source.
+"""
+import asyncio
+
+import numpy as np
+
+# The tick fields each indicator class takes, in the order of its add_data_points arguments
+FIELDS = {
+    'ADX': ('high', 'low', 'close'),
+    'AverageTrueRange': ('high', 'low', 'close'),
+    'BollingerBands': ('close',),
+    'CCI': ('high', 'low', 'close'),
+    'DMI': ('high', 'low', 'close'),
+    'EMA': ('close',),
+    'MACD': ('close',),
+    'RSI': ('close',),
+    'SMA': ('close',),
+    'STOCHOSCILLATOR': ('high', 'low', 'close'),
+    'StochRSICalculator': ('close',),
+    'VWAP': ('close', 'volume', 'timestamp'),
+}
+
+# The getter each indicator class reports its latest value with
+GETTERS = {
+    'ADX': 'get_directional_movement_index',
+    'AverageTrueRange': 'get_ATR',
+    'BollingerBands': 'get_BollingerBands',
+    'CCI': 'get_cci',
+    'DMI': 'get_adx',
+    'EMA': 'get_EMA',
+    'MACD': 'get_lines',
+    'RSI': 'get_rsi',
+    'SMA': 'get_smavalue',
+    'STOCHOSCILLATOR': 'get_stoch',
+    'StochRSICalculator': 'get_k',
+    'VWAP': 'get_latest_vwap',
+}
+
+
+class _End:
+    """Marks the end of a queue, with the error that ended it, if any."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+
+class AsyncFeed:
+    """
+    Fan ticks from an async iterator out to indicators, one instance per symbol.
+
+    Parameters:
+        max_batch (int): The most ticks applied in one batch. Default is 1024.
+        max_pending (int): The most ticks read from the source but not yet applied. Default is 8192.
+        max_results (int): The most batches of values waiting for the consumer. Default is 16.
+        executor (concurrent.futures.Executor, optional): Where the batches run. Default is the event loop's default executor.
+        symbol_key (str): The tick field holding the symbol. Default is 'symbol'.
+    """
+
+    def __init__(self, max_batch=1024, max_pending=8192, max_results=16, executor=None, symbol_key='symbol'):
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_results = max_results
+        self.executor = executor
+        self.symbol_key = symbol_key
+        self.registrations = {}
+        self.indicators = {}
+
+    def add(self, name, factory, fields=None, value=None):
+        """
+        Register an indicator to run for every symbol.
+
+        Parameters:
+            name (str): The name the indicator's values are reported under.
+            factory (callable): Returns a new indicator, called once per symbol, e.g. lambda: RSI(14).
+            fields (tuple, optional): The tick fields passed to add_data_points, in order. Default depends on the class, see FIELDS.
+            value (str or callable, optional): The getter name, or a function of the indicator, giving the value
+                to report. Default depends on the class, see GETTERS.
+        """
+        if name in self.registrations:
+            raise ValueError("An indicator named {!r} is already registered.".format(name))
+        kind = type(factory()).__name__
+        if fields is None:
+            if kind not in FIELDS:
+                raise ValueError("Pass the fields of {} ticks.".format(kind))
+            fields = FIELDS[kind]
+        if value is None:
+            if kind not in GETTERS:
+                raise ValueError("Pass the value to report for {}.".format(kind))
+            value = GETTERS[kind]
+        if isinstance(value, str):
+            getter = value
+            value = lambda indicator: getattr(indicator, getter)()
+        self.registrations[name] = (factory, tuple(fields), value)
+
+    def indicator(self, symbol, name):
+        """
+        Returns:
+            object: The indicator registered as `name` for the symbol, created on first use.
+        """
+        key = (symbol, name)
+        if key not in self.indicators:
+            self.indicators[key] = self.registrations[name][0]()
+        return self.indicators[key]
+
+    def apply(self, ticks):
+        """
+        Apply a batch of ticks to the indicators, synchronously.
+
+        The ticks of each symbol are applied in arrival order with one add_data_points call per
+        indicator. A tick missing a field of an indicator is skipped by that indicator.
+
+        Parameters:
+            ticks (list): The ticks, as dicts of field values.
+
+        Returns:
+            dict: The latest value of every indicator, by symbol and name, for the symbols in the batch.
+        """
+        by_symbol = {}
+        for tick in ticks:
+            by_symbol.setdefault(tick.get(self.symbol_key), []).append(tick)
+        values = {}
+        for symbol, symbol_ticks in by_symbol.items():
+            values[symbol] = {}
+            for name, (_, fields, value) in self.registrations.items():
+                rows = [[tick[field] for field in fields] for tick in symbol_ticks if all(field in tick for field in fields)]
+                indicator = self.indicator(symbol, name)
+                if rows:
+                    indicator.add_data_points(*np.array(rows, dtype=float).T)
+                values[symbol][name] = value(indicator)
+        return values
+
+    async def _read(self, source, ticks):
+        try:
+            async for tick in source:
+                await ticks.put(tick)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as error:
+            await ticks.put(_End(error))
+        else:
+            await ticks.put(_End())
+
+    async def _work(self, ticks, results):
+        loop = asyncio.get_running_loop()
+        try:
+            end = None
+            while end is None:
+                batch = [await ticks.get()]
+                while len(batch) < self.max_batch and not ticks.empty():
+                    batch.append(ticks.get_nowait())
+                if isinstance(batch[-1], _End):
+                    end = batch.pop()
+                if batch:
+                    await results.put(await loop.run_in_executor(self.executor, self.apply, batch))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as error:
+            end = _End(error)
+        await results.put(end)
+
+    async def run(self, source):
+        """
+        Apply the ticks of an async iterator and yield the values after each batch.
+
+        Parameters:
+            source (async iterable): The ticks, as dicts with the symbol and the fields of the indicators.
+
+        Yields:
+            dict: The latest value of every indicator, by symbol and name, for the symbols that ticked in the batch.
+        """
+        ticks = asyncio.Queue(self.max_pending)
+        results = asyncio.Queue(self.max_results)
+        tasks = [asyncio.ensure_future(self._read(source, ticks)), asyncio.ensure_future(self._work(ticks, results))]
+        try:
+            while True:
+                values = await results.get()
+                if isinstance(values, _End):
+                    if values.error is not None:
+                        raise values.error
+                    return
+                yield values
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,224 @@
+"""
+Indicator banks: the state of one indicator for many symbols in contiguous NumPy arrays.
+
+A bank replaces one indicator object per symbol. Symbols are numbered 0 to
+n_symbols - 1 and a whole cross-section of ticks is applied with a single
+vectorized call:
+
+    bank = RSIBank(14, n_symbols=5000)
+    values = bank.update(symbol_ids, prices)
+
+Each bank reports the same values as the matching class would for each symbol.
+A symbol should appear at most once in each update call.
+
+The windowed banks (SMABank, RSIBank, ATRBank) keep n_symbols x period values,
+which dominates their memory. Pass dtype=np.float32 to store those windows in
+half the space: the window sums are still accumulated in float64, so the only
+error is the rounding of each stored value (see the float32 section of the
+README for the bounds).
+"""
+import numpy as np
+
+
+class IndicatorBank:
+    """
+    Base class for the indicator banks.
+
+    Parameters:
+        n_symbols (int): The number of symbols in the bank.
+
+    Attributes:
+        counts (numpy array): The number of data points seen for each symbol.
+        values (numpy array): The current indicator value of each symbol, NaN until it is available.
+    """
+
+    def __init__(self, n_symbols):
+        self.n_symbols = n_symbols
+        self.counts = np.zeros(n_symbols, dtype=np.int64)
+        self.values = np.full(n_symbols, np.nan)
+
+    def symbol_index(self, symbol_ids):
+        """
+        Convert symbol ids to an index array.
+
+        Parameters:
+            symbol_ids (int, list or numpy array): The symbol ids, or None for every symbol.
+
+        Returns:
+            numpy array: The symbol ids as an integer array.
+        """
+        if symbol_ids is None:
+            return np.arange(self.n_symbols)
+        return np.atleast_1d(np.asarray(symbol_ids, dtype=np.intp))
+
+    def get(self, symbol_ids=None):
+        """
+        Returns:
+            numpy array: The current values of the given symbols, or of every symbol.
+        """
+        return self.values[self.symbol_index(symbol_ids)]
+
+
+class EMABank(IndicatorBank):
+    """
+    Exponential Moving Average for many symbols, as EMA computes it for each one.
+
+    Parameters:
+        window (int): The size of the window for calculating EMA.
+        n_symbols (int): The number of symbols in the bank.
+        alpha (float, optional): The smoothing factor. Default is 0.2.
+    """
+
+    def __init__(self, window, n_symbols, alpha=0.2):
+        super().__init__(n_symbols)
+        self.window = window
+        self.alpha = alpha
+        self.ema = np.zeros(n_symbols)
+
+    def update(self, symbol_ids, prices):
+        """
+        Add one price for each of the given symbols.
+
+        Parameters:
+            symbol_ids (list or numpy array): The symbols that ticked.
+            prices (list or numpy array): The new price of each symbol.
+
+        Returns:
+            numpy array: The EMA of each of the given symbols.
+        """
+        ids = self.symbol_index(symbol_ids)
+        prices = np.asarray(prices, dtype=float)
+        counts = self.counts[ids]
+        ema = np.where(counts == 0, prices, (self.alpha * prices) + ((1 - self.alpha) * self.ema[ids]))
+        self.ema[ids] = ema
+        self.counts[ids] = counts + 1
+        values = np.where(counts + 1 > self.window, ema, np.nan)
+        self.values[ids] = values
+        return values
+
+
+class SMABank(IndicatorBank):
+    """
+    Simple Moving Average for many symbols, as SMA computes it for each one.
+
+    Parameters:
+        period (int): The period for which SMA needs to be calculated.
+        n_symbols (int): The number of symbols in the bank.
+        dtype (numpy dtype, optional): The storage dtype of the price windows. Default is float64.
+    """
+
+    def __init__(self, period, n_symbols, dtype=np.float64):
+        super().__init__(n_symbols)
+        self.period = period
+        self.window_values = np.zeros((n_symbols, period), dtype=dtype)
+
+    def update(self, symbol_ids, prices):
+        """
+        Add one price for each of the given symbols.
+
+        Parameters:
+            symbol_ids (list or numpy array): The symbols that ticked.
+            prices (list or numpy array): The new price of each symbol.
+
+        Returns:
+            numpy array: The SMA of each of the given symbols.
+        """
+        ids = self.symbol_index(symbol_ids)
+        counts = self.counts[ids]
+        self.window_values[ids, counts % self.period] = prices
+        self.counts[ids] = counts + 1
+        values = np.where(counts + 1 >= self.period, self.window_values[ids].sum(axis=1, dtype=np.float64) / self.period, np.nan)
+        self.values[ids] = values
+        return values
+
+
+class RSIBank(IndicatorBank):
+    """
+    Relative Strength Index for many symbols, as RSI computes it for each one.
+
+    Parameters:
+        period (int): Number of periods to use for RSI calculation.
+        n_symbols (int): The number of symbols in the bank.
+        dtype (numpy dtype, optional): The storage dtype of the gain and loss windows. Default is float64.
+    """
+
+    def __init__(self, period, n_symbols, dtype=np.float64):
+        super().__init__(n_symbols)
+        self.period = period
+        self.last_prices = np.zeros(n_symbols)
+        self.gains = np.zeros((n_symbols, period), dtype=dtype)
+        self.losses = np.zeros((n_symbols, period), dtype=dtype)
+
+    def update(self, symbol_ids, prices):
+        """
+        Add one price for each of the given symbols.
+
+        Parameters:
+            symbol_ids (list or numpy array): The symbols that ticked.
+            prices (list or numpy array): The new price of each symbol.
+
+        Returns:
+            numpy array: The RSI of each of the given symbols.
+        """
+        ids = self.symbol_index(symbol_ids)
+        prices = np.asarray(prices, dtype=float)
+        counts = self.counts[ids]
+        seen = counts > 0
+        changes = prices[seen] - self.last_prices[ids[seen]]
+        positions = (counts[seen] - 1) % self.period
+        self.gains[ids[seen], positions] = np.where(changes > 0, changes, 0)
+        self.losses[ids[seen], positions] = np.where(changes < 0, -changes, 0)
+        self.last_prices[ids] = prices
+        self.counts[ids] = counts + 1
+
+        avg_gain = self.gains[ids].sum(axis=1, dtype=np.float64) / self.period
+        avg_loss = self.losses[ids].sum(axis=1, dtype=np.float64) / self.period
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+        values = np.where(counts + 1 > self.period, rsi, np.nan)
+        self.values[ids] = values
+        return values
+
+
+class ATRBank(IndicatorBank):
+    """
+    Average True Range for many symbols, as AverageTrueRange computes it for each one.
+
+    Parameters:
+        period (int): The period for which ATR needs to be calculated.
+        n_symbols (int): The number of symbols in the bank.
+        dtype (numpy dtype, optional): The storage dtype of the true range windows. Default is float64.
+    """
+
+    def __init__(self, period, n_symbols, dtype=np.float64):
+        super().__init__(n_symbols)
+        self.period = period
+        self.last_closes = np.zeros(n_symbols)
+        self.true_ranges = np.zeros((n_symbols, period), dtype=dtype)
+
+    def update(self, symbol_ids, high, low, close):
+        """
+        Add one bar for each of the given symbols.
+
+        Parameters:
+            symbol_ids (list or numpy array): The symbols that ticked.
+            high (list or numpy array): The new high price of each symbol.
+            low (list or numpy array): The new low price of each symbol.
+            close (list or numpy array): The new close price of each symbol.
+
+        Returns:
+            numpy array: The ATR of each of the given symbols.
+        """
+        ids = self.symbol_index(symbol_ids)
+        high, low, close = np.asarray(high, dtype=float), np.asarray(low, dtype=float), np.asarray(close, dtype=float)
+        counts = self.counts[ids]
+        seen = counts > 0
+        previous_close = self.last_closes[ids[seen]]
+        true_range = np.maximum.reduce([high[seen] - low[seen], np.abs(high[seen] - previous_close), np.abs(low[seen] - previous_close)])
+        self.true_ranges[ids[seen], (counts[seen] - 1) % self.period] = true_range
+        self.last_closes[ids] = close
+        self.counts[ids] = counts + 1
+
+        values = np.where(counts + 1 > self.period, self.true_ranges[ids].sum(axis=1, dtype=np.float64) / self.period, np.nan)
+        self.values[ids] = values
+        return values
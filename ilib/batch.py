@@ -0,0 +1,590 @@
+"""
+Vectorized batch versions of the indicators.
+
+Each function takes NumPy arrays (or anything array-like) and returns the whole
+indicator series in one call, without a Python loop over the elements (the
+recursive smoothing in wilder_average and exponential_average is the
+exception, see ilib.kernels). The outputs have the same length as the inputs
+and are NaN until enough data points have been seen, so output[i] is the
+value the matching class reports after its i-th data point.
+
+The indicator functions also take a `dtype` keyword, e.g. dtype=np.float32,
+for compact storage of the outputs. Inputs of any float dtype are read, the
+calculation itself always runs in float64 (float32 inputs are copied to
+float64 first), and only the results are rounded to `dtype`, so the peak
+memory of a call is not reduced.
+"""
+import functools
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from . import kernels
+from .rolling import rolling_max, rolling_min
+
+
+def _with_dtype(function):
+    """Add the dtype keyword to an indicator function: compute in float64, return the outputs as dtype."""
+    @functools.wraps(function)
+    def wrapper(*args, dtype=None, **kwargs):
+        outputs = function(*args, **kwargs)
+        if dtype is None:
+            return outputs
+        if isinstance(outputs, tuple):
+            return tuple(values.astype(dtype, copy=False) for values in outputs)
+        return outputs.astype(dtype, copy=False)
+    return wrapper
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=float)
+
+
+def _pad(values, length):
+    """Left pad values with NaN up to length."""
+    out = np.full(length, np.nan)
+    if len(values):
+        out[length - len(values):] = values
+    return out
+
+
+def _window_sum(values, window):
+    """Sum of every window of `window` consecutive values."""
+    if len(values) < window:
+        return np.empty(0)
+    return sliding_window_view(values, window).sum(axis=1)
+
+
+def true_range(high, low, close):
+    """
+    Calculate the true range of every bar.
+
+    Parameters:
+        high (numpy array): The high prices.
+        low (numpy array): The low prices.
+        close (numpy array): The close prices.
+
+    Returns:
+        numpy array: The true ranges. The first bar has no previous close and is NaN.
+    """
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    out = np.full(len(high), np.nan)
+    previous_close = close[:-1]
+    out[1:] = np.maximum.reduce([high[1:] - low[1:], np.abs(high[1:] - previous_close), np.abs(low[1:] - previous_close)])
+    return out
+
+
+def price_changes(prices):
+    """
+    Split the changes between consecutive prices into gains and losses.
+
+    Parameters:
+        prices (numpy array): The prices in chronological order.
+
+    Returns:
+        tuple: The gains and the losses (as positive numbers), one per price change.
+    """
+    changes = np.diff(_as_array(prices))
+    return np.where(changes > 0, changes, 0), np.where(changes < 0, -changes, 0)
+
+
+def wilder_average(values, period, initial=None):
+    """
+    Calculate Wilder's smoothed average of a series.
+
+    The first average is the mean of the first `period` values, after which
+    average = (previous average * (period - 1) + value) / period.
+    Each average depends on the previous one, so this runs as a loop over the values
+    in ilib.kernels, compiled with Numba when that backend is selected.
+
+    Parameters:
+        values (numpy array): The values to smooth.
+        period (int): The smoothing period.
+        initial (float, optional): An average to carry on from, e.g. the current state of an indicator.
+            Every value is then applied to it, with no warm-up.
+
+    Returns:
+        numpy array: The averages, NaN for the first period - 1 values when there is no initial average.
+    """
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+    if initial is not None:
+        out[:] = kernels.wilder_smooth(values, period, initial)
+    elif len(values) >= period:
+        average = sum(values[:period].tolist()) / period
+        out[period - 1] = average
+        out[period:] = kernels.wilder_smooth(values[period:], period, average)
+    return out
+
+
+def exponential_average(values, alpha, initial=None):
+    """
+    Calculate the exponential moving average of a series.
+
+    The first average is the first value, after which
+    average = alpha * value + (1 - alpha) * previous average.
+    Each average depends on the previous one, so this runs as a loop over the values
+    in ilib.kernels, compiled with Numba when that backend is selected.
+
+    Parameters:
+        values (numpy array): The values to smooth.
+        alpha (float): The smoothing factor.
+        initial (float, optional): An average to carry on from, e.g. the current state of an indicator.
+
+    Returns:
+        numpy array: The averages.
+    """
+    values = _as_array(values)
+    out = np.empty(len(values))
+    if not len(values):
+        return out
+    if initial is None:
+        out[0] = values[0]
+        out[1:] = kernels.exponential_smooth(values[1:], alpha, float(values[0]))
+    else:
+        out[:] = kernels.exponential_smooth(values, alpha, initial)
+    return out
+
+
+def sequential_window_sum(values, window):
+    """
+    Sum every window of `window` consecutive values, adding them from left to right.
+
+    This rounds exactly like Python's sum() over each window, which the
+    streaming classes use, so their bulk updates match adding the values one at
+    a time bit for bit. It loops over the `window` positions, not over the values.
+
+    Parameters:
+        values (numpy array): The values.
+        window (int): The number of values in the window.
+
+    Returns:
+        numpy array: The sum of the window ending at each value, without the first window - 1 values.
+    """
+    values = _as_array(values)
+    count = len(values) - window + 1
+    if count <= 0:
+        return np.empty(0)
+    total = values[:count].copy()
+    for offset in range(1, window):
+        total += values[offset:offset + count]
+    return total
+
+
+@_with_dtype
+def ema(prices, window, alpha=0.2):
+    """
+    Calculate the Exponential Moving Average (EMA) series, as EMA does.
+
+    Parameters:
+        prices (numpy array): The prices in chronological order.
+        window (int): The number of prices EMA waits for before it reports a value.
+        alpha (float, optional): The smoothing factor. Default is 0.2.
+
+    Returns:
+        numpy array: The EMA values, NaN for the first `window` prices.
+    """
+    out = exponential_average(prices, alpha)
+    out[:window] = np.nan
+    return out
+
+
+@_with_dtype
+def macd(prices, short_period=12, long_period=26, signal_period=9):
+    """
+    Calculate the MACD line, signal line and histogram series, as MACD does.
+
+    Parameters:
+        prices (numpy array): The prices in chronological order.
+        short_period (int, optional): The short-term period. Default is 12.
+        long_period (int, optional): The long-term period. Default is 26.
+        signal_period (int, optional): The signal period. Default is 9.
+
+    Returns:
+        tuple: The MACD line, signal line and MACD histogram, NaN for the first long_period - 1 prices.
+    """
+    line = exponential_average(prices, 2 / (short_period + 1)) - exponential_average(prices, 2 / (long_period + 1))
+    signal = exponential_average(line, 2 / (signal_period + 1))
+    histogram = line - signal
+    for values in (line, signal, histogram):
+        values[:long_period - 1] = np.nan
+    return line, signal, histogram
+
+
+@_with_dtype
+def sma(prices, period, anchor_every=4096):
+    """
+    Calculate the Simple Moving Average (SMA) series, as SMA does.
+
+    The window sums come from cumulative sums that restart every `anchor_every`
+    values, so the rounding error of each sum is bounded by the block length
+    instead of growing with the length of the input.
+
+    Parameters:
+        prices (numpy array): The prices in chronological order.
+        period (int): The period for which SMA needs to be calculated.
+        anchor_every (int, optional): The length of the blocks the cumulative sums restart at. Default is 4096.
+
+    Returns:
+        numpy array: The SMA values.
+    """
+    prices = _as_array(prices)
+    count = len(prices)
+    out = np.full(count, np.nan)
+    if count < period:
+        return out
+    block = max(anchor_every, period)
+    blocks = -(-count // block)
+    padded = np.zeros(blocks * block)
+    padded[:count] = prices
+    padded = padded.reshape(blocks, block)
+    inclusive = np.cumsum(padded, axis=1)
+    exclusive = np.zeros_like(inclusive)
+    exclusive[:, 1:] = inclusive[:, :-1]
+    inclusive, exclusive = inclusive.ravel(), exclusive.ravel()
+    totals = inclusive[block - 1::block]
+
+    # A window spans at most two blocks, since block >= period
+    ends = np.arange(period - 1, count)
+    starts = ends - period + 1
+    sums = inclusive[ends] - exclusive[starts]
+    spans = starts // block != ends // block
+    sums[spans] += totals[starts[spans] // block]
+    out[period - 1:] = sums / period
+    return out
+
+
+@_with_dtype
+def rsi(prices, period=14, method='sma'):
+    """
+    Calculate the Relative Strength Index (RSI) series, as RSI does.
+
+    Parameters:
+        prices (numpy array): The prices in chronological order.
+        period (int, optional): Number of periods to use for RSI calculation. Default is 14.
+        method (str, optional): 'sma' (default) averages the last `period` changes, 'wilder' uses Wilder smoothing.
+
+    Returns:
+        numpy array: The RSI values.
+    """
+    prices = _as_array(prices)
+    gains, losses = price_changes(prices)
+    if method == 'wilder':
+        avg_gain = wilder_average(gains, period)[period - 1:]
+        avg_loss = wilder_average(losses, period)[period - 1:]
+    elif method == 'sma':
+        avg_gain = _window_sum(gains, period) / period
+        avg_loss = _window_sum(losses, period) / period
+    else:
+        raise ValueError("method must be 'sma' or 'wilder'.")
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+    return _pad(values, len(prices))
+
+
+@_with_dtype
+def atr(high, low, close, period=14, method='sma'):
+    """
+    Calculate the Average True Range (ATR) series, as AverageTrueRange does.
+
+    Parameters:
+        high (numpy array): The high prices.
+        low (numpy array): The low prices.
+        close (numpy array): The close prices.
+        period (int, optional): The period of the ATR. Default is 14.
+        method (str, optional): 'sma' (default) averages the last `period` true ranges, 'wilder' uses Wilder smoothing.
+
+    Returns:
+        numpy array: The ATR values.
+    """
+    ranges = true_range(high, low, close)
+    if method == 'wilder':
+        return _pad(wilder_average(ranges[1:], period), len(ranges))
+    if method != 'sma':
+        raise ValueError("method must be 'sma' or 'wilder'.")
+    return _pad(_window_sum(ranges[1:], period) / period, len(ranges))
+
+
+def directional_movements(high, low):
+    """
+    Calculate the positive and negative directional movement of every bar after the first.
+
+    Parameters:
+        high (numpy array): The high prices.
+        low (numpy array): The low prices.
+
+    Returns:
+        tuple: The +DM and -DM values, one per bar after the first.
+    """
+    high_movement = np.diff(_as_array(high))
+    low_movement = -np.diff(_as_array(low))
+    positive = np.where((high_movement > low_movement) & (high_movement > 0), high_movement, 0)
+    negative = np.where((low_movement > high_movement) & (low_movement > 0), low_movement, 0)
+    return positive, negative
+
+
+@_with_dtype
+def dmi(high, low, close, period=14):
+    """
+    Calculate the Wilder-smoothed +DI, -DI, DX and ADX series, as DMI does.
+
+    Parameters:
+        high (numpy array): The high prices.
+        low (numpy array): The low prices.
+        close (numpy array): The close prices.
+        period (int, optional): The smoothing period. Default is 14.
+
+    Returns:
+        tuple: The +DI, -DI, DX and ADX values.
+    """
+    ranges = true_range(high, low, close)
+    count = len(ranges)
+    positive, negative = directional_movements(high, low)
+    true_range_average = wilder_average(ranges[1:], period)[period - 1:]
+    positive_average = wilder_average(positive, period)[period - 1:]
+    negative_average = wilder_average(negative, period)[period - 1:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        positive_index = np.where(true_range_average == 0, 0, (positive_average / true_range_average) * 100)
+        negative_index = np.where(true_range_average == 0, 0, (negative_average / true_range_average) * 100)
+        total = positive_index + negative_index
+        dx = np.where(total == 0, 0, np.abs(positive_index - negative_index) / total * 100)
+    adx = wilder_average(dx, period)
+    return _pad(positive_index, count), _pad(negative_index, count), _pad(dx, count), _pad(adx, count)
+
+
+@_with_dtype
+def adx(high, low, close, period=14, method='sma'):
+    """
+    Calculate the Directional Movement Index series, as ADX.get_directional_movement_index reports it.
+
+    Use dmi for the +DI, -DI and smoothed ADX series as well.
+
+    Parameters:
+        high (numpy array): The high prices.
+        low (numpy array): The low prices.
+        close (numpy array): The close prices.
+        period (int, optional): The period of the ADX. Default is 14.
+        method (str, optional): 'sma' (default) or 'wilder', as in ADX.
+
+    Returns:
+        numpy array: The Directional Movement Index values.
+    """
+    if method == 'wilder':
+        return dmi(high, low, close, period)[2]
+    if method != 'sma':
+        raise ValueError("method must be 'sma' or 'wilder'.")
+    ranges = true_range(high, low, close)
+    positive, negative = directional_movements(high, low)
+
+    # ADX resets the movement of the first bar in each window to 0
+    true_range_average = _window_sum(ranges[1:], period) / period
+    positive_average = _window_sum(positive[1:], period - 1) / period
+    negative_average = _window_sum(negative[1:], period - 1) / period
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        positive_index = (positive_average / true_range_average) * 100
+        negative_index = (negative_average / true_range_average) * 100
+        values = np.abs(positive_index - negative_index) / (positive_index + negative_index) * 100
+    return _pad(values, len(ranges))
+
+
+@_with_dtype
+def cci(high, low, close, period=20, factor=0.015):
+    """
+    Calculate the Commodity Channel Index (CCI) series.
+
+    Parameters:
+        high (numpy array): The high prices.
+        low (numpy array): The low prices.
+        close (numpy array): The close prices.
+        period (int, optional): The number of periods to use in the CCI calculation. Default is 20.
+        factor (float, optional): The factor used to scale the Mean Deviation (MD). Default is 0.015.
+
+    Returns:
+        numpy array: The CCI values.
+    """
+    typical_prices = (_as_array(high) + _as_array(low) + _as_array(close)) / 3
+    if len(typical_prices) < period:
+        return _pad([], len(typical_prices))
+    windows = sliding_window_view(typical_prices, period)
+    sma = windows.mean(axis=1)
+    mean_deviation = np.abs(windows - sma[:, None]).mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = (typical_prices[period - 1:] - sma) / (factor * mean_deviation)
+    return _pad(values, len(typical_prices))
+
+
+@_with_dtype
+def stoch(high, low, close, period=14, smoothing_period=3):
+    """
+    Calculate the Stochastic Oscillator %K and %D series.
+
+    %K = (Current Close - Lowest Low)/(Highest High - Lowest Low) * 100 over `period` bars
+    %D = `smoothing_period` SMA of %K
+
+    Parameters:
+        high (numpy array): The high prices.
+        low (numpy array): The low prices.
+        close (numpy array): The close prices.
+        period (int, optional): The lookback of %K. Default is 14.
+        smoothing_period (int, optional): The lookback of %D. Default is 3.
+
+    Returns:
+        tuple: The %K and %D values.
+    """
+    close = _as_array(close)
+    highest_high = rolling_max(high, period)
+    lowest_low = rolling_min(low, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = (close - lowest_low) / (highest_high - lowest_low) * 100
+    d = _window_sum(k[period - 1:], smoothing_period) / smoothing_period
+    return k, _pad(d, len(close))
+
+
+@_with_dtype
+def bollinger_bands(prices, window=20, num_std=1):
+    """
+    Calculate the Bollinger Bands series, as BollingerBands does.
+
+    Parameters:
+        prices (numpy array): The prices in chronological order.
+        window (int, optional): The size of the moving window. Default is 20.
+        num_std (int, optional): The number of standard deviations for the Bollinger Bands. Default is 1.
+
+    Returns:
+        tuple: The upper band, middle band and lower band values.
+    """
+    prices = _as_array(prices)
+    if len(prices) < window:
+        return _pad([], len(prices)), _pad([], len(prices)), _pad([], len(prices))
+    windows = sliding_window_view(prices, window)
+    middle = windows.mean(axis=1)
+    std = windows.std(axis=1, ddof=1)
+    upper = middle + (num_std * std)
+    lower = middle - (num_std * std)
+    return _pad(upper, len(prices)), _pad(middle, len(prices)), _pad(lower, len(prices))
+
+
+@_with_dtype
+def stoch_rsi(prices, period=3, rsi_period=14, k_period=3):
+    """
+    Calculate the Stochastic RSI %K and %D series, as StochRSICalculator does.
+
+    Parameters:
+        prices (numpy array): The prices in chronological order.
+        period (int, optional): The number of %K values averaged into %D. Default is 3.
+        rsi_period (int, optional): The period of the Wilder RSI. Default is 14.
+        k_period (int, optional): The number of RSI values to consider for %K. Default is 3.
+
+    Returns:
+        tuple: The %K and %D values. %K is NaN where the RSI was flat over the window.
+    """
+    values = rsi(prices, rsi_period, method='wilder')
+    highest_rsi = rolling_max(values, k_period)
+    lowest_rsi = rolling_min(values, k_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(highest_rsi != lowest_rsi, (values - lowest_rsi) / (highest_rsi - lowest_rsi), np.nan)
+    d = _pad(_window_sum(k, period) / period, len(k))
+    return k, d
+
+
+def sessions(timestamps, session_length, session_offset=0):
+    """
+    Find where each session starts, as VWAP does with session_length set.
+
+    Parameters:
+        timestamps (numpy array): The timestamps of the bars.
+        session_length (float): The length of a session in timestamp units.
+        session_offset (float, optional): The timestamp at which sessions start. Default is 0.
+
+    Returns:
+        numpy array: The index of the first bar of every session.
+    """
+    timestamps = _as_array(timestamps)
+    session = (timestamps - session_offset) // session_length
+    return np.concatenate(([0], np.flatnonzero(np.diff(session)) + 1))
+
+
+def _session_cumsum(values, starts):
+    """Running sum of values that restarts at every session start."""
+    out = np.empty(len(values))
+    stops = np.append(starts[1:], len(values))
+    for start, stop in zip(starts, stops):
+        out[start:stop] = np.cumsum(values[start:stop])
+    return out
+
+
+@_with_dtype
+def vwap(prices, volumes, timestamps=None, session_length=None, session_offset=0, num_std=None):
+    """
+    Calculate the Volume Weighted Average Price (VWAP) series, restarting at every session.
+
+    The running totals are one cumulative sum per session, so a whole day of trades
+    is a handful of vectorized calls. The bands use the volume weighted standard deviation
+    of the session's prices, from a cumulative sum of West's updates against the VWAP
+    before and after each price, as VWAP computes it.
+
+    Parameters:
+        prices (numpy array): The prices.
+        volumes (numpy array): The volumes.
+        timestamps (numpy array, optional): The timestamps, needed with session_length.
+        session_length (float, optional): The length of a session in timestamp units. Default is None, which never resets.
+        session_offset (float, optional): The timestamp at which sessions start. Default is 0.
+        num_std (float, optional): The number of standard deviations for the bands. Default is None.
+
+    Returns:
+        numpy array: The VWAP values, or a tuple of the upper band, VWAP and lower band if num_std is set.
+    """
+    prices, volumes = _as_array(prices), _as_array(volumes)
+    if session_length is None:
+        starts = np.zeros(1, dtype=np.intp)
+    else:
+        starts = sessions(timestamps, session_length, session_offset)
+    total_volume = _session_cumsum(volumes, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = _session_cumsum(prices * volumes, starts) / total_volume
+    if num_std is None:
+        return values
+    # The VWAP before each price, or the price itself at the start of a session and before any volume
+    previous = np.concatenate((prices[:1], values[:-1]))
+    fresh = np.concatenate(([True], total_volume[:-1] == 0))[:len(prices)]
+    fresh[starts[starts < len(prices)]] = True
+    previous = np.where(fresh, prices, previous)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deviations = np.where(total_volume != 0, volumes * (prices - previous) * (prices - values), 0.0)
+        variance = _session_cumsum(deviations, starts) / total_volume
+    std = np.sqrt(np.maximum(variance, 0.0))
+    return values + num_std * std, values, values - num_std * std
+
+
+@_with_dtype
+def mvwap(prices, volumes, period=None, timestamps=None, window=None):
+    """
+    Calculate the Moving Volume Weighted Average Price (MVWAP) series.
+
+    Parameters:
+        prices (numpy array): The prices.
+        volumes (numpy array): The volumes.
+        period (int, optional): The number of bars in the window.
+        timestamps (numpy array, optional): The timestamps, needed with window.
+        window (float, optional): The length of the window in timestamp units, instead of period.
+
+    Returns:
+        numpy array: The MVWAP values.
+    """
+    prices, volumes = _as_array(prices), _as_array(volumes)
+    if (period is None) == (window is None):
+        raise ValueError("Set either period or window.")
+    if period is not None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = _window_sum(prices * volumes, period) / _window_sum(volumes, period)
+        return _pad(values, len(prices))
+    # Bars older than `window` before the latest one are out of the window
+    timestamps = _as_array(timestamps)
+    starts = np.searchsorted(timestamps, timestamps - window, side='right')
+    price_volume = np.concatenate(([0.0], np.cumsum(prices * volumes)))
+    volume = np.concatenate(([0.0], np.cumsum(volumes)))
+    stops = np.arange(1, len(prices) + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (price_volume[stops] - price_volume[starts]) / (volume[stops] - volume[starts])
@@ -0,0 +1,124 @@
+"""
+Fixed size storage for the streaming indicators.
+"""
+import numpy as np
+
+
+class RingBuffer:
+    """
+    A preallocated, array backed buffer that keeps only the last `capacity` values.
+
+    Appending when the buffer is full overwrites the oldest value, so memory stays
+    O(capacity) however many values are added. Indexing, iteration and
+    numpy.asarray() see the values in chronological order, oldest first.
+
+    Parameters:
+        capacity (int): The number of values to keep.
+        data (list or numpy array, optional): Initial values. Only the last `capacity` are kept.
+        dtype (numpy dtype, optional): The dtype of the backing array. Default is float.
+    """
+
+    def __init__(self, capacity, data=None, dtype=float):
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1.")
+        self.capacity = capacity
+        self._values = np.empty(capacity, dtype=dtype)
+        self._start = 0
+        self._length = 0
+        if data is not None:
+            self.extend(data)
+
+    def append(self, value):
+        """
+        Add a value, dropping the oldest one if the buffer is full.
+
+        Parameters:
+            value (float): The value to add.
+        """
+        end = self._start + self._length
+        if end >= self.capacity:
+            end -= self.capacity
+        self._values[end] = value
+        if self._length < self.capacity:
+            self._length += 1
+        else:
+            self._start = end + 1 if end + 1 < self.capacity else 0
+
+    def extend(self, values):
+        """
+        Add several values in chronological order.
+
+        Parameters:
+            values (list or numpy array): The values to add.
+        """
+        values = np.asarray(values, dtype=self._values.dtype)[-self.capacity:]
+        count = len(values)
+        if count == 0:
+            return
+        end = (self._start + self._length) % self.capacity
+        positions = (end + np.arange(count)) % self.capacity
+        self._values[positions] = values
+        overflow = max(self._length + count - self.capacity, 0)
+        self._length = min(self._length + count, self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+
+    def clear(self):
+        """Remove all values."""
+        self._start = 0
+        self._length = 0
+
+    @property
+    def full(self):
+        """bool: True once the buffer holds `capacity` values."""
+        return self._length == self.capacity
+
+    def to_array(self):
+        """
+        Returns:
+            numpy array: A copy of the values in chronological order.
+        """
+        end = self._start + self._length
+        if end <= self.capacity:
+            return self._values[self._start:end].copy()
+        return np.concatenate((self._values[self._start:], self._values[:end - self.capacity]))
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_array()[index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("RingBuffer index out of range")
+        index += self._start
+        if index >= self.capacity:
+            index -= self.capacity
+        return self._values[index]
+
+    def __iter__(self):
+        return iter(self.to_array())
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.to_array()
+        return values if dtype is None else values.astype(dtype)
+
+    def __repr__(self):
+        return 'RingBuffer({}, capacity={})'.format(self.to_array().tolist(), self.capacity)
+
+
+def make_history(max_history=None, dtype=float):
+    """
+    Create the storage for an indicator's output history.
+
+    Parameters:
+        max_history (int, optional): Keep only the last `max_history` values. Default is None, which keeps every value.
+        dtype (numpy dtype, optional): The dtype of the RingBuffer. Default is float.
+
+    Returns:
+        list or RingBuffer: An unbounded list, or a RingBuffer when max_history is given.
+    """
+    if max_history is None:
+        return []
+    return RingBuffer(max_history, dtype=dtype)
@@ -0,0 +1,291 @@
+"""
+Chunked computation of indicators over data that does not fit in memory.
+
+stream() runs an indicator over an iterable of chunks and yields the values
+of each chunk as it arrives. Between chunks only the lookback the indicator
+needs is kept (the last window of prices, or the running average), so memory
+is bounded by the chunk size. Each chunk is computed with the ilib.batch
+functions and the concatenated output is bit for bit the same as one call of
+the batch function over the whole input.
+
+    for rsi in stream(('rsi', {'period': 14}), chunks(store['close'], size=1000000)):
+        ...
+
+With dtype=np.float32 the values of each chunk are returned as float32, while
+the state carried between chunks stays float64, so rounding errors do not
+build up from one chunk to the next.
+"""
+import numpy as np
+
+from . import batch
+
+
+def chunks(*columns, size):
+    """
+    Split arrays into consecutive chunks of `size` rows.
+
+    Slices of NumPy arrays and memmaps are views, so no data is copied or read here.
+
+    Parameters:
+        columns (numpy arrays): The input columns, all of the same length.
+        size (int): The number of rows per chunk.
+
+    Yields:
+        numpy array or tuple: The next chunk of the column, or of each column when there are several.
+    """
+    for start in range(0, len(columns[0]), size):
+        chunk = tuple(column[start:start + size] for column in columns)
+        yield chunk if len(chunk) > 1 else chunk[0]
+
+
+def _tail(values, count):
+    """The last `count` values."""
+    return values[max(len(values) - count, 0):] if count > 0 else values[:0]
+
+
+class _WilderAverage:
+    """Wilder's average over consecutive chunks, matching batch.wilder_average over all of them."""
+
+    def __init__(self, period):
+        self.period = period
+        self.pending = []
+        self.average = None
+
+    def update(self, values):
+        out = np.full(len(values), np.nan)
+        start = 0
+        if self.average is None:
+            start = min(self.period - len(self.pending), len(values))
+            self.pending.extend(values[:start].tolist())
+            if len(self.pending) < self.period:
+                return out
+            self.average = sum(self.pending) / self.period
+            self.pending = []
+            out[start - 1] = self.average
+        if start < len(values):
+            out[start:] = batch.wilder_average(values[start:], self.period, initial=self.average)
+            self.average = float(out[-1])
+        return out
+
+
+class EMAStream:
+    """
+    EMA over consecutive chunks of prices, matching batch.ema.
+
+    Parameters:
+        window (int): The number of prices before the EMA is reported.
+        alpha (float): The smoothing factor. Default is 0.2.
+    """
+    fields = ('close',)
+
+    def __init__(self, window, alpha=0.2):
+        self.window = window
+        self.alpha = alpha
+        self.count = 0
+        self.average = None
+
+    def update(self, prices):
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) == 0:
+            return np.empty(0)
+        out = batch.exponential_average(prices, self.alpha, initial=self.average)
+        self.average = float(out[-1])
+        out[:max(self.window - self.count, 0)] = np.nan
+        self.count += len(prices)
+        return out
+
+
+class SMAStream:
+    """
+    SMA over consecutive chunks of prices, matching batch.sma.
+
+    batch.sma restarts its cumulative sums every `anchor_every` prices counted from the first
+    one, so the blocks are kept at the same positions here: the running sum of the current
+    block, the total of the last finished block and the cumulative sums of the last period - 1
+    prices carry over between chunks.
+
+    Parameters:
+        period (int): The number of prices in the average.
+        anchor_every (int): The block length of the cumulative sums. Default is 4096.
+    """
+    fields = ('close',)
+
+    def __init__(self, period, anchor_every=4096):
+        self.period = period
+        self.block = max(anchor_every, period)
+        self.count = 0
+        self.running = 0.0
+        self.inclusive = np.empty(0)
+        self.exclusive = np.empty(0)
+        self.totals = {}
+
+    def update(self, prices):
+        prices = np.asarray(prices, dtype=float)
+        length, block = len(prices), self.block
+        inclusive, exclusive = np.empty(length), np.empty(length)
+        position = 0
+        while position < length:
+            index = self.count + position
+            stop = min(length, (index // block + 1) * block - self.count)
+            start = self.running if index % block else 0.0
+            sums = np.add.accumulate(np.concatenate(([start], prices[position:stop])))
+            inclusive[position:stop], exclusive[position:stop] = sums[1:], sums[:-1]
+            self.running = float(sums[-1])
+            if (self.count + stop) % block == 0:
+                self.totals[index // block] = self.running
+            position = stop
+
+        inclusive = np.concatenate((self.inclusive, inclusive))
+        exclusive = np.concatenate((self.exclusive, exclusive))
+        first = self.count - len(self.inclusive)
+        ends = np.arange(max(self.count, self.period - 1), self.count + length)
+        starts = ends - self.period + 1
+        sums = inclusive[ends - first] - exclusive[starts - first]
+        spans = starts // block != ends // block
+        sums[spans] += np.array([self.totals[start // block] for start in starts[spans]], dtype=float)
+
+        out = np.full(length, np.nan)
+        out[ends - self.count] = sums / self.period
+        self.count += length
+        self.inclusive = _tail(inclusive, self.period - 1)
+        self.exclusive = _tail(exclusive, self.period - 1)
+        oldest = (self.count - self.period) // block
+        self.totals = {key: total for key, total in self.totals.items() if key >= oldest}
+        return out
+
+
+class RSIStream:
+    """
+    RSI over consecutive chunks of prices, matching batch.rsi.
+
+    Parameters:
+        period (int): The number of price changes in the averages. Default is 14.
+        method (str): 'sma' (default) or 'wilder', as in batch.rsi.
+    """
+    fields = ('close',)
+
+    def __init__(self, period=14, method='sma'):
+        if method not in ('sma', 'wilder'):
+            raise ValueError("method must be 'sma' or 'wilder'.")
+        self.period = period
+        self.method = method
+        # The last `period` prices for 'sma', the last price for 'wilder'
+        self.prices = np.empty(0)
+        self.gains = _WilderAverage(period)
+        self.losses = _WilderAverage(period)
+
+    def update(self, prices):
+        prices = np.asarray(prices, dtype=float)
+        joined = np.concatenate((self.prices, prices))
+        if self.method == 'sma':
+            out = batch.rsi(joined, self.period)[len(self.prices):]
+            self.prices = _tail(joined, self.period)
+            return out
+        gains, losses = batch.price_changes(joined)
+        avg_gain, avg_loss = self.gains.update(gains), self.losses.update(losses)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+        values[np.isnan(avg_gain)] = np.nan
+        self.prices = _tail(joined, 1)
+        return batch._pad(values, len(prices))
+
+
+class ATRStream:
+    """
+    ATR over consecutive chunks of bars, matching batch.atr.
+
+    Parameters:
+        period (int): The number of true ranges in the average. Default is 14.
+        method (str): 'sma' (default) or 'wilder', as in batch.atr.
+    """
+    fields = ('high', 'low', 'close')
+
+    def __init__(self, period=14, method='sma'):
+        if method not in ('sma', 'wilder'):
+            raise ValueError("method must be 'sma' or 'wilder'.")
+        self.period = period
+        self.method = method
+        # The last `period` bars for 'sma', the last bar for 'wilder'
+        self.bars = (np.empty(0), np.empty(0), np.empty(0))
+        self.ranges = _WilderAverage(period)
+
+    def update(self, high, low, close):
+        new = (np.asarray(high, dtype=float), np.asarray(low, dtype=float), np.asarray(close, dtype=float))
+        bars = tuple(np.concatenate(pair) for pair in zip(self.bars, new))
+        kept = len(self.bars[0])
+        if self.method == 'sma':
+            out = batch.atr(*bars, period=self.period)[kept:]
+        else:
+            ranges = batch.true_range(*bars)[1:]
+            out = batch._pad(self.ranges.update(ranges), len(new[0]))
+        self.bars = tuple(_tail(values, self.period if self.method == 'sma' else 1) for values in bars)
+        return out
+
+
+class BollingerBandsStream:
+    """
+    Bollinger Bands over consecutive chunks of prices, matching batch.bollinger_bands.
+
+    Parameters:
+        window (int): The number of prices in the moving window. Default is 20.
+        num_std (float): The number of standard deviations for the bands. Default is 1.
+    """
+    fields = ('close',)
+
+    def __init__(self, window=20, num_std=1):
+        self.window = window
+        self.num_std = num_std
+        self.prices = np.empty(0)
+
+    def update(self, prices):
+        joined = np.concatenate((self.prices, np.asarray(prices, dtype=float)))
+        bands = batch.bollinger_bands(joined, self.window, self.num_std)
+        kept = len(self.prices)
+        self.prices = _tail(joined, self.window - 1)
+        return tuple(values[kept:] for values in bands)
+
+
+INDICATORS = {
+    'ema': EMAStream,
+    'sma': SMAStream,
+    'rsi': RSIStream,
+    'atr': ATRStream,
+    'bollinger_bands': BollingerBandsStream,
+}
+
+
+def stream(spec, chunks, dtype=None):
+    """
+    Compute an indicator chunk by chunk.
+
+    Example:
+        for upper, middle, lower in stream(('bollinger_bands', {'window': 20, 'num_std': 2}), closes):
+            ...
+
+    Parameters:
+        spec (str, tuple or object): An indicator name ('ema', 'sma', 'rsi', 'atr' or 'bollinger_bands'),
+            a (name, parameters) tuple, or a stream object such as RSIStream(14) to carry on from.
+        chunks (iterable): The input chunks in chronological order. Each chunk is an array of prices,
+            a tuple of high, low and close arrays for 'atr', or a dict of arrays by field name.
+        dtype (numpy dtype, optional): The dtype of the yielded values, e.g. np.float32. Default is float64.
+
+    Yields:
+        numpy array or tuple: The values for each chunk, the same length as the chunk, NaN where
+            the batch function would be NaN.
+    """
+    if isinstance(spec, str):
+        spec = (spec, {})
+    if isinstance(spec, tuple):
+        name, params = spec
+        if name not in INDICATORS:
+            raise ValueError("Unknown indicator {!r}, expected one of {}.".format(name, ', '.join(INDICATORS)))
+        spec = INDICATORS[name](**params)
+    for chunk in chunks:
+        if isinstance(chunk, dict):
+            chunk = tuple(chunk[field] for field in spec.fields)
+        elif not isinstance(chunk, tuple):
+            chunk = (chunk,)
+        values = spec.update(*chunk)
+        if dtype is not None:
+            values = tuple(part.astype(dtype) for part in values) if isinstance(values, tuple) else values.astype(dtype)
+        yield values
@@ -0,0 +1,137 @@
+"""
+Kernels for the recursive smoothing loops, with a selectable backend.
+
+Wilder's average and the exponential moving average depend on the previous
+average, so they cannot be written as whole-array NumPy operations. The
+batch functions (and every class that uses them: EMA, MACD, RSI, DMI, ADX,
+ATR) run these recursions through the kernels below.
+
+Two backends are available:
+
+    'python'  A plain Python loop over the values. Always available, and the default.
+    'numba'   The same loop compiled with Numba on first use. Needs `pip install ilib[numba]`.
+
+Both evaluate the same expressions in the same order and give the same
+values. Select one with set_backend('numba'), or with the ILIB_BACKEND
+environment variable before ilib is imported.
+"""
+import os
+
+import numpy as np
+
+BACKENDS = ('python', 'numba')
+
+_backend = 'python'
+_compiled = {}
+
+
+def _python_wilder_smooth(values, period, average):
+    averages = []
+    for value in values.tolist():
+        average = (average * (period - 1) + value) / period
+        averages.append(average)
+    return np.array(averages, dtype=float)
+
+
+def _python_exponential_smooth(values, alpha, average):
+    averages = []
+    for value in values.tolist():
+        average = alpha * value + (1 - alpha) * average
+        averages.append(average)
+    return np.array(averages, dtype=float)
+
+
+def _numba_kernels():
+    """Compile the Numba kernels on first use."""
+    if not _compiled:
+        try:
+            import numba
+        except ImportError as error:
+            raise ImportError("The numba backend requires numba. Install it with `pip install ilib[numba]`.") from error
+
+        @numba.njit(cache=True)
+        def wilder_smooth(values, period, average):
+            averages = np.empty(len(values))
+            for index in range(len(values)):
+                average = (average * (period - 1) + values[index]) / period
+                averages[index] = average
+            return averages
+
+        @numba.njit(cache=True)
+        def exponential_smooth(values, alpha, average):
+            averages = np.empty(len(values))
+            for index in range(len(values)):
+                average = alpha * values[index] + (1 - alpha) * average
+                averages[index] = average
+            return averages
+
+        _compiled.update(wilder_smooth=wilder_smooth, exponential_smooth=exponential_smooth)
+    return _compiled
+
+
+def set_backend(name):
+    """
+    Select the backend of the recursive kernels.
+
+    Parameters:
+        name (str): 'python' or 'numba'.
+
+    Raises:
+        ImportError: If the backend needs a package that is not installed.
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError("Unknown backend {!r}, expected one of {}.".format(name, ', '.join(BACKENDS)))
+    if name == 'numba':
+        _numba_kernels()
+    _backend = name
+
+
+def get_backend():
+    """
+    Returns:
+        str: The backend in use.
+    """
+    return _backend
+
+
+def wilder_smooth(values, period, average):
+    """
+    Apply Wilder's smoothing to every value, starting from an average.
+
+    average = (previous average * (period - 1) + value) / period
+
+    Parameters:
+        values (numpy array): The float64 values to smooth.
+        period (int): The smoothing period.
+        average (float): The average before the first value.
+
+    Returns:
+        numpy array: The average after each value.
+    """
+    if _backend == 'numba':
+        return _compiled['wilder_smooth'](values, period, float(average))
+    return _python_wilder_smooth(values, period, average)
+
+
+def exponential_smooth(values, alpha, average):
+    """
+    Apply exponential smoothing to every value, starting from an average.
+
+    average = alpha * value + (1 - alpha) * previous average
+
+    Parameters:
+        values (numpy array): The float64 values to smooth.
+        alpha (float): The smoothing factor.
+        average (float): The average before the first value.
+
+    Returns:
+        numpy array: The average after each value.
+    """
+    if _backend == 'numba':
+        return _compiled['exponential_smooth'](values, float(alpha), float(average))
+    return _python_exponential_smooth(values, alpha, average)
+
+
+if os.environ.get('ILIB_BACKEND'):
+    set_backend(os.environ['ILIB_BACKEND'])
@@ -0,0 +1,79 @@
+"""
+Lazy evaluation for the streaming indicators.
+
+An indicator created with lazy=True does no calculation when data points are
+added: add_data_point and add_data_points only record the values and mark the
+indicator dirty. The first getter called afterwards (get_rsi, get_ATR,
+get_lines, ...) applies every pending data point with one add_data_points
+call, so an indicator fed sub-second ticks but read once per bar does one
+vectorized catch-up per bar instead of one update per tick:
+
+    rsi = RSI(14, lazy=True)
+    for price in ticks:
+        rsi.add_data_point(price)       # only appended
+    rsi.get_rsi()                       # one catch-up over all the ticks
+
+The values after a catch-up are the ones add_data_points gives, the same as
+adding the data points one at a time. Attributes such as rsi or rsi_values
+are only brought up to date by a getter or by catch_up(). The exception is
+RSI.add_data_points, which returns the RSI of the new prices and so catches
+up at once in lazy mode.
+"""
+import numpy as np
+
+
+class LazyUpdates:
+    """
+    Base class of the indicators that support lazy=True.
+
+    Attributes:
+        pending (list or None): One list of recorded values per add_data_point argument, or None when not lazy.
+    """
+
+    # Indicators restored from snapshots made before lazy mode existed are not lazy
+    pending = None
+
+    def set_lazy(self, lazy, fields):
+        """
+        Enable or disable lazy mode, applying any pending data points first.
+
+        Parameters:
+            lazy (bool): Whether data points are recorded and applied on the next getter call.
+            fields (int): The number of add_data_point arguments.
+        """
+        self.catch_up()
+        self.pending = [[] for _ in range(fields)] if lazy else None
+
+    def defer(self, *values):
+        """
+        Record one data point, given as the add_data_point arguments.
+        """
+        for column, value in zip(self.pending, values):
+            column.append(value)
+
+    def defer_many(self, *values):
+        """
+        Record several data points, given as the add_data_points arguments.
+        """
+        for column, column_values in zip(self.pending, values):
+            column.extend(np.asarray(column_values, dtype=float).tolist())
+
+    @property
+    def dirty(self):
+        """bool: Whether data points were recorded but not yet applied."""
+        return bool(self.pending and self.pending[0])
+
+    def catch_up(self):
+        """
+        Apply the pending data points with one add_data_points call.
+
+        Returns:
+            object: What add_data_points returned, or None if nothing was pending.
+        """
+        if not self.dirty:
+            return None
+        pending, self.pending = self.pending, None
+        try:
+            return self.add_data_points(*(np.array(column, dtype=float) for column in pending))
+        finally:
+            self.pending = [[] for _ in pending]
@@ -0,0 +1,606 @@
+"""
+Indicator pipelines that share intermediate series across indicators.
+
+A Pipeline holds the indicators declared over one OHLCV feed as a graph of
+nodes. Intermediate series such as the true range, the price changes, EMA(n)
+and the rolling mean over n bars are nodes keyed by what they compute and what
+they are computed from, so indicators that need the same one share a single
+node, and it is computed once per bar or once per batch:
+
+    pipeline = Pipeline()
+    pipeline.add('atr', 'atr', period=14, method='wilder')
+    pipeline.add('dmi', 'dmi', period=14)    # shares the smoothed true range with 'atr'
+    pipeline.add('bands', 'bollinger_bands', window=20, num_std=2)
+    pipeline.add('sma', 'sma', period=20)    # shares the rolling mean with 'bands'
+    values = pipeline.update(high=101.0, low=99.5, close=100.2)
+    series = pipeline.run(high=highs, low=lows, close=closes)
+
+update returns the latest value of every indicator, None until it is available.
+run returns the whole series of every indicator as NumPy arrays, NaN until it is
+available, computed with the vectorized functions in ilib.batch.
+"""
+import math
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from . import batch
+from .buffers import RingBuffer
+from .rolling import RollingMax, RollingMin, rolling_max, rolling_min
+
+
+class Node(ABC):
+    """
+    One series in a pipeline.
+
+    A node is updated once per bar from the latest values of its inputs, and only
+    once every input has a value. `warmup` is the number of bars the node needs
+    after its inputs have a value before it has one itself.
+
+    Parameters:
+        inputs (tuple): The nodes this one is computed from.
+    """
+    warmup = 0
+
+    def __init__(self, *inputs):
+        self.inputs = inputs
+        self.value = None
+
+    @abstractmethod
+    def update(self, *values):
+        """
+        Returns:
+            The value for the latest bar, or None if it is not available yet.
+        """
+
+    @abstractmethod
+    def compute(self, *series):
+        """
+        Returns:
+            numpy array: The whole series from the input series, NaN for the first `warmup` values.
+        """
+
+
+class Source(Node):
+    """A field of the feed: high, low, close or volume."""
+
+    def __init__(self, field):
+        super().__init__()
+        self.field = field
+
+    def update(self, value):
+        return value
+
+    def compute(self, values):
+        return values
+
+
+class TrueRange(Node):
+    """The true range of every bar after the first."""
+    warmup = 1
+
+    def __init__(self, high, low, close):
+        super().__init__(high, low, close)
+        self.previous_close = None
+
+    def update(self, high, low, close):
+        previous_close, self.previous_close = self.previous_close, close
+        if previous_close is None:
+            return None
+        return max(high - low, abs(high - previous_close), abs(low - previous_close))
+
+    def compute(self, high, low, close):
+        return batch.true_range(high, low, close)
+
+
+class Change(Node):
+    """The change of a series from one bar to the next."""
+    warmup = 1
+
+    def __init__(self, source):
+        super().__init__(source)
+        self.previous = None
+
+    def update(self, value):
+        previous, self.previous = self.previous, value
+        if previous is None:
+            return None
+        return value - previous
+
+    def compute(self, values):
+        return np.concatenate(([np.nan], np.diff(values)))
+
+
+class Gain(Node):
+    """The positive part of a change."""
+
+    def update(self, change):
+        return change if change > 0 else 0.0
+
+    def compute(self, changes):
+        return np.where(changes > 0, changes, 0.0)
+
+
+class Loss(Node):
+    """The negative part of a change, as a positive number."""
+
+    def update(self, change):
+        return -change if change < 0 else 0.0
+
+    def compute(self, changes):
+        return np.where(changes < 0, -changes, 0.0)
+
+
+class DirectionalMovement(Node):
+    """The positive or negative directional movement of every bar after the first."""
+    warmup = 1
+
+    def __init__(self, high, low, positive):
+        super().__init__(high, low)
+        self.positive = positive
+        self.previous_high = None
+        self.previous_low = None
+
+    def update(self, high, low):
+        previous_high, previous_low = self.previous_high, self.previous_low
+        self.previous_high, self.previous_low = high, low
+        if previous_high is None:
+            return None
+        high_movement = high - previous_high
+        low_movement = previous_low - low
+        if self.positive:
+            return high_movement if high_movement > low_movement and high_movement > 0 else 0
+        return low_movement if low_movement > high_movement and low_movement > 0 else 0
+
+    def compute(self, high, low):
+        movements = batch.directional_movements(high, low)[0 if self.positive else 1]
+        return np.concatenate(([np.nan], movements))
+
+
+class ExponentialAverage(Node):
+    """Exponential moving average with smoothing factor alpha, starting from the first value."""
+
+    def __init__(self, source, alpha):
+        super().__init__(source)
+        self.alpha = alpha
+        self.average = None
+
+    def update(self, value):
+        if self.average is None:
+            self.average = value
+        else:
+            self.average = self.alpha * value + (1 - self.alpha) * self.average
+        return self.average
+
+    def compute(self, values):
+        return batch.exponential_average(values, self.alpha)
+
+
+class WilderAverage(Node):
+    """Wilder's smoothed average, starting from the mean of the first `period` values."""
+
+    def __init__(self, source, period):
+        super().__init__(source)
+        self.period = period
+        self.warmup = period - 1
+        self.total = 0.0
+        self.count = 0
+        self.average = None
+
+    def update(self, value):
+        period = self.period
+        if self.average is None:
+            self.total += value
+            self.count += 1
+            if self.count < period:
+                return None
+            self.average = self.total / period
+        else:
+            self.average = (self.average * (period - 1) + value) / period
+        return self.average
+
+    def compute(self, values):
+        return batch.wilder_average(values, self.period)
+
+
+class RollingMoments(Node):
+    """
+    The mean and sum of squared deviations of the last `window` values, as a tuple.
+
+    They are updated with Welford's method as in BollingerBands, and recalculated
+    from the window every `window` values and whenever a NaN enters or leaves it.
+    """
+
+    def __init__(self, source, window):
+        super().__init__(source)
+        self.window = window
+        self.warmup = window - 1
+        self.values = RingBuffer(window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    def update(self, value):
+        values = self.values
+        oldest = None
+        if values.full:
+            oldest = values[0]
+            values.append(value)
+            delta = value - oldest
+            mean = self.mean + delta / self.window
+            self.m2 += delta * (value - mean + oldest - self.mean)
+            self.mean = mean
+        else:
+            values.append(value)
+            delta = value - self.mean
+            self.mean += delta / len(values)
+            self.m2 += delta * (value - self.mean)
+            if not values.full:
+                return None
+        self.updates += 1
+        # A NaN makes the running sums NaN for good, so the window is summed again while one enters or leaves
+        finite = math.isfinite(value) and (oldest is None or math.isfinite(oldest))
+        if self.updates % self.window == 0 or not finite:
+            window = values.to_array()
+            self.mean = float(window.mean())
+            self.m2 = float(((window - self.mean) ** 2).sum())
+        return self.mean, self.m2
+
+    def compute(self, values):
+        count = len(values)
+        if count < self.window:
+            return np.full(count, np.nan), np.full(count, np.nan)
+        windows = np.lib.stride_tricks.sliding_window_view(values, self.window)
+        mean = windows.mean(axis=1)
+        m2 = ((windows - mean[:, None]) ** 2).sum(axis=1)
+        return batch._pad(mean, count), batch._pad(m2, count)
+
+
+class Mean(Node):
+    """The mean from a RollingMoments node."""
+
+    def update(self, moments):
+        return moments[0]
+
+    def compute(self, moments):
+        return moments[0]
+
+
+class Band(Node):
+    """The mean plus `num_std` sample standard deviations from a RollingMoments node."""
+
+    def __init__(self, moments, num_std):
+        super().__init__(moments)
+        self.num_std = num_std
+        self.window = moments.window
+
+    def update(self, moments):
+        mean, m2 = moments
+        return mean + self.num_std * math.sqrt(max(m2, 0.0) / (self.window - 1))
+
+    def compute(self, moments):
+        mean, m2 = moments
+        return mean + self.num_std * np.sqrt(np.maximum(m2, 0.0) / (self.window - 1))
+
+
+class RollingExtremum(Node):
+    """The maximum or minimum of the last `window` values."""
+
+    def __init__(self, source, window, maximum):
+        super().__init__(source)
+        self.window = window
+        self.warmup = window - 1
+        self.maximum = maximum
+        self.extremum = RollingMax(window) if maximum else RollingMin(window)
+
+    def update(self, value):
+        extremum = self.extremum.append(value)
+        return extremum if self.extremum.count >= self.window else None
+
+    def compute(self, values):
+        return (rolling_max if self.maximum else rolling_min)(values, self.window)
+
+
+class Difference(Node):
+    """One series minus another."""
+
+    def update(self, first, second):
+        return first - second
+
+    def compute(self, first, second):
+        return first - second
+
+
+class Warmup(Node):
+    """A series that is only reported from its `bars`-th value on."""
+
+    def __init__(self, source, bars):
+        super().__init__(source)
+        self.warmup = bars - 1
+        self.count = 0
+
+    def update(self, value):
+        self.count += 1
+        return value if self.count > self.warmup else None
+
+    def compute(self, values):
+        values = np.array(values, dtype=float)
+        values[:self.warmup] = np.nan
+        return values
+
+
+class RelativeStrength(Node):
+    """The RSI from the average gain and loss."""
+
+    def update(self, avg_gain, avg_loss):
+        if avg_loss == 0:
+            return 100
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def compute(self, avg_gain, avg_loss):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+
+
+class DirectionalIndex(Node):
+    """+DI or -DI from the smoothed true range and directional movement, as DMI computes it."""
+
+    def update(self, true_range, movement):
+        if true_range == 0:
+            return 0.0
+        return (movement / true_range) * 100
+
+    def compute(self, true_range, movement):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(true_range == 0, 0, (movement / true_range) * 100)
+
+
+class DirectionalMovementIndex(Node):
+    """DX from +DI and -DI, as DMI computes it."""
+
+    def update(self, plus_di, minus_di):
+        total = plus_di + minus_di
+        return abs(plus_di - minus_di) / total * 100 if total != 0 else 0.0
+
+    def compute(self, plus_di, minus_di):
+        total = plus_di + minus_di
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total == 0, 0, np.abs(plus_di - minus_di) / total * 100)
+
+
+class Stochastic(Node):
+    """%K from the close and the highest high and lowest low, NaN when they are equal."""
+
+    def update(self, close, highest_high, lowest_low):
+        if highest_high == lowest_low:
+            return math.nan
+        return (close - lowest_low) / (highest_high - lowest_low) * 100
+
+    def compute(self, close, highest_high, lowest_low):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (close - lowest_low) / (highest_high - lowest_low) * 100
+
+
+def _sma(pipeline, period):
+    return pipeline.node(Mean, pipeline.node(RollingMoments, pipeline.source('close'), period))
+
+
+def _ema(pipeline, window, alpha=0.2):
+    return pipeline.node(Warmup, pipeline.node(ExponentialAverage, pipeline.source('close'), alpha), window + 1)
+
+
+def _macd(pipeline, short_period=12, long_period=26, signal_period=9):
+    close = pipeline.source('close')
+    short_ema = pipeline.node(ExponentialAverage, close, 2 / (short_period + 1))
+    long_ema = pipeline.node(ExponentialAverage, close, 2 / (long_period + 1))
+    line = pipeline.node(Difference, short_ema, long_ema)
+    signal = pipeline.node(ExponentialAverage, line, 2 / (signal_period + 1))
+    histogram = pipeline.node(Difference, line, signal)
+    return tuple(pipeline.node(Warmup, node, long_period) for node in (line, signal, histogram))
+
+
+def _rsi(pipeline, period=14, method='sma'):
+    change = pipeline.node(Change, pipeline.source('close'))
+    gain, loss = pipeline.node(Gain, change), pipeline.node(Loss, change)
+    if method == 'wilder':
+        avg_gain, avg_loss = pipeline.node(WilderAverage, gain, period), pipeline.node(WilderAverage, loss, period)
+    elif method == 'sma':
+        avg_gain = pipeline.node(Mean, pipeline.node(RollingMoments, gain, period))
+        avg_loss = pipeline.node(Mean, pipeline.node(RollingMoments, loss, period))
+    else:
+        raise ValueError("method must be 'sma' or 'wilder'.")
+    return pipeline.node(RelativeStrength, avg_gain, avg_loss)
+
+
+def _true_range(pipeline):
+    return pipeline.node(TrueRange, pipeline.source('high'), pipeline.source('low'), pipeline.source('close'))
+
+
+def _atr(pipeline, period=14, method='sma'):
+    if method == 'wilder':
+        return pipeline.node(WilderAverage, _true_range(pipeline), period)
+    if method == 'sma':
+        return pipeline.node(Mean, pipeline.node(RollingMoments, _true_range(pipeline), period))
+    raise ValueError("method must be 'sma' or 'wilder'.")
+
+
+def _dmi(pipeline, period=14):
+    high, low = pipeline.source('high'), pipeline.source('low')
+    average_true_range = _atr(pipeline, period, method='wilder')
+    plus_dm = pipeline.node(WilderAverage, pipeline.node(DirectionalMovement, high, low, True), period)
+    minus_dm = pipeline.node(WilderAverage, pipeline.node(DirectionalMovement, high, low, False), period)
+    plus_di = pipeline.node(DirectionalIndex, average_true_range, plus_dm)
+    minus_di = pipeline.node(DirectionalIndex, average_true_range, minus_dm)
+    dx = pipeline.node(DirectionalMovementIndex, plus_di, minus_di)
+    return plus_di, minus_di, dx, pipeline.node(WilderAverage, dx, period)
+
+
+def _bollinger_bands(pipeline, window=20, num_std=1):
+    moments = pipeline.node(RollingMoments, pipeline.source('close'), window)
+    return pipeline.node(Band, moments, num_std), pipeline.node(Mean, moments), pipeline.node(Band, moments, -num_std)
+
+
+def _stoch(pipeline, period=14, smoothing_period=3):
+    highest_high = pipeline.node(RollingExtremum, pipeline.source('high'), period, True)
+    lowest_low = pipeline.node(RollingExtremum, pipeline.source('low'), period, False)
+    k = pipeline.node(Stochastic, pipeline.source('close'), highest_high, lowest_low)
+    return k, pipeline.node(Mean, pipeline.node(RollingMoments, k, smoothing_period))
+
+
+# Indicator name -> function adding its nodes to a pipeline and returning its output node(s)
+INDICATORS = {
+    'sma': _sma,
+    'ema': _ema,
+    'macd': _macd,
+    'rsi': _rsi,
+    'atr': _atr,
+    'dmi': _dmi,
+    'bollinger_bands': _bollinger_bands,
+    'stoch': _stoch,
+}
+
+
+def _slice(values, start):
+    if isinstance(values, tuple):
+        return tuple(value[start:] for value in values)
+    return values[start:]
+
+
+def _pad(values, length):
+    if isinstance(values, tuple):
+        return tuple(batch._pad(value, length) for value in values)
+    return batch._pad(values, length)
+
+
+class Pipeline:
+    """
+    A set of indicators over one OHLCV feed that share their intermediate series.
+
+    Indicators are declared with add. Each shared intermediate is one node in the
+    pipeline, so declaring RSI, ATR, DMI, MACD, Bollinger Bands and SMA over the same
+    feed computes the true range, price changes, EMAs and rolling means once each.
+
+    Supported indicators and their parameters:
+        sma (period), ema (window, alpha=0.2), macd (short_period=12, long_period=26, signal_period=9),
+        rsi (period=14, method='sma'), atr (period=14, method='sma'), dmi (period=14),
+        bollinger_bands (window=20, num_std=1), stoch (period=14, smoothing_period=3)
+
+    macd returns the MACD line, signal line and histogram, dmi returns +DI, -DI, DX and ADX,
+    bollinger_bands returns the upper, middle and lower band and stoch returns %K and %D.
+    """
+
+    def __init__(self):
+        self.sources = {}
+        self.nodes = {}
+        self.outputs = {}
+
+    def source(self, field):
+        """
+        Returns:
+            Source: The node for a field of the feed.
+        """
+        if field not in self.sources:
+            self.sources[field] = Source(field)
+        return self.sources[field]
+
+    def node(self, kind, *args):
+        """
+        Return the node computing `kind` from `args`, creating it if no indicator needed it yet.
+
+        Nodes are created after the nodes they depend on, so the order of self.nodes is an
+        order in which they can be updated.
+
+        Parameters:
+            kind (class): The Node subclass.
+            args: The input nodes and parameters of the node.
+
+        Returns:
+            Node: The shared node.
+        """
+        key = (kind,) + args
+        if key not in self.nodes:
+            self.nodes[key] = kind(*args)
+        return self.nodes[key]
+
+    def add(self, name, indicator, **params):
+        """
+        Declare an indicator.
+
+        Parameters:
+            name (str): The name the indicator is reported under.
+            indicator (str): One of the supported indicators.
+            params: The parameters of the indicator.
+        """
+        if name in self.outputs:
+            raise ValueError("An indicator named {!r} was already added.".format(name))
+        if indicator not in INDICATORS:
+            raise ValueError("Unknown indicator {!r}, expected one of {}.".format(indicator, ', '.join(INDICATORS)))
+        self.outputs[name] = INDICATORS[indicator](self, **params)
+
+    def update(self, high=None, low=None, close=None, volume=None):
+        """
+        Add a bar and update every node once.
+
+        Parameters:
+            high (float): The latest high price.
+            low (float): The latest low price.
+            close (float): The latest close price.
+            volume (float): The latest volume.
+
+        Returns:
+            dict: The latest value of every indicator, None until it is available.
+        """
+        bar = {'high': high, 'low': low, 'close': close, 'volume': volume}
+        for field, source in self.sources.items():
+            if bar[field] is None:
+                raise ValueError("The pipeline needs {} values.".format(field))
+            source.value = bar[field]
+        for node in self.nodes.values():
+            values = [node_input.value for node_input in node.inputs]
+            node.value = None if any(value is None for value in values) else node.update(*values)
+        return self.values()
+
+    def values(self):
+        """
+        Returns:
+            dict: The latest value of every indicator, None until it is available.
+        """
+        return {name: tuple(node.value for node in output) if isinstance(output, tuple) else output.value
+                for name, output in self.outputs.items()}
+
+    def run(self, high=None, low=None, close=None, volume=None):
+        """
+        Compute the whole series of every indicator for a batch of bars, each node once.
+
+        This does not change the state used by update.
+
+        Parameters:
+            high (numpy array): The high prices.
+            low (numpy array): The low prices.
+            close (numpy array): The close prices.
+            volume (numpy array): The volumes.
+
+        Returns:
+            dict: The series of every indicator, NaN where it is not available.
+        """
+        bars = {'high': high, 'low': low, 'close': close, 'volume': volume}
+        # Node -> (series, index of the first value)
+        series = {}
+        length = None
+        for field, source in self.sources.items():
+            if bars[field] is None:
+                raise ValueError("The pipeline needs {} values.".format(field))
+            series[source] = (np.asarray(bars[field], dtype=float), 0)
+            length = len(series[source][0])
+        for node in self.nodes.values():
+            start = max(series[node_input][1] for node_input in node.inputs)
+            if start < length:
+                values = node.compute(*(_slice(series[node_input][0], start) for node_input in node.inputs))
+            else:
+                values = np.empty(0)
+            series[node] = (_pad(values, length), start + node.warmup)
+
+        def output(node):
+            return series[node][0]
+        return {name: tuple(output(node) for node in nodes) if isinstance(nodes, tuple) else output(nodes)
+                for name, nodes in self.outputs.items()}
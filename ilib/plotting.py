@@ -0,0 +1,177 @@
+"""
+Plotting for the indicators.
+
+matplotlib is optional and only imported the first time a plot is drawn, so
+`import ilib` stays cheap on machines that never plot. Install it with
+`pip install ilib[plot]`.
+"""
+
+
+def pyplot():
+    """
+    Import matplotlib.pyplot on first use.
+
+    Returns:
+        module: matplotlib.pyplot
+
+    Raises:
+        ImportError: If matplotlib is not installed.
+    """
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError as error:
+        raise ImportError("Plotting requires matplotlib. Install it with `pip install ilib[plot]`.") from error
+    return plt
+
+
+def show(draw, indicator):
+    """
+    Draw an indicator and show the plot.
+
+    Parameters:
+        draw (function): One of the draw_* functions in this module.
+        indicator (object): The indicator to plot.
+    """
+    plt = pyplot()
+    draw(plt, indicator)
+    plt.show()
+
+
+def save(draw, indicator, filename):
+    """
+    Draw an indicator and save the plot to a file.
+
+    Parameters:
+        draw (function): One of the draw_* functions in this module.
+        indicator (object): The indicator to plot.
+        filename (str): The filename to save the plot to.
+    """
+    plt = pyplot()
+    draw(plt, indicator)
+    plt.savefig(filename)
+    plt.close()
+
+
+def draw_adx(plt, indicator):
+    """Draw the prices and the Directional Movement Index of an ADX."""
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
+    ax1.plot(indicator.high_prices, label='High')
+    ax1.plot(indicator.low_prices, label='Low')
+    ax1.plot(indicator.close_prices, label='Close')
+    ax1.set_title('Stock')
+    ax1.set_ylabel('Price')
+    ax1.legend(loc='upper left')
+    ax2.plot(indicator.directional_movements, label='Directional Movement Index')
+    ax2.set_title('Directional Movement Index')
+    ax2.set_xlabel('Period')
+    ax2.set_ylabel('Directional Movement Index')
+    ax2.legend(loc='upper left')
+
+
+def draw_atr(plt, indicator):
+    """Draw the prices and the ATR values of an AverageTrueRange."""
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
+    ax1.set_title('Stock Prices')
+    ax1.plot(indicator.high_prices, label='High')
+    ax1.plot(indicator.low_prices, label='Low')
+    ax1.plot(indicator.close_prices, label='Close')
+    ax1.legend(loc='upper left')
+    ax2.set_title('ATR - {} period'.format(indicator.period))
+    ax2.plot(indicator.ATR_values, label='ATR')
+    plt.tight_layout()
+
+
+def draw_bollinger_bands(plt, indicator):
+    """Draw the prices and the bands of a BollingerBands."""
+    plt.figure(figsize=(12,6))
+    plt.title('Bollinger Bands - Period {} - {} Std. Deviation'.format(indicator.window, indicator.num_std))
+    # Only the last window of prices is kept, so line it up with the end of the bands
+    end = max(len(indicator.middle_band), len(indicator.data))
+    plt.plot(range(end - len(indicator.data), end), indicator.data, label='Price')
+    plt.plot(range(end - len(indicator.upper_band), end), indicator.upper_band, label='Upper Band')
+    plt.plot(range(end - len(indicator.middle_band), end), indicator.middle_band, label='Middle Band')
+    plt.plot(range(end - len(indicator.lower_band), end), indicator.lower_band, label='Lower Band')
+    plt.legend(loc='upper left')
+
+
+def draw_cci(plt, indicator):
+    """Draw the prices and the CCI values of a CCI."""
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
+    ax1.set_title('Stock Prices')
+    ax1.plot(indicator.high_prices, label='High')
+    ax1.plot(indicator.low_prices, label='Low')
+    ax1.plot(indicator.close_prices, label='Close')
+    ax1.legend(loc='upper left')
+    ax2.set_title('CCI - {} period'.format(indicator.period))
+    ax2.plot(indicator.cci_values, label='CCI')
+    plt.tight_layout()
+
+
+def draw_ema(plt, indicator):
+    """Draw the data and the EMA values of an EMA."""
+    plt.plot(indicator.ema_values, label='EMA')
+    plt.plot(indicator.data, label='Data')
+    plt.legend(loc = 'upper left')
+    plt.ylabel('EMA Values')
+    plt.title('EMA Chart - {} Period'.format(str(indicator.window)))
+
+
+def draw_rsi(plt, indicator):
+    """Draw the data and the RSI values of an RSI."""
+    # Only the last period + 1 prices are kept, so line them up with the end of the RSI values
+    end = max(len(indicator.rsi_values), len(indicator.data))
+    plt.plot(range(end - len(indicator.rsi_values), end), indicator.rsi_values, label='RSI')
+    plt.plot(range(end - len(indicator.data), end), indicator.data, label='Data')
+    plt.legend(loc = 'upper left')
+    plt.ylabel('RSI Values')
+    plt.xlabel('Current Calculation')
+    plt.title('RSI Chart')
+
+
+def draw_sma(plt, indicator):
+    """Draw the data and the SMA values of an SMA."""
+    # Only the last period of data is kept, so line it up with the end of the SMA values
+    end = max(len(indicator.sma_values), len(indicator.data))
+    plt.plot(range(end - len(indicator.sma_values), end), indicator.sma_values, label='SMA')
+    plt.plot(range(end - len(indicator.data), end), indicator.data, label='Data')
+    plt.legend(loc = 'upper left')
+    plt.ylabel('SMA Values')
+    plt.title('SMA Chart - {} Period'.format(str(indicator.period)))
+
+
+def draw_stoch(plt, indicator):
+    """Draw the prices and the %K and smoothed values of a STOCHOSCILLATOR."""
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
+    ax1.set_title('Stock Prices')
+    ax1.plot(indicator.high_prices, label='High Price')
+    ax1.plot(indicator.low_prices, label='Low Price')
+    ax1.plot(indicator.close_prices, label='Close Price')
+    ax1.legend(loc='upper left')
+    ax2.set_title('Stoch - {} Period - {} Smoothing Period'.format(indicator.period, indicator.smoothing_period))
+    ax2.plot(indicator.stoch_values, label='Stoch')
+    ax2.plot(indicator.smoothed_values, label='Smoothed')
+    ax2.legend(loc='upper left')
+    plt.tight_layout()
+
+
+def draw_stoch_rsi(plt, indicator):
+    """Draw the prices and the %K values of a StochRSICalculator."""
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6))
+    ax1.set_title('Stock Prices')
+    ax1.plot(indicator.prices, label='Stock Price')
+    ax1.legend(loc='upper left')
+    ax2.set_title('Stoch RSI - {} Period - {} RSI Period - {} K Period'.format(indicator.period, indicator.rsi_period, indicator.k_period))
+    ax2.plot(indicator.k_values, label='K Value')
+    ax2.legend(loc='upper left')
+    plt.tight_layout()
+
+
+def draw_vwap(plt, indicator):
+    """Draw the VWAP values of a VWAP."""
+    plt.figure(figsize=(12, 6))
+    plt.title('VWAP')
+    plt.plot(indicator.vwap_values, label='VWAP')
+    if len(indicator.mvwap_values):
+        end = len(indicator.vwap_values)
+        plt.plot(range(end - len(indicator.mvwap_values), end), indicator.mvwap_values, label='MVWAP')
+    plt.legend(loc='upper left')
@@ -0,0 +1,144 @@
+"""
+Rolling window extrema.
+
+RollingMax and RollingMin track the extreme of the last `window` values in
+amortized O(1) per value with a monotonic deque. rolling_max and rolling_min
+compute the same for a whole array in O(n) vectorized steps, whatever the
+window (van Herk/Gil-Werman block prefix and suffix extrema).
+"""
+from abc import ABC, abstractmethod
+from collections import deque
+
+import numpy as np
+
+
+class RollingExtremum(ABC):
+    """
+    Base class for RollingMax and RollingMin.
+
+    The deque holds (index, value) pairs of the values that can still become
+    the extreme of a later window, with the current extreme at the front.
+
+    Parameters:
+        window (int): The number of values in the window.
+    """
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window must be at least 1.")
+        self.window = window
+        self.count = 0
+        self.candidates = deque()
+
+    @abstractmethod
+    def dominates(self, new, old):
+        """Returns True if `new` makes `old` unable to be the extreme of any later window."""
+
+    def append(self, value):
+        """
+        Add a value, dropping the one that falls out of the window.
+
+        Parameters:
+            value (float): The new value.
+
+        Returns:
+            float: The extreme of the last `window` values.
+        """
+        candidates = self.candidates
+        while candidates and self.dominates(value, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self.count, value))
+        self.count += 1
+        if candidates[0][0] <= self.count - 1 - self.window:
+            candidates.popleft()
+        return candidates[0][1]
+
+    def extend(self, values):
+        """
+        Add several values, ending in the same state as appending them one at a time.
+
+        Only the last `window` values can still be candidates, so only they are appended.
+
+        Parameters:
+            values (list or numpy array): The new values in chronological order.
+        """
+        values = list(values)
+        if len(values) >= self.window:
+            self.candidates.clear()
+            self.count += len(values) - self.window
+            values = values[-self.window:]
+        for value in values:
+            self.append(value)
+
+    @property
+    def value(self):
+        """float: The extreme of the last `window` values, None before the first value."""
+        return self.candidates[0][1] if self.candidates else None
+
+    def __len__(self):
+        return min(self.count, self.window)
+
+
+class RollingMax(RollingExtremum):
+    """
+    Maximum of the last `window` values.
+    """
+
+    def dominates(self, new, old):
+        return new >= old
+
+
+class RollingMin(RollingExtremum):
+    """
+    Minimum of the last `window` values.
+    """
+
+    def dominates(self, new, old):
+        return new <= old
+
+
+def _rolling_extremum(values, window, ufunc, fill):
+    values = np.asarray(values, dtype=float)
+    count = len(values)
+    out = np.full(count, np.nan)
+    if count < window:
+        return out
+    # Split into blocks of `window` values. Every window spans the end of one block and the
+    # start of the next, so its extreme is the suffix extreme of the first block combined
+    # with the prefix extreme of the second.
+    blocks = -(-count // window)
+    padded = np.full(blocks * window, fill)
+    padded[:count] = values
+    padded = padded.reshape(blocks, window)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = ufunc(suffix[:count - window + 1], prefix[window - 1:count])
+    return out
+
+
+def rolling_max(values, window):
+    """
+    Calculate the maximum of every window of `window` consecutive values.
+
+    Parameters:
+        values (numpy array): The values.
+        window (int): The number of values in the window.
+
+    Returns:
+        numpy array: The maximum of the window ending at each value, NaN for the first window - 1 values.
+    """
+    return _rolling_extremum(values, window, np.maximum, -np.inf)
+
+
+def rolling_min(values, window):
+    """
+    Calculate the minimum of every window of `window` consecutive values.
+
+    Parameters:
+        values (numpy array): The values.
+        window (int): The number of values in the window.
+
+    Returns:
+        numpy array: The minimum of the window ending at each value, NaN for the first window - 1 values.
+    """
+    return _rolling_extremum(values, window, np.minimum, np.inf)
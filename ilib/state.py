@@ -0,0 +1,223 @@
+"""
+Compact binary snapshots of indicator state, for warm restarts.
+
+snapshot() encodes the state an indicator needs to carry on (its running
+averages, sums and lookback windows) without its output history: each
+attribute named in the class's `history` keeps only its latest value, so the
+getters still work after a restore. restore() rebuilds the indicator from
+the bytes, and adding data points to it gives the same values as adding them
+to the original. The size of a snapshot does not depend on how many data
+points the indicator has seen.
+
+    data = snapshot(rsi)
+    rsi = restore(data)
+    rsi.add_data_point(44.57)
+
+The encoding is versioned: the bytes start with MAGIC and FORMAT_VERSION, and
+restore() rejects snapshots written by a newer format.
+"""
+import struct
+from collections import deque
+
+import numpy as np
+
+from .ADX import ADX
+from .ATR import AverageTrueRange
+from .BollingerBands import BollingerBands
+from .buffers import RingBuffer
+from .CCI import CCI
+from .DMI import DMI
+from .EMA import EMA
+from .MACD import MACD
+from .rolling import RollingMax, RollingMin
+from .RSI import RSI
+from .SMA import SMA
+from .STOCHOSCILLATOR import STOCHOSCILLATOR
+from .STOCHRSI import StochRSICalculator
+from .VWAP import VWAP
+
+MAGIC = b'ILST'
+FORMAT_VERSION = 1
+
+# The classes a snapshot may contain, by name
+CLASSES = {cls.__name__: cls for cls in (
+    ADX, AverageTrueRange, BollingerBands, CCI, DMI, EMA, MACD, RSI, SMA, STOCHOSCILLATOR, StochRSICalculator, VWAP,
+    RollingMax, RollingMin,
+)}
+
+_COUNT = struct.Struct('<I')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+
+
+def _latest(values):
+    """A history reduced to its latest value."""
+    if isinstance(values, RingBuffer):
+        return RingBuffer(values.capacity, values.to_array()[-1:], values.to_array().dtype)
+    return list(values[-1:])
+
+
+def _write_text(text, out):
+    data = text.encode('utf-8')
+    out += _COUNT.pack(len(data))
+    out += data
+
+
+class _Writer:
+
+    def __init__(self):
+        self.out = bytearray()
+        # Buffers and objects already written, so that shared ones are restored shared. The values
+        # are kept so that their ids are not reused by the temporary buffers _latest makes.
+        self.seen = {}
+
+    def reference(self, value):
+        if id(value) in self.seen:
+            self.out += b'@' + _COUNT.pack(self.seen[id(value)][0])
+            return True
+        self.seen[id(value)] = (len(self.seen), value)
+        return False
+
+    def value(self, value):
+        out = self.out
+        if value is None:
+            out += b'N'
+        elif isinstance(value, (bool, np.bool_)):
+            out += b'T' if value else b'F'
+        elif isinstance(value, (int, np.integer)):
+            out += b'i' + _INT.pack(int(value))
+        elif isinstance(value, (float, np.floating)):
+            out += b'd' + _FLOAT.pack(float(value))
+        elif isinstance(value, str):
+            out += b's'
+            _write_text(value, out)
+        elif isinstance(value, (list, tuple, deque)):
+            out += {list: b'l', tuple: b't', deque: b'q'}[type(value)] + _COUNT.pack(len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, np.ndarray) and value.dtype != object:
+            values = np.ascontiguousarray(value.ravel(), dtype=value.dtype.newbyteorder('<'))
+            out += b'a'
+            _write_text(values.dtype.str, out)
+            out += _COUNT.pack(len(values)) + values.tobytes()
+        elif isinstance(value, RingBuffer):
+            if self.reference(value):
+                return
+            values = value.to_array()
+            out += b'r' + _COUNT.pack(value.capacity)
+            _write_text(values.dtype.str, out)
+            self.value(values.tolist() if values.dtype == object else values)
+        elif type(value).__name__ in CLASSES and type(value) is CLASSES[type(value).__name__]:
+            if self.reference(value):
+                return
+            history = getattr(value, 'history', ())
+            attributes = vars(value)
+            out += b'o'
+            _write_text(type(value).__name__, out)
+            out += _COUNT.pack(len(attributes))
+            for name, item in attributes.items():
+                _write_text(name, out)
+                self.value(_latest(item) if name in history else item)
+        else:
+            raise TypeError("Cannot snapshot a {} value.".format(type(value).__name__))
+
+
+class _Reader:
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.position = 0
+        self.seen = []
+
+    def take(self, size):
+        if self.position + size > len(self.data):
+            raise ValueError("The snapshot is truncated.")
+        chunk = self.data[self.position:self.position + size]
+        self.position += size
+        return chunk
+
+    def count(self):
+        return _COUNT.unpack(self.take(4))[0]
+
+    def text(self):
+        return bytes(self.take(self.count())).decode('utf-8')
+
+    def value(self):
+        tag = bytes(self.take(1))
+        if tag == b'N':
+            return None
+        if tag in (b'T', b'F'):
+            return tag == b'T'
+        if tag == b'i':
+            return _INT.unpack(self.take(8))[0]
+        if tag == b'd':
+            return _FLOAT.unpack(self.take(8))[0]
+        if tag == b's':
+            return self.text()
+        if tag in (b'l', b't', b'q'):
+            items = [self.value() for _ in range(self.count())]
+            return items if tag == b'l' else tuple(items) if tag == b't' else deque(items)
+        if tag == b'a':
+            dtype = np.dtype(self.text())
+            length = self.count()
+            return np.frombuffer(self.take(length * dtype.itemsize), dtype=dtype).astype(dtype.newbyteorder('='))
+        if tag == b'@':
+            index = self.count()
+            if index >= len(self.seen):
+                raise ValueError("Bad reference in snapshot.")
+            return self.seen[index]
+        if tag == b'r':
+            capacity = self.count()
+            dtype = np.dtype(self.text())
+            buffer = RingBuffer(capacity, self.value(), dtype)
+            self.seen.append(buffer)
+            return buffer
+        if tag == b'o':
+            name = self.text()
+            if name not in CLASSES:
+                raise ValueError("Unknown class {!r} in snapshot.".format(name))
+            indicator = CLASSES[name].__new__(CLASSES[name])
+            self.seen.append(indicator)
+            for _ in range(self.count()):
+                attribute = self.text()
+                setattr(indicator, attribute, self.value())
+            return indicator
+        raise ValueError("Unknown tag {!r} in snapshot.".format(tag))
+
+
+def snapshot(indicator):
+    """
+    Encode the state of an indicator, without its output history.
+
+    Parameters:
+        indicator (object): An ilib indicator, e.g. RSI, EMA, MACD, ADX or DMI.
+
+    Returns:
+        bytes: The snapshot.
+    """
+    if type(indicator).__name__ not in CLASSES:
+        raise TypeError("Cannot snapshot a {}.".format(type(indicator).__name__))
+    writer = _Writer()
+    writer.out += MAGIC + bytes([FORMAT_VERSION])
+    writer.value(indicator)
+    return bytes(writer.out)
+
+
+def restore(data):
+    """
+    Rebuild an indicator from a snapshot.
+
+    Parameters:
+        data (bytes): A snapshot made by snapshot().
+
+    Returns:
+        object: The indicator, ready for new data points.
+    """
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not an ilib snapshot.")
+    version = data[len(MAGIC)]
+    if version > FORMAT_VERSION:
+        raise ValueError("Snapshot format {} is newer than the supported format {}.".format(version, FORMAT_VERSION))
+    reader = _Reader(data)
+    reader.position = len(MAGIC) + 1
+    return reader.value()
@@ -0,0 +1,199 @@
+"""
+On-disk columnar storage for prices and indicator series.
+
+A ColumnStore is a directory holding one raw binary file per column and a
+columns.json file with the number of rows and the dtype of every column.
+Columns are opened with np.memmap, so reading a column maps the file instead
+of loading it, and the ilib.batch functions (and add_data_points) work on the
+mapped arrays directly. Results are written back the same way, straight from
+NumPy arrays into new column files.
+
+    store = ColumnStore('data/AAPL')
+    store.append(open=o, high=h, low=l, close=c, volume=v)     # grows every column
+    store.compute('rsi_14', batch.rsi, 'close', period=14)      # persists a new column
+    store['rsi_14'][-1]                                         # memmap, read on demand
+"""
+import json
+import os
+import re
+
+import numpy as np
+
+METADATA = 'columns.json'
+
+_NAME = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class ColumnStore:
+    """
+    A directory of equal length columns, each stored as a raw little-endian file and read through np.memmap.
+
+    Parameters:
+        path (str): The directory of the store. It is created if it does not exist, unless mode is 'r'.
+        mode (str): 'r' opens the store read only, 'r+' for reading and writing. Default is 'r+'.
+
+    Attributes:
+        rows (int): The number of rows in every column.
+        dtypes (dict): The dtype of every column by name, in the order they were added.
+    """
+
+    def __init__(self, path, mode='r+'):
+        if mode not in ('r', 'r+'):
+            raise ValueError("mode must be 'r' or 'r+'.")
+        self.path = path
+        self.mode = mode
+        self.rows = 0
+        self.dtypes = {}
+        metadata = os.path.join(path, METADATA)
+        if os.path.exists(metadata):
+            with open(metadata) as file:
+                stored = json.load(file)
+            self.rows = stored['rows']
+            self.dtypes = {name: np.dtype(dtype) for name, dtype in stored['columns'].items()}
+        elif mode == 'r':
+            raise FileNotFoundError("No column store at {}.".format(path))
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.save_metadata()
+
+    def save_metadata(self):
+        """
+        Write the number of rows and the column dtypes to columns.json.
+        """
+        stored = {'rows': self.rows, 'columns': {name: dtype.str for name, dtype in self.dtypes.items()}}
+        with open(os.path.join(self.path, METADATA), 'w') as file:
+            json.dump(stored, file)
+
+    def column_path(self, name):
+        """
+        Returns:
+            str: The file of the column.
+        """
+        return os.path.join(self.path, name + '.bin')
+
+    def _check_writable(self):
+        if self.mode == 'r':
+            raise ValueError("The column store at {} is read only.".format(self.path))
+
+    @property
+    def columns(self):
+        """
+        Returns:
+            list: The column names.
+        """
+        return list(self.dtypes)
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, name):
+        return name in self.dtypes
+
+    def __getitem__(self, name):
+        """
+        Map a column into memory without reading it.
+
+        Returns:
+            numpy memmap: The column, writable unless the store is read only.
+        """
+        if name not in self.dtypes:
+            raise KeyError(name)
+        if self.rows == 0:
+            # A file of zero bytes cannot be mapped
+            return np.empty(0, dtype=self.dtypes[name])
+        return np.memmap(self.column_path(name), dtype=self.dtypes[name], mode=self.mode, shape=(self.rows,))
+
+    def allocate(self, name, dtype=float):
+        """
+        Create a column of `rows` values (zeros) to be filled in place.
+
+        Parameters:
+            name (str): The column name.
+            dtype (numpy dtype): The column dtype. Default is float64.
+
+        Returns:
+            numpy memmap: The new, writable column.
+        """
+        self._check_writable()
+        if not _NAME.match(name):
+            raise ValueError("Column names may only use letters, digits, '_', '.' and '-', got {!r}.".format(name))
+        dtype = np.dtype(dtype).newbyteorder('<')
+        with open(self.column_path(name), 'wb') as file:
+            file.truncate(self.rows * dtype.itemsize)
+        self.dtypes[name] = dtype
+        self.save_metadata()
+        return self[name]
+
+    def write(self, name, values, dtype=None):
+        """
+        Store a column, replacing any column of the same name.
+
+        Parameters:
+            name (str): The column name.
+            values (numpy array): One value per row. The first column written sets the number of rows.
+            dtype (numpy dtype, optional): The column dtype. Default is the dtype of values.
+
+        Returns:
+            numpy memmap: The stored column.
+        """
+        values = np.asarray(values)
+        if values.ndim != 1:
+            raise ValueError("A column must be one-dimensional.")
+        if not self.dtypes:
+            self.rows = len(values)
+        elif len(values) != self.rows:
+            raise ValueError("Column {} has {} values, the store has {} rows.".format(name, len(values), self.rows))
+        column = self.allocate(name, values.dtype if dtype is None else dtype)
+        if len(values):
+            column[:] = values
+            column.flush()
+        return column
+
+    def append(self, **columns):
+        """
+        Append rows to every column, e.g. store.append(close=closes, volume=volumes).
+
+        Each file is extended in place, so the existing rows are not read or rewritten. An empty
+        store takes its columns from the first call; after that every column must be given.
+
+        Parameters:
+            columns (numpy arrays): The new values of each column, all of the same length.
+        """
+        self._check_writable()
+        if self.dtypes and set(columns) != set(self.dtypes):
+            raise ValueError("append needs every column: {}.".format(', '.join(self.dtypes)))
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Every column needs the same number of new rows.")
+        for name, values in columns.items():
+            if name not in self.dtypes:
+                self.allocate(name, np.asarray(values).dtype)
+        for name, values in columns.items():
+            with open(self.column_path(name), 'ab') as file:
+                np.asarray(values, dtype=self.dtypes[name]).tofile(file)
+        self.rows += lengths.pop() if lengths else 0
+        self.save_metadata()
+
+    def compute(self, names, function, *inputs, **params):
+        """
+        Run an indicator over stored columns and store its output.
+
+        The input columns are passed to the function as memmaps, so they are read as the
+        function touches them rather than copied first.
+
+        Example:
+            store.compute(('upper', 'middle', 'lower'), batch.bollinger_bands, 'close', window=20, num_std=2)
+
+        Parameters:
+            names (str or tuple): The output column name, or one name per output of the function.
+            function (callable): An ilib.batch function, or any function returning arrays of `rows` values.
+            inputs (str): The names of the input columns, in the order the function takes them.
+            params: Keyword arguments for the function.
+
+        Returns:
+            numpy memmap or tuple: The stored output columns.
+        """
+        output = function(*(self[name] for name in inputs), **params)
+        if isinstance(names, str):
+            return self.write(names, output)
+        return tuple(self.write(name, values) for name, values in zip(names, output))
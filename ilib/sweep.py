@@ -0,0 +1,163 @@
+"""
+Parameter sweeps over many symbols on a process pool.
+
+sweep runs one indicator for every (symbol, parameter set) pair with the
+vectorized functions in ilib.batch. The input price arrays and the result
+arrays live in shared memory: workers attach to them by name and write their
+results in place, so neither the prices nor the result series are pickled.
+Only the job list is sent to each worker, once.
+
+    closes = np.vstack([...])                  # one row per symbol
+    results = sweep('rsi', {'close': closes}, grid(period=range(5, 50)))
+    results['rsi']                             # one row per job
+    results['symbol'], results['period']       # the job of each row
+
+The result is columnar: a dict of NumPy arrays with one entry per job for the
+symbol and each parameter, and one (jobs x bars) array per output series.
+"""
+import itertools
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from . import batch
+
+
+def _stoch(high, low, close, period=14, smoothing_period=3, oversold_threshold=20, overbought_threshold=80):
+    k, d = batch.stoch(high, low, close, period, smoothing_period)
+    # 1 where STOCHOSCILLATOR.is_oversold, -1 where is_overbought
+    signal = np.where(k <= oversold_threshold, 1.0, np.where(k >= overbought_threshold, -1.0, 0.0))
+    signal[np.isnan(k)] = np.nan
+    return k, d, signal
+
+
+# Indicator -> (input fields, output names, function of the inputs and parameters)
+INDICATORS = {
+    'rsi': (('close',), ('rsi',), lambda close, **params: batch.rsi(close, **params)),
+    'sma': (('close',), ('sma',), lambda close, **params: batch.sma(close, **params)),
+    'ema': (('close',), ('ema',), lambda close, **params: batch.ema(close, **params)),
+    'macd': (('close',), ('macd', 'signal', 'histogram'), lambda close, **params: batch.macd(close, **params)),
+    'bollinger_bands': (('close',), ('upper', 'middle', 'lower'), lambda close, **params: batch.bollinger_bands(close, **params)),
+    'atr': (('high', 'low', 'close'), ('atr',), lambda high, low, close, **params: batch.atr(high, low, close, **params)),
+    'stoch': (('high', 'low', 'close'), ('k', 'd', 'signal'), _stoch),
+}
+
+
+def grid(**values):
+    """
+    Every combination of the given parameter values.
+
+    Example:
+        grid(window=[10, 20], num_std=[1, 2]) gives four parameter sets.
+
+    Returns:
+        list: One dict of parameters per combination.
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+# Worker state, set once per worker process by _start_worker
+_worker = {}
+
+
+def _start_worker(indicator, jobs, inputs, outputs):
+    # Worker processes share the resource tracker of the process that created the blocks, which
+    # unlinks them when the sweep is done
+    blocks = {}
+    arrays = {}
+    for name, (block_name, shape) in {**inputs, **outputs}.items():
+        blocks[name] = shared_memory.SharedMemory(name=block_name)
+        arrays[name] = np.ndarray(shape, dtype=float, buffer=blocks[name].buf)
+    _worker.update(indicator=indicator, jobs=jobs, blocks=blocks, arrays=arrays)
+
+
+def _stop_worker():
+    blocks = _worker.get('blocks', {})
+    _worker.clear()
+    for block in blocks.values():
+        block.close()
+
+
+def _run_jobs(bounds):
+    fields, names, function = INDICATORS[_worker['indicator']]
+    arrays = _worker['arrays']
+    for job in range(*bounds):
+        symbol, params = _worker['jobs'][job]
+        values = function(*(arrays[field][symbol] for field in fields), **params)
+        if len(names) == 1:
+            values = (values,)
+        for name, series in zip(names, values):
+            arrays[name][job] = series
+
+
+def _shared_array(values, blocks):
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    blocks.append(block)
+    np.ndarray(values.shape, dtype=float, buffer=block.buf)[:] = values
+    return block.name, values.shape
+
+
+def sweep(indicator, data, params, symbols=None, processes=None, chunksize=16):
+    """
+    Run an indicator for every symbol and parameter set on a process pool.
+
+    Parameters:
+        indicator (str): One of 'rsi', 'sma', 'ema', 'macd', 'bollinger_bands', 'atr' or 'stoch'.
+        data (dict): The input fields of the indicator ('close', or 'high', 'low' and 'close'),
+            each a 2-D array with one row per symbol and one column per bar.
+        params (list): The parameter sets, as dicts of keyword arguments for the matching
+            ilib.batch function. 'stoch' also takes oversold_threshold and overbought_threshold.
+        symbols (list, optional): The symbol names, one per row. Default is the row numbers.
+        processes (int, optional): The number of worker processes. Default is the number of CPUs;
+            1 runs every job in this process, without shared memory.
+        chunksize (int, optional): The number of jobs sent to a worker at a time. Default is 16.
+
+    Returns:
+        dict: 'symbol' and one entry per parameter name with one value per job, and one
+            (jobs x bars) array per output series of the indicator.
+    """
+    if indicator not in INDICATORS:
+        raise ValueError("Unknown indicator {!r}, expected one of {}.".format(indicator, ', '.join(INDICATORS)))
+    fields, names, _ = INDICATORS[indicator]
+    missing = [field for field in fields if field not in data]
+    if missing:
+        raise ValueError("{} needs {} prices.".format(indicator, ', '.join(missing)))
+    inputs = {field: np.atleast_2d(np.asarray(data[field], dtype=float)) for field in fields}
+    n_symbols, n_bars = inputs[fields[0]].shape
+    if symbols is None:
+        symbols = list(range(n_symbols))
+    params = list(params)
+    jobs = [(symbol, dict(parameters)) for symbol in range(n_symbols) for parameters in params]
+
+    results = {'symbol': np.array([symbols[symbol] for symbol, _ in jobs])}
+    for name in dict.fromkeys(name for parameters in params for name in parameters):
+        results[name] = np.array([parameters.get(name) for _, parameters in jobs])
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    outputs = {name: np.empty((len(jobs), n_bars)) for name in names}
+    bounds = [(start, min(start + chunksize, len(jobs))) for start in range(0, len(jobs), chunksize)]
+    if processes == 1:
+        _worker.update(indicator=indicator, jobs=jobs, blocks={}, arrays={**inputs, **outputs})
+        try:
+            for chunk in bounds:
+                _run_jobs(chunk)
+        finally:
+            _stop_worker()
+    else:
+        blocks = []
+        try:
+            shared_inputs = {field: _shared_array(values, blocks) for field, values in inputs.items()}
+            shared_outputs = {name: _shared_array(values, blocks) for name, values in outputs.items()}
+            with Pool(processes, _start_worker, (indicator, jobs, shared_inputs, shared_outputs)) as pool:
+                pool.map(_run_jobs, bounds)
+            for name, block in zip(names, blocks[len(inputs):]):
+                outputs[name][:] = np.ndarray(outputs[name].shape, dtype=float, buffer=block.buf)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    results.update(outputs)
+    return results
@@ -7,7 +7,8 @@ setup(
         packages=find_packages(),
         license='MIT',
         description='A package for various technical indicators',
-        install_requires=['numpy', 'pandas', 'matplotlib'],
+        install_requires=['numpy'],
+        extras_require={'plot': ['matplotlib'], 'pandas': ['pandas'], 'numba': ['numba']},
         author='Devin Thakker',
         author_email='devin.thakker@outlook.com',
         url='https://github.com/devthakker/ilib',
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from ilib import batch
+
+try:
+    import pandas as pd
+    import ilib.accessor  # noqa: F401, registers df.ilib
+except ImportError:
+    pd = None
+
+
+@unittest.skipIf(pd is None, 'pandas is not installed')
+class AccessorTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        close = 100 + np.cumsum(rng.normal(0, 1, 300))
+        self.frame = pd.DataFrame({
+            'High': close + rng.uniform(0, 1, 300),
+            'Low': close - rng.uniform(0, 1, 300),
+            'Close': close,
+        }, index=pd.date_range('2024-01-01', periods=300, freq='min'))
+
+    def test_matches_batch_functions(self):
+        frame = self.frame
+        high, low, close = frame['High'].to_numpy(), frame['Low'].to_numpy(), frame['Close'].to_numpy()
+        rsi = frame.ilib.rsi(14)
+        self.assertEqual(rsi.name, 'rsi_14')
+        self.assertTrue(rsi.index.equals(frame.index))
+        np.testing.assert_array_equal(rsi.to_numpy(), batch.rsi(close, 14))
+        np.testing.assert_array_equal(frame.ilib.atr(14, method='wilder').to_numpy(), batch.atr(high, low, close, 14, method='wilder'))
+        bands = frame.ilib.bbands(20, 2)
+        self.assertEqual(list(bands.columns), ['bb_upper', 'bb_middle', 'bb_lower'])
+        for name, expected in zip(bands.columns, batch.bollinger_bands(close, 20, 2)):
+            np.testing.assert_array_equal(bands[name].to_numpy(), expected)
+        np.testing.assert_array_equal(frame.ilib.macd()['macd_signal'].to_numpy(), batch.macd(close)[1])
+        np.testing.assert_array_equal(frame.ilib.stoch()['stoch_d'].to_numpy(), batch.stoch(high, low, close)[1])
+        np.testing.assert_array_equal(frame.ilib.dmi()['adx'].to_numpy(), batch.dmi(high, low, close)[3])
+
+    def test_reads_columns_without_copying(self):
+        column = self.frame.ilib.column('close')
+        self.assertTrue(np.shares_memory(column, self.frame['Close'].to_numpy()))
+        with self.assertRaises(KeyError):
+            self.frame.ilib.column('volume')
+
+    def test_groupby_symbol(self):
+        # Two symbols interleaved row by row, as in a long panel
+        other = self.frame * 1.5
+        panel = pd.concat([self.frame.assign(symbol='A'), other.assign(symbol='B')]).sort_index(kind='stable')
+        rsi = panel.ilib.rsi(14, method='wilder', by='symbol')
+        self.assertTrue(rsi.index.equals(panel.index))
+        np.testing.assert_array_equal(rsi[(panel['symbol'] == 'A').to_numpy()].to_numpy(), batch.rsi(self.frame['Close'], 14, method='wilder'))
+        np.testing.assert_array_equal(rsi[(panel['symbol'] == 'B').to_numpy()].to_numpy(), batch.rsi(other['Close'], 14, method='wilder'))
+
+        atr = panel.ilib.atr(14, by=panel['symbol'].to_numpy())
+        np.testing.assert_array_equal(atr[(panel['symbol'] == 'B').to_numpy()].to_numpy(),
+                                      batch.atr(other['High'], other['Low'], other['Close'], 14))
+        bands = panel.ilib.bbands(20, 2, by='symbol')
+        np.testing.assert_array_equal(bands['bb_lower'][(panel['symbol'] == 'A').to_numpy()].to_numpy(),
+                                      batch.bollinger_bands(self.frame['Close'], 20, 2)[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+import ilib
+
+# Chunk boundaries chosen to fall before, at and after each indicator's warm-up
+CUTS = [0, 3, 14, 15, 16, 29, 60, 61, 200]
+
+
+def state(value):
+    """Indicator state as plain nested Python values, so two states compare with ==."""
+    if isinstance(value, (ilib.buffers.RingBuffer, list, tuple)) or type(value).__name__ == 'deque':
+        return [state(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return [state(item) for item in value.tolist()]
+    if isinstance(value, (float, np.floating)) and np.isnan(value):
+        return 'nan'
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+        return float(value)
+    if hasattr(value, '__dict__'):
+        return {key: state(item) for key, item in vars(value).items()}
+    return value
+
+
+class AddDataPointsTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(23)
+        # Rounded prices so that flat changes and ties show up
+        close = np.round(100 + np.cumsum(rng.normal(0, 1, 400)), 1)
+        self.high = (close + np.round(rng.uniform(0, 1, 400), 1)).tolist()
+        self.low = (close - np.round(rng.uniform(0, 1, 400), 1)).tolist()
+        self.close = close.tolist()
+        self.volume = rng.integers(0, 100, 400).astype(float).tolist()
+        self.timestamp = np.cumsum(rng.uniform(0, 1.6, 400)).tolist()
+
+    def assert_same_state(self, make, columns):
+        one_at_a_time = make()
+        for row in zip(*columns):
+            one_at_a_time.add_data_point(*row)
+        expected = state(one_at_a_time)
+        for cut in CUTS:
+            bulk = make()
+            for chunk in (slice(0, cut), slice(cut, cut + 1), slice(cut + 1, cut + 50), slice(cut + 50, None)):
+                bulk.add_data_points(*(column[chunk] for column in columns))
+            self.assertEqual(state(bulk), expected, '{} split at {}'.format(type(bulk).__name__, cut))
+
+    def test_price_indicators(self):
+        prices = [self.close]
+        self.assert_same_state(lambda: ilib.EMA(20), prices)
+        self.assert_same_state(lambda: ilib.EMA(20, streaming=True), prices)
+        self.assert_same_state(lambda: ilib.MACD(12, 26, 9), prices)
+        self.assert_same_state(lambda: ilib.MACD(12, 26, 9, streaming=True), prices)
+        self.assert_same_state(lambda: ilib.RSI(14), prices)
+        self.assert_same_state(lambda: ilib.RSI(14, method='wilder', max_history=10), prices)
+        self.assert_same_state(lambda: ilib.SMA(None, 20), prices)
+        self.assert_same_state(lambda: ilib.BollingerBands(20, 2), prices)
+        self.assert_same_state(lambda: ilib.StochRSICalculator(3, 14, 5), prices)
+
+    def test_bar_indicators(self):
+        bars = [self.high, self.low, self.close]
+        self.assert_same_state(lambda: ilib.AverageTrueRange(14), bars)
+        self.assert_same_state(lambda: ilib.AverageTrueRange(14, method='wilder'), bars)
+        self.assert_same_state(lambda: ilib.ADX(14), bars)
+        self.assert_same_state(lambda: ilib.ADX(14, method='wilder'), bars)
+        self.assert_same_state(lambda: ilib.DMI(14), bars)
+        self.assert_same_state(lambda: ilib.CCI(20), bars)
+        self.assert_same_state(lambda: ilib.STOCHOSCILLATOR(14, 3, 20, 80, max_history=50), bars)
+
+    def test_vwap(self):
+        trades = [self.close, self.volume, self.timestamp]
+        self.assert_same_state(lambda: ilib.VWAP(), trades)
+        self.assert_same_state(lambda: ilib.VWAP(session_length=100, num_std=2), trades)
+        self.assert_same_state(lambda: ilib.VWAP(session_length=100, mvwap_period=20), trades)
+        self.assert_same_state(lambda: ilib.VWAP(mvwap_window=10), trades)
+
+    def test_dmi_returns_values_per_bar(self):
+        dmi = ilib.DMI(14)
+        atr, plus_di, minus_di, dx, adx = dmi.add_data_points(self.high, self.low, self.close)
+        expected = ilib.batch.dmi(self.high, self.low, self.close, 14)
+        for values, reference in zip((plus_di, minus_di, dx, adx), expected):
+            np.testing.assert_array_equal(values, reference)
+        np.testing.assert_array_equal(atr, ilib.batch.atr(self.high, self.low, self.close, 14, method='wilder'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import unittest
+
+import numpy as np
+
+from ilib import MACD, RSI, VWAP, AverageTrueRange, StochRSICalculator
+from ilib.aio import AsyncFeed
+
+
+async def tick_source(ticks, produced=None, pause_every=None):
+    for index, tick in enumerate(ticks):
+        if produced is not None:
+            produced.append(index)
+        if pause_every and index % pause_every == 0:
+            await asyncio.sleep(0)
+        yield tick
+
+
+def collect(feed, source, delay=0):
+    async def consume():
+        batches = []
+        async for values in feed.run(source):
+            batches.append(values)
+            if delay:
+                await asyncio.sleep(delay)
+        return batches
+    return asyncio.run(consume())
+
+
+class AsyncFeedTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(13)
+        self.ticks = []
+        for index in range(600):
+            close = 100 + rng.normal(0, 1)
+            self.ticks.append({'symbol': 'AB'[index % 2], 'high': close + 0.5, 'low': close - 0.5, 'close': close,
+                               'volume': float(rng.integers(1, 100)), 'timestamp': float(index)})
+
+    def make_feed(self, **options):
+        feed = AsyncFeed(**options)
+        feed.add('rsi', lambda: RSI(14))
+        feed.add('atr', lambda: AverageTrueRange(14, method='wilder'))
+        feed.add('vwap', lambda: VWAP())
+        return feed
+
+    def expected(self, symbol):
+        rsi, atr, vwap = RSI(14), AverageTrueRange(14, method='wilder'), VWAP()
+        for tick in self.ticks:
+            if tick['symbol'] == symbol:
+                rsi.add_data_point(tick['close'])
+                atr.add_data_point(tick['high'], tick['low'], tick['close'])
+                vwap.add_data_point(tick['close'], tick['volume'], tick['timestamp'])
+        return {'rsi': rsi.get_rsi(), 'atr': atr.get_ATR(), 'vwap': vwap.get_latest_vwap()}
+
+    def test_matches_synchronous_indicators(self):
+        for pause_every in (None, 1, 7):
+            feed = self.make_feed(max_batch=64)
+            batches = collect(feed, tick_source(self.ticks, pause_every=pause_every))
+            latest = {}
+            for values in batches:
+                latest.update(values)
+            self.assertEqual(latest, {'A': self.expected('A'), 'B': self.expected('B')})
+            rsi = RSI(14)
+            for tick in self.ticks[::2]:
+                rsi.add_data_point(tick['close'])
+            self.assertEqual(feed.indicator('A', 'rsi').rsi_values, rsi.rsi_values)
+
+    def test_micro_batches_ticks_that_arrive_together(self):
+        feed = self.make_feed(max_batch=50)
+        batches = collect(feed, tick_source(self.ticks))
+        # A source that never waits has all its ticks queued at once, so every batch is full
+        self.assertEqual(len(batches), 12)
+
+        feed = self.make_feed(max_batch=50)
+        self.assertGreater(len(collect(feed, tick_source(self.ticks, pause_every=1))), 12)
+
+    def test_backpressure(self):
+        produced = []
+        consumed = []
+        feed = self.make_feed(max_batch=10, max_pending=20, max_results=2)
+
+        async def consume():
+            async for values in feed.run(tick_source(self.ticks, produced, pause_every=1)):
+                consumed.append(len(produced))
+                await asyncio.sleep(0.001)
+        asyncio.run(consume())
+        # The source is never further ahead of the consumer than the pending ticks, the waiting
+        # results and the batch in progress
+        for batch, read in enumerate(consumed):
+            self.assertLessEqual(read - (batch + 1) * 10, 20 + 10 * (2 + 1) + 1)
+
+    def test_errors_reach_the_consumer(self):
+        async def failing():
+            yield self.ticks[0]
+            raise RuntimeError('feed dropped')
+        with self.assertRaises(RuntimeError):
+            collect(self.make_feed(), failing())
+
+        with self.assertRaises(ValueError):
+            self.make_feed().add('rsi', lambda: RSI(14))
+
+    def test_ticks_missing_fields_are_skipped(self):
+        feed = self.make_feed()
+        values = feed.apply([{'symbol': 'A', 'close': 101.0}, {'symbol': 'A', 'close': 102.0}])
+        self.assertEqual(values, {'A': {'rsi': None, 'atr': None, 'vwap': None}})
+        self.assertEqual(len(feed.indicator('A', 'rsi').data), 2)
+        self.assertEqual(len(feed.indicator('A', 'atr').close_prices), 0)
+
+    def test_indicators_warming_up_report_none(self):
+        feed = AsyncFeed()
+        feed.add('macd', lambda: MACD())
+        feed.add('stoch_rsi', lambda: StochRSICalculator())
+        batches = collect(feed, tick_source(self.ticks[:6]))
+        for values in batches:
+            for symbol in values:
+                self.assertEqual(values[symbol], {'macd': (None, None, None), 'stoch_rsi': None})
+
+    def test_latest_values_of_macd_and_stoch_rsi(self):
+        feed = AsyncFeed(max_batch=16)
+        feed.add('macd', lambda: MACD())
+        feed.add('stoch_rsi', lambda: StochRSICalculator())
+        latest = {}
+        for values in collect(feed, tick_source(self.ticks)):
+            latest.update(values)
+        macd, stoch_rsi = MACD(), StochRSICalculator()
+        for tick in self.ticks[::2]:
+            macd.add_data_point(tick['close'])
+            stoch_rsi.add_data_point(tick['close'])
+        self.assertEqual(latest['A']['macd'], macd.get_lines())
+        self.assertEqual(latest['A']['stoch_rsi'], stoch_rsi.get_k_values()[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from ilib import EMA, RSI, SMA, ATRBank, AverageTrueRange, EMABank, RSIBank, SMABank
+
+
+N_SYMBOLS = 20
+N_BARS = 80
+
+
+class IndicatorBankTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, (N_BARS, N_SYMBOLS)), axis=0)
+        self.high = self.close + rng.uniform(0, 1, (N_BARS, N_SYMBOLS))
+        self.low = self.close - rng.uniform(0, 1, (N_BARS, N_SYMBOLS))
+        # Not every symbol ticks on every bar
+        self.ticks = [np.flatnonzero(rng.uniform(size=N_SYMBOLS) < 0.8) for _ in range(N_BARS)]
+
+    def test_ema_bank_matches_class(self):
+        bank = EMABank(10, N_SYMBOLS)
+        emas = [EMA(10) for _ in range(N_SYMBOLS)]
+        for bar, ids in enumerate(self.ticks):
+            values = bank.update(ids, self.close[bar, ids])
+            for symbol, value in zip(ids, values):
+                emas[symbol].add_data_point(self.close[bar, symbol])
+                expected = emas[symbol].get_EMA()
+                if expected is None:
+                    self.assertTrue(np.isnan(value))
+                else:
+                    self.assertEqual(value, expected)
+
+    def test_rsi_bank_matches_class(self):
+        bank = RSIBank(14, N_SYMBOLS)
+        rsis = [RSI(14) for _ in range(N_SYMBOLS)]
+        for bar, ids in enumerate(self.ticks):
+            bank.update(ids, self.close[bar, ids])
+            for symbol in ids:
+                rsis[symbol].add_data_point(self.close[bar, symbol])
+        for symbol in range(N_SYMBOLS):
+            self.assertAlmostEqual(bank.get(symbol)[0], rsis[symbol].get_rsi())
+
+    def test_atr_bank_matches_class(self):
+        bank = ATRBank(14, N_SYMBOLS)
+        atrs = [AverageTrueRange(14) for _ in range(N_SYMBOLS)]
+        for bar, ids in enumerate(self.ticks):
+            bank.update(ids, self.high[bar, ids], self.low[bar, ids], self.close[bar, ids])
+            for symbol in ids:
+                atrs[symbol].add_data_point(self.high[bar, symbol], self.low[bar, symbol], self.close[bar, symbol])
+        np.testing.assert_allclose(bank.get(), [atr.get_ATR() for atr in atrs], rtol=1e-12)
+
+    def test_sma_bank_matches_class(self):
+        bank = SMABank(5, N_SYMBOLS)
+        smas = [SMA([], 5) for _ in range(N_SYMBOLS)]
+        for bar, ids in enumerate(self.ticks):
+            bank.update(ids, self.close[bar, ids])
+            for symbol in ids:
+                smas[symbol].add_data_point(self.close[bar, symbol])
+        np.testing.assert_allclose(bank.get(), [sma.get_smavalue() for sma in smas], rtol=1e-12)
+
+    def test_values_are_nan_until_available(self):
+        bank = RSIBank(14, 3)
+        for price in range(14):
+            bank.update([0, 1], [price, price])
+        self.assertTrue(np.isnan(bank.get()).all())
+        bank.update([0], [20])
+        self.assertEqual(bank.get(0)[0], 100)
+        self.assertTrue(np.isnan(bank.get([1, 2])).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from ilib import ADX, RSI, AverageTrueRange, batch
+
+
+def random_bars(count, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    high = close + rng.uniform(0, 1, count)
+    low = close - rng.uniform(0, 1, count)
+    return high, low, close
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.high, self.low, self.close = random_bars(200)
+
+    def test_rsi_matches_class(self):
+        expected = []
+        rsi = RSI(14)
+        for price in self.close:
+            rsi.add_data_point(price)
+            expected.append(np.nan if rsi.get_rsi() is None else rsi.get_rsi())
+        np.testing.assert_allclose(batch.rsi(self.close, 14), expected, rtol=1e-12)
+
+    def test_atr_matches_class(self):
+        expected = []
+        atr = AverageTrueRange(14)
+        for bar in zip(self.high, self.low, self.close):
+            atr.add_data_point(*bar)
+            expected.append(np.nan if atr.get_ATR() is None else atr.get_ATR())
+        np.testing.assert_allclose(batch.atr(self.high, self.low, self.close, 14), expected, rtol=1e-12)
+
+    def test_adx_matches_class(self):
+        expected = []
+        adx = ADX(14)
+        for bar in zip(self.high, self.low, self.close):
+            adx.add_data_point(*bar)
+            value = adx.get_directional_movement_index()
+            expected.append(np.nan if value is None else value)
+        np.testing.assert_allclose(batch.adx(self.high, self.low, self.close, 14), expected, rtol=1e-10)
+
+    def test_cci_matches_rolling_definition(self):
+        period = 20
+        typical_prices = (self.high + self.low + self.close) / 3
+        values = batch.cci(self.high, self.low, self.close, period)
+        self.assertTrue(np.isnan(values[:period - 1]).all())
+        for i in range(period - 1, len(typical_prices)):
+            window = typical_prices[i - period + 1:i + 1]
+            sma = window.mean()
+            mean_deviation = np.abs(window - sma).mean()
+            self.assertAlmostEqual(values[i], (typical_prices[i] - sma) / (0.015 * mean_deviation))
+
+    def test_stoch_matches_rolling_definition(self):
+        period, smoothing_period = 14, 3
+        k, d = batch.stoch(self.high, self.low, self.close, period, smoothing_period)
+        for i in range(period - 1, len(self.close)):
+            highest_high = self.high[i - period + 1:i + 1].max()
+            lowest_low = self.low[i - period + 1:i + 1].min()
+            self.assertAlmostEqual(k[i], (self.close[i] - lowest_low) / (highest_high - lowest_low) * 100)
+        for i in range(period + smoothing_period - 2, len(self.close)):
+            self.assertAlmostEqual(d[i], k[i - smoothing_period + 1:i + 1].mean())
+        self.assertTrue(np.isnan(d[:period + smoothing_period - 2]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import importlib.util
+import os
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, 'benchmarks', name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class BenchmarksTest(unittest.TestCase):
+
+    def test_every_exported_indicator_is_benchmarked(self):
+        import ilib
+        from ilib.bank import IndicatorBank
+        exported = {value.__name__ for value in vars(ilib).values()
+                    if isinstance(value, type) and hasattr(value, 'add_data_point') and not issubclass(value, IndicatorBank)}
+        self.assertEqual(exported, set(load('run').INDICATORS))
+
+    def test_run_and_compare(self):
+        run, compare = load('run'), load('compare')
+        results = run.run(sizes=[200], ticks=5, log=lambda line: None)
+        self.assertEqual(len(results['results']), len(run.INDICATORS))
+        for result in results['results']:
+            self.assertGreater(result['tick_latency_us'], 0)
+            self.assertGreater(result['peak_memory_bytes'], 0)
+        old = {(result['indicator'], result['size']): result for result in results['results']}
+        rows, regressions = compare.compare(old, old)
+        self.assertEqual(len(rows), 3 * len(old))
+        self.assertEqual(regressions, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
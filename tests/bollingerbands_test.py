@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from ilib import BollingerBands, batch
+
+
+class BollingerBandsTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.prices = 1000 + np.cumsum(rng.normal(0, 1, 500))
+
+    def test_streaming_matches_batch(self):
+        bands = BollingerBands(20, 2)
+        for price in self.prices:
+            bands.add_data_point(price)
+        upper, middle, lower = batch.bollinger_bands(self.prices, 20, 2)
+        np.testing.assert_allclose(bands.upper_band, upper[19:], rtol=1e-10)
+        np.testing.assert_allclose(bands.middle_band, middle[19:], rtol=1e-12)
+        np.testing.assert_allclose(bands.lower_band, lower[19:], rtol=1e-10)
+        self.assertEqual(len(bands.data), 20)
+
+    def test_initial_data_then_stream(self):
+        bands = BollingerBands(20, 2, list(self.prices[:100]), max_history=50)
+        for price in self.prices[100:]:
+            bands.add_data_point(price)
+        window = self.prices[-20:]
+        upper, middle, lower = bands.get_BollingerBands()
+        self.assertAlmostEqual(middle, window.mean())
+        self.assertAlmostEqual(upper - middle, 2 * window.std(ddof=1))
+        self.assertAlmostEqual(middle - lower, 2 * window.std(ddof=1))
+        self.assertEqual(len(bands.upper_band), 50)
+
+    def test_not_enough_data(self):
+        bands = BollingerBands(20, 2, [1.0, 2.0, 3.0])
+        self.assertEqual(bands.get_BollingerBands(), (None, None, None))
+        self.assertEqual(bands.upper_band, [])
+
+    def test_batch_matches_pandas_rolling(self):
+        pd = __import__('pandas')
+        series = pd.Series(self.prices)
+        upper, middle, lower = batch.bollinger_bands(self.prices, 20, 2)
+        expected_middle = series.rolling(20).mean().values
+        expected_std = series.rolling(20).std().values
+        np.testing.assert_allclose(middle, expected_middle, rtol=1e-12)
+        np.testing.assert_allclose(upper, expected_middle + 2 * expected_std, rtol=1e-10)
+
+    def test_window_of_one_gives_nan_bands(self):
+        prices = [101.0, 102.5, 99.0, 100.25]
+        one_at_a_time = BollingerBands(1, 2)
+        for price in prices:
+            one_at_a_time.add_data_point(price)
+        chunked = BollingerBands(1, 2)
+        chunked.add_data_points(prices)
+        for bands in (one_at_a_time, chunked):
+            upper, middle, lower = bands.get_BollingerBands()
+            self.assertTrue(np.isnan(upper) and np.isnan(lower))
+            self.assertEqual(middle, prices[-1])
+            np.testing.assert_array_equal(bands.middle_band, prices)
+            self.assertTrue(np.isnan(bands.upper_band).all() and np.isnan(bands.lower_band).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from ilib import ADX, CCI, RSI, STOCHOSCILLATOR, AverageTrueRange, batch
+from ilib.buffers import RingBuffer, make_history
+
+
+class RingBufferTest(unittest.TestCase):
+
+    def test_keeps_last_values_in_order(self):
+        buffer = RingBuffer(3)
+        for value in range(5):
+            buffer.append(value)
+        self.assertEqual(len(buffer), 3)
+        self.assertTrue(buffer.full)
+        self.assertEqual(list(buffer), [2, 3, 4])
+        self.assertEqual(buffer[0], 2)
+        self.assertEqual(buffer[-1], 4)
+        self.assertEqual(buffer[-2:].tolist(), [3, 4])
+        np.testing.assert_array_equal(np.asarray(buffer), [2, 3, 4])
+        with self.assertRaises(IndexError):
+            buffer[3]
+
+    def test_extend_matches_append(self):
+        appended = RingBuffer(4)
+        extended = RingBuffer(4, [0, 1])
+        for value in range(7):
+            appended.append(value)
+        extended.clear()
+        extended.extend(range(3))
+        extended.extend(range(3, 7))
+        self.assertEqual(list(extended), list(appended))
+
+    def test_make_history(self):
+        self.assertEqual(make_history(), [])
+        self.assertEqual(make_history(5).capacity, 5)
+
+
+class BoundedIndicatorTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 300))
+        self.high = self.close + rng.uniform(0, 1, 300)
+        self.low = self.close - rng.uniform(0, 1, 300)
+
+    def test_rsi_memory_is_bounded(self):
+        rsi = RSI(14, max_history=10)
+        for price in self.close:
+            rsi.add_data_point(price)
+        self.assertEqual(len(rsi.data), 15)
+        self.assertEqual(len(rsi.rsi_values), 10)
+        self.assertAlmostEqual(rsi.get_rsi(), batch.rsi(self.close, 14)[-1])
+
+    def test_atr_and_adx_memory_is_bounded(self):
+        atr = AverageTrueRange(14, max_history=5)
+        adx = ADX(14, max_history=5)
+        for bar in zip(self.high, self.low, self.close):
+            atr.add_data_point(*bar)
+            adx.add_data_point(*bar)
+        self.assertEqual(len(atr.close_prices), 15)
+        self.assertEqual(len(atr.ATR_values), 5)
+        self.assertEqual(len(adx.high_prices), 15)
+        self.assertEqual(len(adx.directional_movements), 5)
+        self.assertAlmostEqual(atr.get_ATR(), batch.atr(self.high, self.low, self.close, 14)[-1])
+        self.assertAlmostEqual(adx.get_directional_movement_index(), batch.adx(self.high, self.low, self.close, 14)[-1])
+
+    def test_stoch_uses_last_period(self):
+        stoch = STOCHOSCILLATOR(14, 3, 20, 80, max_history=5)
+        for bar in zip(self.high, self.low, self.close):
+            stoch.add_data_point(*bar)
+        k, d = batch.stoch(self.high, self.low, self.close, 14, 3)
+        self.assertEqual(len(stoch.high_prices), 14)
+        self.assertEqual(len(stoch.stoch_values), 5)
+        self.assertAlmostEqual(stoch.get_stoch(), k[-1])
+
+    def test_cci_memory_is_bounded(self):
+        cci = CCI(20, max_history=5)
+        for bar in zip(self.high, self.low, self.close):
+            cci.add_data_point(*bar)
+        self.assertEqual(len(cci.close_prices), 20)
+        self.assertEqual(len(cci.typical_prices), 20)
+        self.assertEqual(len(cci.cci_values), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
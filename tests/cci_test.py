@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from ilib import CCI, batch
+
+
+class CCITest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        close = 100 + np.cumsum(rng.normal(0, 1, 200))
+        self.high = (close + rng.uniform(0, 1, 200)).tolist()
+        self.low = (close - rng.uniform(0, 1, 200)).tolist()
+        self.close = close.tolist()
+
+    def test_streaming_matches_batch(self):
+        cci = CCI(20)
+        for bar in zip(self.high, self.low, self.close):
+            cci.add_data_point(*bar)
+        expected = batch.cci(self.high, self.low, self.close, 20)
+        self.assertTrue(np.isnan(expected[:19]).all())
+        np.testing.assert_allclose(list(cci.cci_values), expected[19:], rtol=1e-9)
+
+    def test_matches_reference(self):
+        cci = CCI(20, self.high, self.low, self.close, factor=0.02)
+        typical = (np.array(self.high) + np.array(self.low) + np.array(self.close))[-20:] / 3
+        mean_deviation = np.abs(typical - typical.mean()).mean()
+        self.assertAlmostEqual(cci.get_cci(), (typical[-1] - typical.mean()) / (0.02 * mean_deviation))
+
+    def test_initial_data_then_ticks(self):
+        cci = CCI(20, self.high[:50], self.low[:50], self.close[:50])
+        for bar in zip(self.high[50:], self.low[50:], self.close[50:]):
+            cci.add_data_point(*bar)
+        expected = batch.cci(self.high, self.low, self.close, 20)
+        self.assertEqual(len(cci.cci_values), len(expected) - 19)
+        self.assertAlmostEqual(cci.get_cci(), expected[-1])
+
+    def test_not_enough_data(self):
+        cci = CCI(20, self.high[:10], self.low[:10], self.close[:10])
+        self.assertIsNone(cci.get_cci())
+        self.assertEqual(len(cci.cci_values), 0)
+
+    def test_initial_prices_must_come_together(self):
+        with self.assertRaises(ValueError):
+            CCI(20, self.close)
+        with self.assertRaises(ValueError):
+            CCI(20, self.high, self.low)
+        with self.assertRaises(ValueError):
+            CCI(20, self.high, self.low, self.close[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
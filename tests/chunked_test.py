@@ -0,0 +1,83 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from ilib import ColumnStore, batch, stream
+from ilib.chunked import RSIStream, chunks
+
+# Chunk lengths cycled through, including single values and empty chunks
+SIZES = [1, 7, 0, 13, 250, 2, 999]
+
+
+def split(columns, sizes):
+    """Cut columns into chunks of the given lengths, repeated until the end."""
+    start, index = 0, 0
+    while start < len(columns[0]):
+        stop = start + sizes[index % len(sizes)]
+        chunk = tuple(column[start:stop] for column in columns)
+        yield chunk if len(chunk) > 1 else chunk[0]
+        start, index = stop, index + 1
+
+
+def joined(outputs):
+    outputs = list(outputs)
+    if isinstance(outputs[0], tuple):
+        return tuple(np.concatenate(part) for part in zip(*outputs))
+    return np.concatenate(outputs)
+
+
+class StreamTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(41)
+        self.close = np.round(100 + np.cumsum(rng.normal(0, 1, 3000)), 2)
+        self.high = self.close + rng.uniform(0, 1, 3000)
+        self.low = self.close - rng.uniform(0, 1, 3000)
+
+    def assert_identical(self, actual, expected):
+        if isinstance(expected, tuple):
+            for actual_values, expected_values in zip(actual, expected):
+                self.assert_identical(actual_values, expected_values)
+            return
+        self.assertEqual(actual.tobytes(), expected.tobytes())
+
+    def test_matches_batch_bit_for_bit(self):
+        close, bars = [self.close], [self.high, self.low, self.close]
+        cases = [
+            (('ema', {'window': 20}), close, batch.ema(self.close, 20)),
+            (('sma', {'period': 20}), close, batch.sma(self.close, 20)),
+            (('sma', {'period': 20, 'anchor_every': 64}), close, batch.sma(self.close, 20, anchor_every=64)),
+            (('rsi', {'period': 14}), close, batch.rsi(self.close, 14)),
+            (('rsi', {'period': 14, 'method': 'wilder'}), close, batch.rsi(self.close, 14, method='wilder')),
+            (('atr', {'period': 14}), bars, batch.atr(self.high, self.low, self.close, 14)),
+            (('atr', {'period': 14, 'method': 'wilder'}), bars, batch.atr(self.high, self.low, self.close, 14, method='wilder')),
+            (('bollinger_bands', {'window': 20, 'num_std': 2}), close, batch.bollinger_bands(self.close, 20, 2)),
+        ]
+        for spec, columns, expected in cases:
+            for sizes in ([1], SIZES, [3000]):
+                with self.subTest(spec=spec, sizes=sizes):
+                    self.assert_identical(joined(stream(spec, split(columns, sizes))), expected)
+
+    def test_carries_on_from_a_stream_object(self):
+        rsi = RSIStream(14, method='wilder')
+        first = joined(stream(rsi, split([self.close[:1000]], [100])))
+        second = joined(stream(rsi, split([self.close[1000:]], [100])))
+        self.assert_identical(np.concatenate((first, second)), batch.rsi(self.close, 14, method='wilder'))
+
+    def test_column_store_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = ColumnStore(directory)
+            store.append(high=self.high, low=self.low, close=self.close)
+            atr = joined(stream(('atr', {'period': 14}), chunks(store['high'], store['low'], store['close'], size=512)))
+            self.assert_identical(atr, batch.atr(self.high, self.low, self.close, 14))
+            rsi = joined(stream('rsi', ({'close': chunk} for chunk in chunks(store['close'], size=512))))
+            self.assert_identical(rsi, batch.rsi(self.close))
+
+    def test_unknown_indicator(self):
+        with self.assertRaises(ValueError):
+            list(stream('obv', [self.close]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,3 @@
+# rsi_test.py is a script-style module meant to be run directly with
+# `python tests/rsi_test.py`, so it is not collected by pytest.
+collect_ignore = ["rsi_test.py"]
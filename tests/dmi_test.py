@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+from ilib import ADX, DMI, AverageTrueRange, batch
+
+
+class DMITest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        close = 100 + np.cumsum(rng.normal(0, 1, 300))
+        self.high = (close + rng.uniform(0, 1, 300)).tolist()
+        self.low = (close - rng.uniform(0, 1, 300)).tolist()
+        self.close = close.tolist()
+
+    def test_streaming_matches_batch(self):
+        dmi = DMI(14)
+        plus_di, minus_di, dx, adx = [], [], [], []
+        for high, low, close in zip(self.high, self.low, self.close):
+            dmi.add_data_point(high, low, close)
+            plus_di.append(np.nan if dmi.plus_di is None else dmi.plus_di)
+            minus_di.append(np.nan if dmi.minus_di is None else dmi.minus_di)
+            dx.append(np.nan if dmi.dx is None else dmi.dx)
+            adx.append(np.nan if dmi.adx is None else dmi.adx)
+        expected = batch.dmi(self.high, self.low, self.close, 14)
+        for values, reference in zip((plus_di, minus_di, dx, adx), expected):
+            np.testing.assert_array_equal(values, reference)
+
+    def test_alignment(self):
+        plus_di, _, _, adx = batch.dmi(self.high, self.low, self.close, 14)
+        # The first DI needs 14 true ranges and the first ADX 14 DX values
+        self.assertTrue(np.isnan(plus_di[:14]).all())
+        self.assertFalse(np.isnan(plus_di[14]))
+        self.assertTrue(np.isnan(adx[:27]).all())
+        self.assertFalse(np.isnan(adx[27:]).any())
+
+    def test_flat_prices(self):
+        dmi = DMI(3, [10] * 10, [10] * 10, [10] * 10)
+        self.assertEqual(dmi.get_atr(), 0)
+        self.assertEqual(dmi.get_plus_di(), 0)
+        self.assertEqual(dmi.get_dx(), 0)
+        self.assertEqual(dmi.get_adx(), 0)
+
+    def test_wilder_atr(self):
+        atr = AverageTrueRange(14, self.high[:50], self.low[:50], self.close[:50], method='wilder')
+        for high, low, close in zip(self.high[50:], self.low[50:], self.close[50:]):
+            atr.add_data_point(high, low, close)
+        expected = batch.atr(self.high, self.low, self.close, 14, method='wilder')
+        self.assertEqual(atr.get_ATR(), expected[-1])
+        np.testing.assert_array_equal(list(atr.ATR_values), expected[14:])
+
+    def test_wilder_adx(self):
+        adx = ADX(14, self.high, self.low, self.close, method='wilder')
+        plus_di, minus_di, dx, smoothed = batch.dmi(self.high, self.low, self.close, 14)
+        self.assertEqual(adx.get_plus_di(), plus_di[-1])
+        self.assertEqual(adx.get_minus_di(), minus_di[-1])
+        self.assertEqual(adx.get_adx(), smoothed[-1])
+        np.testing.assert_array_equal(list(adx.directional_movements), dx[14:])
+        np.testing.assert_array_equal(batch.adx(self.high, self.low, self.close, 14, method='wilder'), dx)
+
+    def test_state_is_bounded(self):
+        dmi = DMI(14, self.high, self.low, self.close, max_history=5)
+        self.assertEqual(len(dmi.adx_values), 5)
+        adx = ADX(14, self.high, self.low, self.close, max_history=5, method='wilder')
+        self.assertEqual(len(adx.dmi.adx_values), 1)
+        self.assertEqual(len(adx.directional_movements), 5)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            AverageTrueRange(14, method='ema')
+        with self.assertRaises(ValueError):
+            ADX(14, method='ema')
+
+
+if __name__ == '__main__':
+    unittest.main()
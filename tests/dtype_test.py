@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from ilib import ATRBank, ColumnStore, RSIBank, SMABank, batch, stream
+from ilib.chunked import chunks
+
+# Half a float32 ulp, relative: the most rounding a float64 value to float32 can change it by
+FLOAT32_ROUNDING = 2.0 ** -24
+
+# The bounds the README documents for float32 inputs, row by row: as a fraction of the price for
+# the price-scaled indicators, in indicator points for the oscillators, and over 99.9% of the bars
+# for the Stochastic RSI and DMI / ADX, which have no useful worst case. The README bounds were
+# measured on 1,000,000-bar series; this test checks them on one 20,000-bar series.
+PRICE_BOUNDS = {'sma': 1.5e-7, 'ema': 1.5e-7, 'mvwap': 1.5e-7, 'bollinger_bands': 2e-7, 'macd': 3e-8,
+                'atr': 1e-7, 'atr wilder': 1e-7}
+POINT_BOUNDS = {'rsi': 1e-3, 'rsi wilder': 4e-4, 'stoch': 1e-3, 'cci': 2.5e-3}
+PERCENTILE_BOUNDS = {'stoch_rsi': 1e-4, 'dmi': 5e-4}
+
+
+class Float32Test(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(17)
+        self.close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 20000)))
+        spread = self.close * np.abs(rng.normal(0, 0.005, 20000))
+        self.high = self.close + spread
+        self.low = self.close - spread
+        self.volume = rng.integers(100, 10000, 20000).astype(float)
+        self.cases = {
+            'sma': (batch.sma, (self.close,), {'period': 20}),
+            'ema': (batch.ema, (self.close,), {'window': 20}),
+            'mvwap': (batch.mvwap, (self.close, self.volume), {'period': 20}),
+            'macd': (batch.macd, (self.close,), {}),
+            'bollinger_bands': (batch.bollinger_bands, (self.close,), {'window': 20, 'num_std': 2}),
+            'atr': (batch.atr, (self.high, self.low, self.close), {'period': 14}),
+            'atr wilder': (batch.atr, (self.high, self.low, self.close), {'period': 14, 'method': 'wilder'}),
+            'rsi': (batch.rsi, (self.close,), {'period': 14}),
+            'rsi wilder': (batch.rsi, (self.close,), {'period': 14, 'method': 'wilder'}),
+            'cci': (batch.cci, (self.high, self.low, self.close), {'period': 20}),
+            'stoch': (batch.stoch, (self.high, self.low, self.close), {}),
+            'stoch_rsi': (batch.stoch_rsi, (self.close,), {}),
+            'dmi': (batch.dmi, (self.high, self.low, self.close), {'period': 14}),
+        }
+
+    @staticmethod
+    def outputs(values):
+        return values if isinstance(values, tuple) else (values,)
+
+    def test_outputs_are_float64_values_rounded(self):
+        for name, (function, inputs, params) in self.cases.items():
+            with self.subTest(name=name):
+                expected = self.outputs(function(*inputs, **params))
+                actual = self.outputs(function(*inputs, dtype=np.float32, **params))
+                for expected_values, actual_values in zip(expected, actual):
+                    self.assertEqual(actual_values.dtype, np.float32)
+                    self.assertEqual(actual_values.tobytes(), expected_values.astype(np.float32).tobytes())
+                    with np.errstate(invalid='ignore'):
+                        errors = np.abs(actual_values - expected_values) / np.abs(expected_values)
+                    self.assertLessEqual(np.nanmax(errors), FLOAT32_ROUNDING)
+
+    def test_float32_inputs_within_documented_bounds(self):
+        for name, (function, inputs, params) in self.cases.items():
+            with self.subTest(name=name):
+                expected = self.outputs(function(*inputs, **params))
+                actual = self.outputs(function(*(values.astype(np.float32) for values in inputs), dtype=np.float32, **params))
+                for expected_values, actual_values in zip(expected, actual):
+                    np.testing.assert_array_equal(np.isnan(actual_values), np.isnan(expected_values))
+                    errors = np.abs(actual_values - expected_values)
+                    if name in PRICE_BOUNDS:
+                        self.assertLess(np.nanmax(errors / self.close), PRICE_BOUNDS[name])
+                    elif name in POINT_BOUNDS:
+                        self.assertLess(np.nanmax(errors), POINT_BOUNDS[name])
+                    else:
+                        self.assertLess(np.nanpercentile(errors, 99.9), PERCENTILE_BOUNDS[name])
+
+    def test_stream_matches_batch(self):
+        rsi = np.concatenate(list(stream(('rsi', {'period': 14, 'method': 'wilder'}), chunks(self.close, size=777), dtype=np.float32)))
+        self.assertEqual(rsi.tobytes(), batch.rsi(self.close, 14, method='wilder', dtype=np.float32).tobytes())
+        upper, middle, lower = (np.concatenate(part) for part in zip(*stream('bollinger_bands', chunks(self.close, size=500), dtype=np.float32)))
+        self.assertEqual(upper.dtype, np.float32)
+        self.assertEqual(middle.tobytes(), batch.bollinger_bands(self.close, dtype=np.float32)[1].tobytes())
+
+    def test_column_store_keeps_dtype(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = ColumnStore(directory)
+            store.append(close=self.close.astype(np.float32))
+            rsi = store.compute('rsi', batch.rsi, 'close', period=14, dtype=np.float32)
+            self.assertEqual(rsi.dtype, np.float32)
+            self.assertEqual(ColumnStore(directory, mode='r')['rsi'].dtype, np.float32)
+
+    def test_banks_store_windows_as_float32(self):
+        prices = self.close.reshape(-1, 10)
+        high, low = self.high.reshape(-1, 10), self.low.reshape(-1, 10)
+        banks = [(SMABank(20, 10), SMABank(20, 10, dtype=np.float32)),
+                 (RSIBank(14, 10), RSIBank(14, 10, dtype=np.float32)),
+                 (ATRBank(14, 10), ATRBank(14, 10, dtype=np.float32))]
+        self.assertEqual(banks[0][1].window_values.nbytes, banks[0][0].window_values.nbytes // 2)
+        for bar in range(len(prices)):
+            ids = np.arange(10)
+            for full, compact in banks[:2]:
+                full.update(ids, prices[bar])
+                compact.update(ids, prices[bar])
+            for bank in banks[2]:
+                bank.update(ids, high[bar], low[bar], prices[bar])
+        sma, rsi, atr = ((full.get(), compact.get()) for full, compact in banks)
+        # Only the stored window values are rounded, and the sums are taken in float64
+        self.assertLess(np.max(np.abs(sma[1] - sma[0]) / sma[0]), 2 * FLOAT32_ROUNDING)
+        self.assertLess(np.max(np.abs(rsi[1] - rsi[0])), 1e-4)
+        self.assertLess(np.max(np.abs(atr[1] - atr[0]) / atr[0]), 2 * FLOAT32_ROUNDING)
+
+
+if __name__ == '__main__':
+    unittest.main()
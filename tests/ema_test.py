@@ -0,0 +1,39 @@
+import unittest
+
+from ilib import EMA
+
+
+PRICES = [45.15, 46.02, 45.89, 46.29, 45.94, 46.03, 45.71, 45.63, 45.36, 45.81, 46.10, 45.77, 45.95, 45.61, 45.27, 44.17, 44.12, 44.36, 44.54, 44.23, 44.29, 44.15, 44.34, 44.58, 44.69, 44.76, 44.62, 44.57, 44.45, 44.38]
+
+
+class EMATest(unittest.TestCase):
+
+    def test_add_data_point_matches_batch(self):
+        ema = EMA(10, PRICES[:12])
+        for price in PRICES[12:]:
+            ema.add_data_point(price)
+        batch = EMA(10, PRICES)
+        self.assertEqual(ema.get_EMA(), batch.get_EMA())
+        self.assertEqual(ema.ema_values, batch.ema_values)
+        self.assertEqual(ema.data, PRICES)
+
+    def test_warmup_from_empty(self):
+        ema = EMA(10)
+        for price in PRICES[:10]:
+            ema.add_data_point(price)
+        self.assertIsNone(ema.get_EMA())
+        for price in PRICES[10:]:
+            ema.add_data_point(price)
+        self.assertEqual(ema.get_EMA(), EMA(10, PRICES).get_EMA())
+
+    def test_streaming_keeps_only_state(self):
+        ema = EMA(10, streaming=True)
+        for price in PRICES:
+            ema.add_data_point(price)
+        self.assertEqual(ema.get_EMA(), EMA(10, PRICES).get_EMA())
+        self.assertEqual(ema.data, [])
+        self.assertEqual(ema.ema_values, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
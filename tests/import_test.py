@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+# Upper bound in seconds for `import ilib` in a fresh interpreter.
+IMPORT_BUDGET = 0.5
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter that behaves as if matplotlib was not installed.
+SCRIPT = """
+import sys
+import time
+
+class BlockMatplotlib:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] == 'matplotlib':
+            raise ModuleNotFoundError("No module named 'matplotlib'")
+
+sys.meta_path.insert(0, BlockMatplotlib())
+start = time.perf_counter()
+import ilib
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(' '.join(name for name in ('matplotlib', 'pandas') if name in sys.modules))
+"""
+
+
+def time_import():
+    output = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    elapsed, loaded = (output.split('\n') + [''])[:2]
+    return float(elapsed), loaded.split()
+
+
+class ImportTest(unittest.TestCase):
+
+    def test_import_without_matplotlib(self):
+        elapsed, loaded = min(time_import() for _ in range(3))
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, IMPORT_BUDGET)
+
+    def test_plotting_requires_matplotlib(self):
+        script = SCRIPT + """
+rsi = ilib.RSI(3, [1.0, 2.0, 1.5, 2.5, 2.0])
+try:
+    rsi.plot_show()
+except ImportError as error:
+    print(error)
+"""
+        output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        self.assertIn('pip install ilib[plot]', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import importlib.util
+import unittest
+
+import numpy as np
+
+import ilib
+from ilib import batch, kernels
+
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+
+
+def reference_wilder(values, period):
+    """The loop batch.wilder_average ran before the kernels."""
+    values = list(values)
+    average = sum(values[:period]) / period
+    averages = [average]
+    for value in values[period:]:
+        average = (average * (period - 1) + value) / period
+        averages.append(average)
+    return [np.nan] * (period - 1) + averages
+
+
+def reference_exponential(values, alpha):
+    """The loop EMA.calculate and MACD.calculate_ema ran before the kernels."""
+    values = list(values)
+    averages = [values[0]]
+    for value in values[1:]:
+        averages.append(alpha * value + (1 - alpha) * averages[-1])
+    return averages
+
+
+class KernelsTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(37)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 2000))
+        self.high = self.close + rng.uniform(0, 1, 2000)
+        self.low = self.close - rng.uniform(0, 1, 2000)
+
+    def tearDown(self):
+        kernels.set_backend('python')
+
+    def outputs(self):
+        """Every indicator series that goes through the kernels."""
+        ema = ilib.EMA(20, self.close.tolist())
+        macd = ilib.MACD(12, 26, 9, self.close.tolist())
+        return [
+            batch.wilder_average(self.close, 14),
+            batch.wilder_average(self.close, 14, initial=100.0),
+            batch.exponential_average(self.close, 0.2),
+            batch.exponential_average(self.close, 0.2, initial=100.0),
+            batch.rsi(self.close, 14, method='wilder'),
+            *batch.dmi(self.high, self.low, self.close, 14),
+            *batch.macd(self.close),
+            np.array(ema.ema_values),
+            np.array(macd.macd_line),
+        ]
+
+    def test_python_backend_matches_reference_loops(self):
+        self.assertEqual(kernels.get_backend(), 'python')
+        np.testing.assert_array_equal(batch.wilder_average(self.close, 14), reference_wilder(self.close.tolist(), 14))
+        np.testing.assert_array_equal(batch.exponential_average(self.close, 0.2), reference_exponential(self.close.tolist(), 0.2))
+        np.testing.assert_array_equal(ilib.EMA(20, self.close.tolist()).ema_values, reference_exponential(self.close.tolist(), 0.2))
+        np.testing.assert_array_equal(batch.wilder_average(self.close[:5], 14), np.full(5, np.nan))
+        self.assertEqual(len(batch.exponential_average([], 0.2)), 0)
+
+    @unittest.skipUnless(HAS_NUMBA, 'numba is not installed')
+    def test_numba_backend_matches_python(self):
+        expected = self.outputs()
+        kernels.set_backend('numba')
+        self.assertEqual(kernels.get_backend(), 'numba')
+        for actual, reference in zip(self.outputs(), expected):
+            np.testing.assert_array_equal(actual, reference)
+
+    @unittest.skipIf(HAS_NUMBA, 'numba is installed')
+    def test_numba_backend_needs_numba(self):
+        with self.assertRaises(ImportError):
+            kernels.set_backend('numba')
+        self.assertEqual(kernels.get_backend(), 'python')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            kernels.set_backend('cuda')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+
+import ilib
+from ilib.state import restore, snapshot
+from add_data_points_test import state
+
+# Number of ticks between reads, with reads on every tick, every few ticks and after long gaps
+GAPS = [1, 1, 5, 17, 0, 3, 60, 2, 100]
+
+
+class LazyTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(29)
+        close = np.round(100 + np.cumsum(rng.normal(0, 1, 400)), 1)
+        self.high = (close + np.round(rng.uniform(0, 1, 400), 1)).tolist()
+        self.low = (close - np.round(rng.uniform(0, 1, 400), 1)).tolist()
+        self.close = close.tolist()
+        self.cases = [
+            (lambda lazy: ilib.RSI(14, lazy=lazy), 'get_rsi', [self.close]),
+            (lambda lazy: ilib.RSI(14, method='wilder', lazy=lazy), 'get_rsi', [self.close]),
+            (lambda lazy: ilib.SMA([], 20, lazy=lazy), 'get_smavalue', [self.close]),
+            (lambda lazy: ilib.BollingerBands(20, 2, lazy=lazy), 'get_BollingerBands', [self.close]),
+            (lambda lazy: ilib.MACD(lazy=lazy), 'get_lines', [self.close]),
+            (lambda lazy: ilib.AverageTrueRange(14, lazy=lazy), 'get_ATR', [self.high, self.low, self.close]),
+            (lambda lazy: ilib.AverageTrueRange(14, method='wilder', lazy=lazy), 'get_ATR', [self.high, self.low, self.close]),
+            (lambda lazy: ilib.ADX(14, lazy=lazy), 'get_directional_movement_index', [self.high, self.low, self.close]),
+            (lambda lazy: ilib.ADX(14, method='wilder', lazy=lazy), 'get_adx', [self.high, self.low, self.close]),
+            (lambda lazy: ilib.CCI(20, lazy=lazy), 'get_cci', [self.high, self.low, self.close]),
+        ]
+
+    def assert_same_value(self, actual, expected):
+        if isinstance(expected, tuple):
+            for actual_value, expected_value in zip(actual, expected):
+                self.assert_same_value(actual_value, expected_value)
+        elif expected is None:
+            self.assertIsNone(actual)
+        else:
+            self.assertAlmostEqual(actual, expected, places=9)
+
+    def test_getters_match_eager_indicators(self):
+        for make, getter, columns in self.cases:
+            with self.subTest(indicator=type(make(False)).__name__, getter=getter):
+                eager, lazy = make(False), make(True)
+                rows = list(zip(*columns))
+                position, index = 0, 0
+                while position < len(rows):
+                    stop = position + GAPS[index % len(GAPS)]
+                    for row in rows[position:stop]:
+                        eager.add_data_point(*row)
+                        lazy.add_data_point(*row)
+                    self.assert_same_value(getattr(lazy, getter)(), getattr(eager, getter)())
+                    self.assertFalse(lazy.dirty)
+                    position, index = stop, index + 1
+
+    def test_ingestion_only_records(self):
+        rsi = ilib.RSI(14, lazy=True)
+        for price in self.close[:100]:
+            rsi.add_data_point(price)
+        self.assertTrue(rsi.dirty)
+        self.assertIsNone(rsi.rsi)
+        self.assertEqual(len(rsi.data), 0)
+
+        expected = ilib.RSI(14)
+        expected.add_data_points(self.close[:100])
+        np.testing.assert_array_equal(rsi.add_data_points(self.close[100:200]), expected.add_data_points(self.close[100:200]))
+        self.assertFalse(rsi.dirty)
+        np.testing.assert_array_equal(rsi.add_data_points([]), np.empty(0))
+        self.assertEqual(rsi.get_rsi(), expected.get_rsi())
+        self.assertEqual(list(rsi.rsi_values), list(expected.rsi_values))
+        self.assertEqual(state(rsi.data), state(expected.data))
+
+    def test_snapshot_keeps_pending_points(self):
+        atr = ilib.AverageTrueRange(14, lazy=True)
+        for row in zip(self.high[:50], self.low[:50], self.close[:50]):
+            atr.add_data_point(*row)
+        restored = restore(snapshot(atr))
+        self.assertTrue(restored.dirty)
+        for row in zip(self.high[50:], self.low[50:], self.close[50:]):
+            atr.add_data_point(*row)
+            restored.add_data_point(*row)
+        self.assertEqual(restored.get_ATR(), atr.get_ATR())
+
+    def test_switching_off_applies_pending_points(self):
+        sma = ilib.SMA([], 5, lazy=True)
+        sma.add_data_points(self.close[:10])
+        sma.set_lazy(False, 1)
+        self.assertIsNone(sma.pending)
+        self.assertEqual(sma.sma, sum(self.close[5:10]) / 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from ilib import MACD
+
+
+PRICES = [45.15, 46.02, 45.89, 46.29, 45.94, 46.03, 45.71, 45.63, 45.36, 45.81, 46.10, 45.77, 45.95, 45.61, 45.27, 44.17, 44.12, 44.36, 44.54, 44.23, 44.29, 44.15, 44.34, 44.58, 44.69, 44.76, 44.62, 44.57, 44.45, 44.38, 44.23, 44.17, 44.04, 44.22, 44.57, 43.42, 42.66, 43.13, 43.43, 43.70, 43.88, 44.22]
+
+
+class MACDTest(unittest.TestCase):
+
+    def test_add_data_point_matches_batch(self):
+        macd = MACD(data=PRICES[:26])
+        for price in PRICES[26:]:
+            macd.add_data_point(price)
+        batch = MACD(data=PRICES)
+        self.assertEqual(macd.get_lines(), batch.get_lines())
+        self.assertEqual(macd.macd_line, batch.macd_line)
+        self.assertEqual(macd.signal_line, batch.signal_line)
+        self.assertEqual(macd.macd_histogram, batch.macd_histogram)
+
+    def test_streaming_keeps_only_state(self):
+        macd = MACD(streaming=True)
+        for price in PRICES:
+            macd.add_data_point(price)
+        self.assertEqual(macd.get_lines(), MACD(data=PRICES).get_lines())
+        self.assertEqual(macd.data, [])
+        self.assertEqual(len(macd.macd_line), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+
+import numpy as np
+
+from ilib import MACD, Pipeline, batch
+from ilib.pipeline import ExponentialAverage, Node, RollingMoments, TrueRange, WilderAverage
+
+
+def stream(pipeline, high, low, close):
+    """Feed bars one at a time and collect each indicator as NaN-padded arrays."""
+    collected = {name: [] for name in pipeline.outputs}
+    for bar in zip(high, low, close):
+        for name, value in pipeline.update(*bar).items():
+            if isinstance(value, tuple):
+                value = tuple(np.nan if part is None else part for part in value)
+            elif value is None:
+                value = np.nan
+            collected[name].append(value)
+    return {name: tuple(np.array(values).T) if isinstance(values[0], tuple) else np.array(values, dtype=float)
+            for name, values in collected.items()}
+
+
+class PipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(17)
+        close = 100 + np.cumsum(rng.normal(0, 1, 300))
+        self.high = close + rng.uniform(0, 1, 300)
+        self.low = close - rng.uniform(0, 1, 300)
+        self.close = close
+        self.pipeline = Pipeline()
+        self.pipeline.add('rsi', 'rsi', period=14, method='wilder')
+        self.pipeline.add('rsi_sma', 'rsi', period=14)
+        self.pipeline.add('atr', 'atr', period=14, method='wilder')
+        self.pipeline.add('dmi', 'dmi', period=14)
+        self.pipeline.add('macd', 'macd')
+        self.pipeline.add('ema', 'ema', window=12, alpha=2 / 13)
+        self.pipeline.add('bands', 'bollinger_bands', window=20, num_std=2)
+        self.pipeline.add('sma', 'sma', period=20)
+        self.pipeline.add('stoch', 'stoch', period=14, smoothing_period=3)
+
+    def test_intermediates_are_shared(self):
+        kinds = [key[0] for key in self.pipeline.nodes]
+        self.assertEqual(kinds.count(TrueRange), 1)
+        # MACD short/long/signal; the EMA indicator reuses the short one
+        self.assertEqual(kinds.count(ExponentialAverage), 3)
+        # Close for the bands and SMA, gains and losses for the SMA RSI, %D
+        self.assertEqual(kinds.count(RollingMoments), 4)
+        # TR, +DM, -DM, ADX and the RSI gains and losses
+        self.assertEqual(kinds.count(WilderAverage), 6)
+
+    def test_batch_matches_indicators(self):
+        series = self.pipeline.run(high=self.high, low=self.low, close=self.close)
+        np.testing.assert_array_equal(series['rsi'], batch.rsi(self.close, 14, method='wilder'))
+        np.testing.assert_allclose(series['rsi_sma'], batch.rsi(self.close, 14), rtol=1e-9)
+        np.testing.assert_array_equal(series['atr'], batch.atr(self.high, self.low, self.close, 14, method='wilder'))
+        for values, expected in zip(series['dmi'], batch.dmi(self.high, self.low, self.close, 14)):
+            np.testing.assert_array_equal(values, expected)
+        for values, expected in zip(series['macd'], batch.macd(self.close)):
+            np.testing.assert_array_equal(values, expected)
+        np.testing.assert_array_equal(series['ema'], batch.ema(self.close, 12, 2 / 13))
+        for values, expected in zip(series['bands'], batch.bollinger_bands(self.close, 20, 2)):
+            np.testing.assert_allclose(values, expected, rtol=1e-12)
+        np.testing.assert_allclose(series['sma'], batch.sma(self.close, 20), rtol=1e-12)
+        for values, expected in zip(series['stoch'], batch.stoch(self.high, self.low, self.close, 14, 3)):
+            np.testing.assert_allclose(values, expected, rtol=1e-9)
+
+    def test_streaming_matches_batch(self):
+        series = self.pipeline.run(high=self.high, low=self.low, close=self.close)
+        streamed = stream(self.pipeline, self.high.tolist(), self.low.tolist(), self.close.tolist())
+        for name, values in series.items():
+            if isinstance(values, tuple):
+                for part, expected in zip(streamed[name], values):
+                    np.testing.assert_allclose(part, expected, rtol=1e-9, err_msg=name)
+            else:
+                np.testing.assert_allclose(streamed[name], values, rtol=1e-9, err_msg=name)
+        np.testing.assert_array_equal(streamed['dmi'][3], series['dmi'][3])
+
+    def test_streaming_matches_macd(self):
+        lines = stream(self.pipeline, self.high.tolist(), self.low.tolist(), self.close.tolist())['macd']
+        macd = MACD(12, 26, 9)
+        for price in self.close.tolist():
+            macd.add_data_point(price)
+        self.assertEqual(macd.get_lines(), tuple(line[-1] for line in lines))
+
+    def test_atr_defaults_to_sma_like_batch(self):
+        pipeline = Pipeline()
+        pipeline.add('atr', 'atr', period=14)
+        series = pipeline.run(high=self.high, low=self.low, close=self.close)
+        np.testing.assert_allclose(series['atr'], batch.atr(self.high, self.low, self.close, 14), rtol=1e-9)
+
+    def test_streaming_recovers_after_a_flat_stretch(self):
+        high, low, close = self.high.copy(), self.low.copy(), self.close.copy()
+        high[40:56] = low[40:56] = close[40:56] = 100.0
+        pipeline = Pipeline()
+        pipeline.add('stoch', 'stoch', period=5, smoothing_period=4)
+        series = pipeline.run(high=high, low=low, close=close)
+        streamed = stream(pipeline, high.tolist(), low.tolist(), close.tolist())
+        self.assertFalse(np.isnan(series['stoch'][1][59:]).any())
+        for part, expected in zip(streamed['stoch'], series['stoch']):
+            np.testing.assert_allclose(part, expected, rtol=1e-9)
+
+    def test_short_batch(self):
+        series = self.pipeline.run(high=self.high[:5], low=self.low[:5], close=self.close[:5])
+        self.assertTrue(np.isnan(series['atr']).all())
+        self.assertEqual(len(series['dmi'][3]), 5)
+
+    def test_nodes_need_update_and_compute(self):
+        class Incomplete(Node):
+            def update(self, value):
+                return value
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self.pipeline.add('rsi', 'rsi')
+        with self.assertRaises(ValueError):
+            self.pipeline.add('vwap', 'vwap')
+        with self.assertRaises(ValueError):
+            self.pipeline.update(close=100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
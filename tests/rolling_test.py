@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ilib import STOCHOSCILLATOR, batch
+from ilib.rolling import RollingExtremum, RollingMax, RollingMin, rolling_max, rolling_min
+
+
+class RollingExtremaTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        # Rounded so that ties are common
+        self.values = np.round(rng.normal(0, 3, 257))
+
+    def test_streaming_matches_sliding_window(self):
+        for window in (1, 2, 7, 64, 257):
+            highest, lowest = RollingMax(window), RollingMin(window)
+            maxima = [highest.append(value) for value in self.values]
+            minima = [lowest.append(value) for value in self.values]
+            windows = sliding_window_view(self.values, window)
+            np.testing.assert_array_equal(maxima[window - 1:], windows.max(axis=1))
+            np.testing.assert_array_equal(minima[window - 1:], windows.min(axis=1))
+            self.assertLessEqual(len(highest.candidates), window)
+
+    def test_batch_matches_sliding_window(self):
+        for window in (1, 2, 7, 64, 257):
+            windows = sliding_window_view(self.values, window)
+            maxima, minima = rolling_max(self.values, window), rolling_min(self.values, window)
+            self.assertTrue(np.isnan(maxima[:window - 1]).all())
+            np.testing.assert_array_equal(maxima[window - 1:], windows.max(axis=1))
+            np.testing.assert_array_equal(minima[window - 1:], windows.min(axis=1))
+
+    def test_short_input(self):
+        self.assertTrue(np.isnan(rolling_max([1.0, 2.0], 3)).all())
+        self.assertIsNone(RollingMin(3).value)
+
+    def test_extremum_needs_dominates(self):
+        class Incomplete(RollingExtremum):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete(3)
+
+
+class StochasticOscillatorTest(unittest.TestCase):
+
+    def test_streaming_matches_batch(self):
+        rng = np.random.default_rng(6)
+        close = 100 + np.cumsum(rng.normal(0, 1, 200))
+        high = close + rng.uniform(0, 1, 200)
+        low = close - rng.uniform(0, 1, 200)
+        stoch = STOCHOSCILLATOR(14, 3, 20, 80)
+        for bar in zip(high, low, close):
+            stoch.add_data_point(*bar)
+        k, d = batch.stoch(high, low, close, 14, 3)
+        np.testing.assert_allclose(stoch.stoch_values, k[13:], rtol=1e-12)
+        self.assertEqual(stoch.smoothed_values[:2], [None, None])
+        np.testing.assert_allclose(stoch.smoothed_values[2:], d[15:], rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
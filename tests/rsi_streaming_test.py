@@ -0,0 +1,60 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from ilib import RSI, batch
+
+
+class RSIStreamingTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.prices = (100 + np.cumsum(rng.normal(0, 1, 300))).tolist()
+
+    def stream(self, rsi, prices):
+        values = []
+        for price in prices:
+            rsi.add_data_point(price)
+            values.append(np.nan if rsi.get_rsi() is None else rsi.get_rsi())
+        return values
+
+    def test_wilder_matches_batch(self):
+        values = self.stream(RSI(14, method='wilder'), self.prices)
+        np.testing.assert_array_equal(values, batch.rsi(self.prices, 14, method='wilder'))
+
+    def test_wilder_matches_reference(self):
+        changes = np.diff(self.prices)
+        gains = np.where(changes > 0, changes, 0)
+        losses = np.where(changes < 0, -changes, 0)
+        avg_gain, avg_loss = np.mean(gains[:14]), np.mean(losses[:14])
+        for change in changes[14:]:
+            avg_gain = (avg_gain * 13 + max(change, 0)) / 14
+            avg_loss = (avg_loss * 13 + abs(min(change, 0))) / 14
+        self.assertAlmostEqual(RSI(14, list(self.prices), method='wilder').get_rsi(), 100 - (100 / (1 + avg_gain / avg_loss)))
+
+    def test_wilder_initial_data_then_stream(self):
+        rsi = RSI(14, self.prices[:100], method='wilder')
+        self.stream(rsi, self.prices[100:])
+        self.assertEqual(rsi.get_rsi(), batch.rsi(self.prices, 14, method='wilder')[-1])
+        self.assertEqual(len(rsi.data), 15)
+
+    def test_sma_is_default(self):
+        values = self.stream(RSI(14), self.prices)
+        np.testing.assert_allclose(values, batch.rsi(self.prices, 14), rtol=1e-12)
+
+    def test_no_output(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.stream(RSI(14), self.prices[:30])
+            self.stream(RSI(14, method='wilder'), self.prices[:30])
+        self.assertEqual(output.getvalue(), '')
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            RSI(14, method='ema')
+
+
+if __name__ == '__main__':
+    unittest.main()
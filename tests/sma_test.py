@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ilib import SMA, batch
+
+
+class SMATest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        self.prices = 100 + np.cumsum(rng.normal(0, 1, 1000))
+
+    def test_streaming_matches_window_mean(self):
+        sma = SMA([], 20)
+        for price in self.prices:
+            sma.add_data_point(price)
+        expected = sliding_window_view(self.prices, 20).mean(axis=1)
+        np.testing.assert_allclose(sma.sma_values, expected, rtol=1e-12)
+        self.assertEqual(len(sma.data), 20)
+
+    def test_initial_data_then_stream(self):
+        sma = SMA(self.prices[:500], 20, max_history=100)
+        for price in self.prices[500:]:
+            sma.add_data_point(price)
+        self.assertAlmostEqual(sma.get_smavalue(), self.prices[-20:].mean())
+        self.assertEqual(len(sma.sma_values), 100)
+
+    def test_not_enough_data(self):
+        self.assertIsNone(SMA([1.0, 2.0], 3).get_smavalue())
+        self.assertEqual(SMA([1.0, 2.0, 3.0], 3).get_smavalue(), 2.0)
+
+    def test_batch_matches_window_mean(self):
+        for period in (1, 5, 20):
+            values = batch.sma(self.prices, period, anchor_every=64)
+            self.assertTrue(np.isnan(values[:period - 1]).all())
+            np.testing.assert_allclose(values[period - 1:], sliding_window_view(self.prices, period).mean(axis=1), rtol=1e-12)
+
+    def test_batch_error_does_not_grow_with_length(self):
+        rng = np.random.default_rng(9)
+        prices = 1e6 + rng.normal(0, 1, 200000)
+        values = batch.sma(prices, 10)
+        expected = sliding_window_view(prices, 10).mean(axis=1)
+        self.assertLess(np.abs(values[9:] - expected).max(), 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+import numpy as np
+
+import ilib
+from ilib.state import FORMAT_VERSION, MAGIC
+
+from add_data_points_test import state
+
+
+def without_history(indicator):
+    """The state of an indicator with each output history cut to its latest value."""
+    values = state(indicator)
+    history = getattr(indicator, 'history', ())
+    for name, item in vars(indicator).items():
+        if name in history:
+            values[name] = values[name][-1:]
+        elif type(item).__name__ in ilib.state.CLASSES:
+            values[name] = without_history(item)
+    return values
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(29)
+        close = np.round(100 + np.cumsum(rng.normal(0, 1, 400)), 1)
+        self.high = (close + np.round(rng.uniform(0, 1, 400), 1)).tolist()
+        self.low = (close - np.round(rng.uniform(0, 1, 400), 1)).tolist()
+        self.close = close.tolist()
+        self.volume = rng.integers(0, 100, 400).astype(float).tolist()
+        self.timestamp = np.cumsum(rng.uniform(0, 1.6, 400)).tolist()
+
+    def assert_restores(self, make, columns):
+        for cut in (0, 5, 30, 300):
+            original = make()
+            for row in zip(*(column[:cut] for column in columns)):
+                original.add_data_point(*row)
+            restored = ilib.restore(ilib.snapshot(original))
+            self.assertIs(type(restored), type(original))
+            self.assertEqual(without_history(restored), without_history(original))
+            for row in zip(*(column[cut:] for column in columns)):
+                original.add_data_point(*row)
+                restored.add_data_point(*row)
+            self.assertEqual(without_history(restored), without_history(original), '{} cut at {}'.format(type(original).__name__, cut))
+
+    def test_price_indicators(self):
+        prices = [self.close]
+        self.assert_restores(lambda: ilib.EMA(20), prices)
+        self.assert_restores(lambda: ilib.EMA(20, streaming=True), prices)
+        self.assert_restores(lambda: ilib.MACD(12, 26, 9), prices)
+        self.assert_restores(lambda: ilib.MACD(12, 26, 9, streaming=True), prices)
+        self.assert_restores(lambda: ilib.RSI(14), prices)
+        self.assert_restores(lambda: ilib.RSI(14, method='wilder', max_history=10), prices)
+        self.assert_restores(lambda: ilib.SMA(None, 20), prices)
+        self.assert_restores(lambda: ilib.BollingerBands(20, 2), prices)
+        self.assert_restores(lambda: ilib.StochRSICalculator(3, 14, 5), prices)
+
+    def test_bar_indicators(self):
+        bars = [self.high, self.low, self.close]
+        self.assert_restores(lambda: ilib.AverageTrueRange(14), bars)
+        self.assert_restores(lambda: ilib.AverageTrueRange(14, method='wilder'), bars)
+        self.assert_restores(lambda: ilib.ADX(14), bars)
+        self.assert_restores(lambda: ilib.ADX(14, method='wilder'), bars)
+        self.assert_restores(lambda: ilib.DMI(14), bars)
+        self.assert_restores(lambda: ilib.CCI(20), bars)
+        self.assert_restores(lambda: ilib.STOCHOSCILLATOR(14, 3, 20, 80, max_history=50), bars)
+
+    def test_vwap(self):
+        trades = [self.close, self.volume, self.timestamp]
+        self.assert_restores(lambda: ilib.VWAP(session_length=100, num_std=2), trades)
+        self.assert_restores(lambda: ilib.VWAP(mvwap_window=10), trades)
+
+    def test_size_does_not_grow_with_history(self):
+        rsi = ilib.RSI(14, method='wilder')
+        rsi.add_data_points(self.close[:50])
+        size = len(ilib.snapshot(rsi))
+        rsi.add_data_points(self.close[50:])
+        self.assertEqual(len(ilib.snapshot(rsi)), size)
+        restored = ilib.restore(ilib.snapshot(rsi))
+        self.assertEqual(restored.get_rsi(), rsi.get_rsi())
+
+    def test_version_and_format_checks(self):
+        data = ilib.snapshot(ilib.EMA(3, streaming=True))
+        self.assertTrue(data.startswith(MAGIC + bytes([FORMAT_VERSION])))
+        with self.assertRaises(ValueError):
+            ilib.restore(b'XXXX' + data[4:])
+        with self.assertRaises(ValueError):
+            ilib.restore(MAGIC + bytes([FORMAT_VERSION + 1]) + data[5:])
+        with self.assertRaises(ValueError):
+            ilib.restore(data[:-3])
+        with self.assertRaises(TypeError):
+            ilib.snapshot(object())
+
+
+if __name__ == '__main__':
+    unittest.main()
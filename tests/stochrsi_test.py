@@ -0,0 +1,39 @@
+import unittest
+
+import numpy as np
+
+from ilib import StochRSICalculator, batch
+
+
+class StochRSITest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.prices = (100 + np.cumsum(rng.normal(0, 1, 300))).tolist()
+
+    def test_streaming_matches_batch(self):
+        stoch_rsi = StochRSICalculator(3, 14, 5)
+        for price in self.prices:
+            stoch_rsi.add_data_point(price)
+        k, d = batch.stoch_rsi(self.prices, 3, 14, 5)
+        # The first RSI is after 15 prices and the first %K after 5 RSI values
+        self.assertTrue(np.isnan(k[:18]).all())
+        np.testing.assert_allclose(stoch_rsi.get_k_values(), k[18:], rtol=1e-12)
+        self.assertTrue(np.isnan(d[:20]).all())
+        np.testing.assert_allclose(stoch_rsi.get_d_values(), d[20:], rtol=1e-12)
+
+    def test_k_matches_reference(self):
+        stoch_rsi = StochRSICalculator(3, 14, 5, self.prices)
+        rsi = batch.rsi(self.prices, 14, method='wilder')[-5:]
+        self.assertAlmostEqual(stoch_rsi.k, (rsi[-1] - rsi.min()) / (rsi.max() - rsi.min()))
+
+    def test_state_is_bounded(self):
+        stoch_rsi = StochRSICalculator(3, 14, 5, self.prices, max_history=10)
+        self.assertEqual(len(stoch_rsi.prices), 15)
+        self.assertEqual(len(stoch_rsi.rsi_values), 5)
+        self.assertEqual(len(stoch_rsi.get_k_values()), 10)
+        self.assertLessEqual(len(stoch_rsi.highest_rsi.candidates), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
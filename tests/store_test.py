@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from ilib import RSI, ColumnStore, batch
+
+
+class ColumnStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name + '/prices'
+        rng = np.random.default_rng(5)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 500))
+        self.high = self.close + rng.uniform(0, 1, 500)
+        self.low = self.close - rng.uniform(0, 1, 500)
+        self.volume = rng.integers(0, 1000, 500)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_and_reopen(self):
+        store = ColumnStore(self.path)
+        self.assertEqual(len(store), 0)
+        store.append(high=self.high[:200], low=self.low[:200], close=self.close[:200], volume=self.volume[:200])
+        store.append(high=self.high[200:], low=self.low[200:], close=self.close[200:], volume=self.volume[200:])
+
+        reopened = ColumnStore(self.path, mode='r')
+        self.assertEqual(len(reopened), 500)
+        self.assertEqual(reopened.columns, ['high', 'low', 'close', 'volume'])
+        close = reopened['close']
+        self.assertIsInstance(close, np.memmap)
+        np.testing.assert_array_equal(close, self.close)
+        self.assertEqual(reopened['volume'].dtype, self.volume.dtype)
+        np.testing.assert_array_equal(reopened['volume'], self.volume)
+        with self.assertRaises(ValueError):
+            reopened.append(close=self.close)
+        with self.assertRaises(ValueError):
+            close[0] = 1.0
+
+    def test_compute_persists_columns(self):
+        store = ColumnStore(self.path)
+        store.append(high=self.high, low=self.low, close=self.close)
+        store.compute('rsi_14', batch.rsi, 'close', period=14)
+        store.compute(('upper', 'middle', 'lower'), batch.bollinger_bands, 'close', window=20, num_std=2)
+        store.compute('atr_14', batch.atr, 'high', 'low', 'close', period=14, method='wilder')
+
+        reopened = ColumnStore(self.path, mode='r')
+        np.testing.assert_array_equal(reopened['rsi_14'], batch.rsi(self.close, 14))
+        np.testing.assert_array_equal(reopened['lower'], batch.bollinger_bands(self.close, 20, 2)[2])
+        np.testing.assert_array_equal(reopened['atr_14'], batch.atr(self.high, self.low, self.close, 14, method='wilder'))
+
+        # The classes take memmapped columns too
+        rsi = RSI(14)
+        np.testing.assert_array_equal(rsi.add_data_points(reopened['close']), reopened['rsi_14'])
+
+    def test_allocate_and_mismatched_lengths(self):
+        store = ColumnStore(self.path)
+        store.write('close', self.close)
+        signal = store.allocate('signal', dtype=np.int8)
+        signal[self.close > 100] = 1
+        signal.flush()
+        np.testing.assert_array_equal(ColumnStore(self.path)['signal'], (self.close > 100).astype(np.int8))
+        with self.assertRaises(ValueError):
+            store.write('short', self.close[:10])
+        with self.assertRaises(ValueError):
+            store.write('bad/name', self.close)
+        with self.assertRaises(FileNotFoundError):
+            ColumnStore(self.directory.name + '/missing', mode='r')
+
+
+if __name__ == '__main__':
+    unittest.main()
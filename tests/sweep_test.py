@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from ilib import batch
+from ilib.sweep import grid, sweep
+
+
+class SweepTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(31)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, (3, 200)), axis=1)
+        self.high = self.close + rng.uniform(0, 1, (3, 200))
+        self.low = self.close - rng.uniform(0, 1, (3, 200))
+
+    def test_grid(self):
+        self.assertEqual(grid(window=[10, 20], num_std=[1, 2]),
+                         [{'window': 10, 'num_std': 1}, {'window': 10, 'num_std': 2},
+                          {'window': 20, 'num_std': 1}, {'window': 20, 'num_std': 2}])
+
+    def test_matches_batch_functions(self):
+        params = grid(period=[5, 14], method=['sma', 'wilder'])
+        for processes in (1, 2):
+            results = sweep('rsi', {'close': self.close}, params, symbols=['a', 'b', 'c'], processes=processes, chunksize=3)
+            self.assertEqual(results['rsi'].shape, (12, 200))
+            self.assertEqual(list(results['symbol'][:5]), ['a', 'a', 'a', 'a', 'b'])
+            for row in range(12):
+                symbol = 'abc'.index(results['symbol'][row])
+                expected = batch.rsi(self.close[symbol], int(results['period'][row]), method=results['method'][row])
+                np.testing.assert_array_equal(results['rsi'][row], expected)
+
+    def test_multiple_outputs(self):
+        params = grid(window=[10, 20], num_std=[1.5, 2])
+        results = sweep('bollinger_bands', {'close': self.close}, params, processes=2)
+        upper, middle, lower = batch.bollinger_bands(self.close[2], 20, 1.5)
+        np.testing.assert_array_equal(results['upper'][10], upper)
+        np.testing.assert_array_equal(results['middle'][10], middle)
+        np.testing.assert_array_equal(results['lower'][10], lower)
+
+        results = sweep('macd', {'close': self.close}, [{'short_period': 12, 'long_period': 26, 'signal_period': 9}], processes=1)
+        for name, expected in zip(('macd', 'signal', 'histogram'), batch.macd(self.close[1], 12, 26, 9)):
+            np.testing.assert_array_equal(results[name][1], expected)
+
+    def test_stoch_thresholds(self):
+        bars = {'high': self.high, 'low': self.low, 'close': self.close}
+        params = grid(period=[14], oversold_threshold=[20, 30], overbought_threshold=[70, 80])
+        results = sweep('stoch', bars, params, processes=1)
+        self.assertEqual(list(results['oversold_threshold']), [20, 20, 30, 30] * 3)
+        k, _ = batch.stoch(self.high[0], self.low[0], self.close[0], 14)
+        signal = results['signal'][1]
+        warm = ~np.isnan(k)
+        np.testing.assert_array_equal(np.isnan(signal), ~warm)
+        np.testing.assert_array_equal(signal[warm] == 1, k[warm] <= 20)
+        np.testing.assert_array_equal(signal[warm] == -1, k[warm] >= 80)
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            sweep('obv', {'close': self.close}, [{}])
+        with self.assertRaises(ValueError):
+            sweep('atr', {'close': self.close}, [{'period': 14}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+
+import numpy as np
+
+from ilib import VWAP, batch
+
+
+class VWAPTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.prices = (100 + np.cumsum(rng.normal(0, 0.1, 500))).tolist()
+        self.volumes = rng.integers(1, 100, 500).astype(float).tolist()
+        # Irregular trade times over about four 100 second sessions
+        self.timestamps = np.cumsum(rng.uniform(0, 1.6, 500)).tolist()
+
+    def feed(self, vwap):
+        for bar in zip(self.prices, self.volumes, self.timestamps):
+            vwap.add_data_point(*bar)
+        return vwap
+
+    def test_session_vwap_matches_batch(self):
+        vwap = VWAP(session_length=100, num_std=2)
+        upper, lower = [], []
+        for bar in zip(self.prices, self.volumes, self.timestamps):
+            vwap.add_data_point(*bar)
+            upper.append(vwap.upper)
+            lower.append(vwap.lower)
+        expected = batch.vwap(self.prices, self.volumes, self.timestamps, session_length=100, num_std=2)
+        np.testing.assert_array_equal(list(vwap.vwap_values), expected[1])
+        np.testing.assert_allclose(upper, expected[0], rtol=1e-12)
+        np.testing.assert_allclose(lower, expected[2], rtol=1e-12)
+
+    def test_session_resets(self):
+        vwap = VWAP(session_length=100)
+        vwap.add_data_point(10, 5, 99)
+        vwap.add_data_point(20, 5, 99.5)
+        self.assertEqual(vwap.get_latest_vwap(), 15)
+        vwap.add_data_point(30, 5, 100)
+        self.assertEqual(vwap.get_latest_vwap(), 30)
+        self.assertEqual(vwap.get_vwap(), [10, 15, 30])
+        self.assertEqual(vwap.total_volume, 5)
+        self.assertEqual(len(batch.sessions(self.timestamps, 100)), int(self.timestamps[-1] // 100) + 1)
+
+    def test_zero_volume_opening_bar_clears_the_session(self):
+        prices, volumes, timestamps = [10, 20, 30, 40], [5, 5, 0, 5], [50, 99, 100, 101]
+        expected = batch.vwap(prices, volumes, timestamps, session_length=100, num_std=2)
+        one_at_a_time, chunked = VWAP(session_length=100, num_std=2), VWAP(session_length=100, num_std=2)
+        chunked.add_data_points(prices[:2], volumes[:2], timestamps[:2])
+        chunked.add_data_points(prices[2:3], volumes[2:3], timestamps[2:3])
+        for bar in zip(prices[:3], volumes[:3], timestamps[:3]):
+            one_at_a_time.add_data_point(*bar)
+        self.assertTrue(np.isnan([values[2] for values in expected]).all())
+        self.assertEqual(one_at_a_time.get_bands(), (None, None, None))
+        self.assertEqual(chunked.get_bands(), (None, None, None))
+        chunked.add_data_points(prices[3:], volumes[3:], timestamps[3:])
+        self.assertEqual(chunked.get_bands(), tuple(values[3] for values in expected))
+
+    def test_mvwap_over_bars(self):
+        vwap = self.feed(VWAP(mvwap_period=20, max_history=50))
+        expected = batch.mvwap(self.prices, self.volumes, period=20)
+        np.testing.assert_allclose(list(vwap.mvwap_values), expected[-50:], rtol=1e-12)
+        reference = np.dot(self.prices[-20:], self.volumes[-20:]) / sum(self.volumes[-20:])
+        self.assertAlmostEqual(vwap.get_mvwap(), reference)
+        self.assertEqual(len(vwap.moving_bars), 20)
+        self.assertEqual(len(vwap.vwap_values), 50)
+
+    def test_mvwap_over_time(self):
+        vwap = VWAP(mvwap_window=10)
+        mvwap = []
+        for bar in zip(self.prices, self.volumes, self.timestamps):
+            vwap.add_data_point(*bar)
+            mvwap.append(vwap.get_mvwap())
+        expected = batch.mvwap(self.prices, self.volumes, timestamps=self.timestamps, window=10)
+        np.testing.assert_allclose(mvwap, expected, rtol=1e-9)
+        self.assertTrue(all(timestamp > self.timestamps[-1] - 10 for timestamp, _, _ in vwap.moving_bars))
+
+    def test_bands_of_large_prices_with_a_small_spread(self):
+        rng = np.random.default_rng(5)
+        prices = 1e4 + rng.normal(0, 1e-3, 2000)
+        volumes = rng.integers(1, 100, 2000).astype(float)
+        timestamps = np.arange(2000.0)
+        mean = np.dot(prices, volumes) / volumes.sum()
+        std = np.sqrt(np.dot(volumes, (prices - mean) ** 2) / volumes.sum())
+
+        one_at_a_time = VWAP(num_std=2)
+        for bar in zip(prices.tolist(), volumes.tolist(), timestamps.tolist()):
+            one_at_a_time.add_data_point(*bar)
+        chunked = VWAP(num_std=2)
+        chunked.add_data_points(prices[:700], volumes[:700], timestamps[:700])
+        chunked.add_data_points(prices[700:], volumes[700:], timestamps[700:])
+        upper, values, _ = batch.vwap(prices, volumes, num_std=2)
+        for width in (one_at_a_time.upper - one_at_a_time.vwap, chunked.upper - chunked.vwap, upper[-1] - values[-1]):
+            self.assertAlmostEqual(width / (2 * std), 1, places=6)
+
+    def test_calculate_mvwap_with_a_minimum_volume(self):
+        vwap = VWAP()
+        vwap.add_data_point(10, 5, 1)
+        self.assertIsNone(vwap.calculate_mvwap(10))
+        vwap.add_data_point(20, 5, 2)
+        self.assertEqual(vwap.calculate_mvwap(10), 15)
+        self.assertEqual(len(vwap.mvwap_values), 0)
+
+    def test_window_arguments(self):
+        with self.assertRaises(ValueError):
+            VWAP(mvwap_period=10, mvwap_window=10)
+        with self.assertRaises(ValueError):
+            batch.mvwap(self.prices, self.volumes)
+
+
+if __name__ == '__main__':
+    unittest.main()